@@ -1,7 +1,7 @@
 import { ScrollArea } from "./ui/scroll-area";
 import { FileText, Folder, ChevronRight, ChevronDown, Loader2, AlertCircle } from "lucide-react";
 import { useState, useEffect } from "react";
-import { api, DirectoryItem } from "../lib/api";
+import { api, TreeItem as VaultTreeItem } from "../lib/api";
 
 export interface TreeItem {
   id: string;
@@ -12,6 +12,36 @@ export interface TreeItem {
   loaded?: boolean;
 }
 
+// Folder levels fetched per /tree request; deeper folders load on expand
+const TREE_DEPTH = 2;
+
+// Convert /tree entries to TreeItems (markdown files and folders only).
+// Folders the response expanded completely count as loaded.
+function toTreeItems(items: VaultTreeItem[]): TreeItem[] {
+  return items
+    .filter(item => item.type === 'directory' || item.name.endsWith('.md'))
+    .map(item => ({
+      id: item.path,
+      name: item.name,
+      type: item.type === 'directory' ? 'folder' as const : 'file' as const,
+      path: item.path,
+      children: item.type === 'directory' ? toTreeItems(item.children || []) : undefined,
+      loaded: item.children !== undefined && !item.next_cursor,
+    }));
+}
+
+// All entries of one folder, TREE_DEPTH levels deep, following next_cursor
+async function fetchFolder(path: string): Promise<TreeItem[]> {
+  const items: VaultTreeItem[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await api.getTree(path, TREE_DEPTH, cursor);
+    items.push(...page.items);
+    cursor = page.next_cursor || undefined;
+  } while (cursor);
+  return toTreeItems(items);
+}
+
 function TreeNode({
   item,
   depth = 0,
@@ -177,21 +207,7 @@ export function FileTree({ onFileDoubleClick, highlightedFilePath }: FileTreePro
     try {
       setIsLoading(true);
       setError(null);
-      const result = await api.listDirectory(path);
-      
-      // Convert API items to TreeItems
-      const items: TreeItem[] = result.items
-        .filter(item => item.type === 'directory' || item.name.endsWith('.md'))
-        .map((item, index) => ({
-          id: path ? `${path}/${item.name}` : item.name,
-          name: item.name,
-          type: item.type === 'directory' ? 'folder' as const : 'file' as const,
-          path: path ? `${path}/${item.name}` : item.name,
-          children: item.type === 'directory' ? [] : undefined,
-          loaded: false,
-        }));
-      
-      setFiles(items);
+      setFiles(await fetchFolder(path));
     } catch (error: any) {
       console.error('Error loading directory:', error);
       setError(error.message || 'Failed to load vault files');
@@ -204,19 +220,7 @@ export function FileTree({ onFileDoubleClick, highlightedFilePath }: FileTreePro
     if (!item.path || item.loaded) return;
     
     try {
-      const result = await api.listDirectory(item.path);
-      
-      // Convert API items to TreeItems
-      const children: TreeItem[] = result.items
-        .filter(child => child.type === 'directory' || child.name.endsWith('.md'))
-        .map(child => ({
-          id: `${item.path}/${child.name}`,
-          name: child.name,
-          type: child.type === 'directory' ? 'folder' as const : 'file' as const,
-          path: `${item.path}/${child.name}`,
-          children: child.type === 'directory' ? [] : undefined,
-          loaded: false,
-        }));
+      const children = await fetchFolder(item.path);
       
       // Update the tree with children
       setFiles(prevFiles => updateTreeItem(prevFiles, item.id, { 
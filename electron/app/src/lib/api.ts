@@ -55,6 +55,22 @@ export interface DirectoryListing {
   total: number;
 }
 
+export interface TreeItem extends DirectoryItem {
+  path: string;
+  children?: TreeItem[];
+  next_cursor?: string;
+}
+
+export interface VaultTree {
+  path: string;
+  depth: number;
+  items: TreeItem[];
+  item_count: number;
+  next_cursor: string | null;
+  files: number;
+  directories: number;
+}
+
 export interface Config {
   vault_path: string;
   port: number;
@@ -99,6 +115,7 @@ export interface CalendarSyncResult {
 
 class ApiClient {
   private baseUrl: string;
+  private treeCache = new Map<string, { etag: string; tree: VaultTree }>();
 
   constructor(baseUrl: string = API_BASE_URL) {
     this.baseUrl = baseUrl;
@@ -217,6 +234,28 @@ class ApiClient {
     return response.json();
   }
 
+  /**
+   * Vault tree `depth` levels deep in one request (304 reuses the cached tree)
+   */
+  async getTree(path: string = '', depth: number = 2, cursor?: string): Promise<VaultTree> {
+    const params = new URLSearchParams({ path, depth: String(depth) });
+    if (cursor) params.set('cursor', cursor);
+    const url = `${this.baseUrl}/tree?${params}`;
+    const cached = this.treeCache.get(url);
+    const response = await fetch(url, {
+      headers: cached ? { 'If-None-Match': cached.etag } : {},
+    });
+    if (response.status === 304 && cached) return cached.tree;
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.error || 'Failed to load tree');
+    }
+    const tree: VaultTree = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) this.treeCache.set(url, { etag, tree });
+    return tree;
+  }
+
   // ============================================================================
   // Generic Connector APIs (New Plugin System)
   // ============================================================================
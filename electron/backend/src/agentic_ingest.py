@@ -30,11 +30,24 @@ dotenv_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path)
 
 from utils.llm_client import LLMClient
-from utils.file_ops import read_file, write_file
+from utils.file_ops import read_file, read_json_citations
 from utils.fuzzy_matcher import find_best_section_match, find_similar_filename
+from utils.filename_index import get_filename_index
+from utils.citation_store import get_citation_store
+from utils.timestamps import normalize_timestamp
 from core.ingestion.content_analyzer import ContentAnalyzer
 from core.ingestion.file_modifier import FileModifier
 from core.ingestion.citation_manager import CitationManager
+from core.ingestion.near_duplicate import get_near_duplicate_index, simhash
+from core.ingestion.ingest_metrics import IngestMetrics
+from core.ingestion.edit_transaction import EditTransaction
+from core.ingestion.write_ahead_log import get_write_ahead_log
+from core.ingestion.long_document import LongDocumentCondenser
+
+
+# Minimum name similarity for redirecting an edit of a missing note to an
+# existing one in the same folder (one typo in a ~10 character name)
+FILENAME_MATCH_THRESHOLD = 0.85
 
 
 class MarkdownValidator:
@@ -43,16 +56,47 @@ class MarkdownValidator:
     @staticmethod
     def validate(file_path: Path) -> List[str]:
         """
-        Validate markdown file structure.
+        Validate markdown file structure on disk.
         
         Returns list of error messages (empty if valid).
         """
-        errors = []
-        
         if not file_path.exists():
             return [f"File does not exist: {file_path}"]
         
         content = read_file(file_path)
+        json_path = file_path.with_suffix('.json')
+        if not json_path.exists():
+            return MarkdownValidator.validate_content(file_path, content, None)
+        
+        try:
+            citation_data = read_json_citations(file_path)
+        except json.JSONDecodeError:
+            return MarkdownValidator.validate_content(
+                file_path, content, {}, json_error=f"Invalid JSON in {json_path.name}"
+            )
+        
+        return MarkdownValidator.validate_content(file_path, content, citation_data)
+    
+    @staticmethod
+    def validate_content(
+        file_path: Path,
+        content: str,
+        citation_data: Optional[Dict],
+        json_error: Optional[str] = None
+    ) -> List[str]:
+        """
+        Validate markdown content held in memory.
+        
+        Args:
+            file_path: Path of the file (used in messages)
+            content: Markdown content
+            citation_data: Parsed citation JSON, or None if there is no JSON file
+            json_error: Set if the JSON file exists but could not be parsed
+            
+        Returns:
+            List of error messages (empty if valid)
+        """
+        errors = []
         lines = content.split('\n')
         
         # Check title
@@ -72,29 +116,24 @@ class MarkdownValidator:
             unique_citations = sorted(set(citation_nums))
             
             # Check JSON file exists and has entries
-            json_path = file_path.with_suffix('.json')
-            if not json_path.exists():
-                errors.append(f"Missing citation file: {json_path.name}")
+            if citation_data is None:
+                errors.append(f"Missing citation file: {file_path.with_suffix('.json').name}")
+            elif json_error:
+                errors.append(json_error)
             else:
-                try:
-                    with open(json_path) as f:
-                        citation_data = json.load(f)
-                    
-                    # Verify all citations have JSON entries
-                    for num in unique_citations:
-                        if str(num) not in citation_data:
-                            errors.append(f"Citation [{num}] missing from JSON")
-                        else:
-                            # Validate JSON structure
-                            entry = citation_data[str(num)]
-                            required_fields = ['platform', 'timestamp', 'url', 'quote']
-                            for field in required_fields:
-                                if field not in entry:
-                                    errors.append(
-                                        f"Citation [{num}] missing field: {field}"
-                                    )
-                except json.JSONDecodeError:
-                    errors.append(f"Invalid JSON in {json_path.name}")
+                # Verify all citations have JSON entries
+                for num in unique_citations:
+                    if str(num) not in citation_data:
+                        errors.append(f"Citation [{num}] missing from JSON")
+                    else:
+                        # Validate JSON structure
+                        entry = citation_data[str(num)]
+                        required_fields = ['platform', 'timestamp', 'url', 'quote']
+                        for field in required_fields:
+                            if field not in entry:
+                                errors.append(
+                                    f"Citation [{num}] missing field: {field}"
+                                )
         
         # Check heading syntax
         heading_pattern = re.compile(r'^#{1,6}\s+.+')
@@ -121,24 +160,31 @@ class AgenticIngestionPipeline:
         self.vault_path = Path(vault_path)
         
         # Initialize Claude client
-        self.llm = LLMClient(model="claude-haiku-4-5-20251001")
+        self.model = "claude-haiku-4-5-20251001"
+        self.llm = LLMClient(model=self.model)
         
         # Initialize components
         self.analyzer = ContentAnalyzer(self.llm)
         self.modifier = FileModifier(self.llm)
-        self.citations = CitationManager()
+        self.citation_store = get_citation_store(self.vault_path)
+        self.citations = CitationManager(self.citation_store)
         self.validator = MarkdownValidator()
+        self.near_duplicates = get_near_duplicate_index(self.vault_path)
+        self.condenser = LongDocumentCondenser.from_env(self.llm)
+        # Replays edit sets interrupted by a crash before anything new is written
+        self.wal = get_write_ahead_log(self.vault_path)
         
         print(f"🤖 Initialized agentic ingestion pipeline")
         print(f"📂 Vault: {self.vault_path}")
-        print(f"🧠 Model: claude-haiku-4-5-20251001")
+        print(f"🧠 Model: {self.model}")
         print(f"✨ Features: fuzzy matching, validation, retry (95% success)\n")
     
     def ingest(
         self,
         context: str,
         source_metadata: Optional[Dict] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        dedupe: bool = True
     ) -> Dict:
         """
         Ingest content with retry loop and validation.
@@ -147,9 +193,11 @@ class AgenticIngestionPipeline:
             context: Text content to ingest
             source_metadata: Source info {platform, timestamp, url, quote}
             max_retries: Maximum retry attempts on validation failure
+            dedupe: Check for near-duplicate sources before calling the LLM
             
         Returns:
-            Dict with results {success, files_modified, files_created, errors}
+            Dict with results {success, files_modified, files_created, errors,
+            near_duplicate, metrics}
         """
         print(f"📥 Ingesting content...")
         print(f"   Context preview: {context[:100]}...\n")
@@ -163,6 +211,88 @@ class AgenticIngestionPipeline:
                 'quote': None
             }
         
+        # Mixed source formats (RFC 2822 email dates, offsets, epochs) -> ISO UTC,
+        # so citations sort and range-scan correctly in the time index
+        if source_metadata.get('timestamp'):
+            source_metadata = {
+                **source_metadata,
+                'timestamp': normalize_timestamp(source_metadata['timestamp'])
+            }
+        
+        metrics = IngestMetrics(self.llm, self.model)
+        
+        # Near-duplicate check (no LLM call)
+        fingerprint = simhash(context) if dedupe else None
+        near_duplicate = None
+        match = self.near_duplicates.query(fingerprint)
+        
+        if match:
+            score, entry = match
+            near_duplicate = {'similarity': round(score, 3), 'action': 'ingested'}
+            
+            if self.near_duplicates.is_duplicate(score):
+                print(f"♻️  Near-duplicate of source ingested {entry['timestamp']} (similarity {score:.2f})")
+                with metrics.span('citations', 1):
+                    result = self._ingest_citation_only(context, entry, source_metadata)
+                near_duplicate['action'] = 'citation_only' if result['files_modified'] else 'skipped'
+                result['near_duplicate'] = near_duplicate
+                result['metrics'] = metrics.summary()
+                return result
+        
+        # Long documents: map-reduce into fact digests instead of one huge prompt
+        analysis_contexts = [context]
+        if self.condenser.is_long(context):
+            with metrics.span('extract', 1) as span:
+                analysis_contexts = self.condenser.condense(context, source_metadata)
+                span['chars'] = len(context)
+                span['digests'] = len(analysis_contexts)
+            if not source_metadata.get('quote'):
+                source_metadata = {**source_metadata, 'quote': context[:200]}
+        
+        # Facts that didn't fit one digest are ingested as further digests
+        result = None
+        for analysis_context in analysis_contexts:
+            part = self._ingest_with_retries(analysis_context, source_metadata, max_retries, metrics)
+            result = part if result is None else self._combine_results(result, part)
+        result['near_duplicate'] = near_duplicate
+        result['metrics'] = metrics.summary()
+        self._print_metrics(result['metrics'])
+        
+        if result['success']:
+            self.near_duplicates.add(fingerprint, result.get('citations', {}))
+            self.near_duplicates.save()
+        
+        return result
+    
+    @staticmethod
+    def _combine_results(first: Dict, second: Dict) -> Dict:
+        """Merge the results of ingesting two digests of one document."""
+        def union(key):
+            return first.get(key, []) + [p for p in second.get(key, []) if p not in first.get(key, [])]
+        
+        return {
+            **first,
+            'success': first['success'] or second['success'],
+            'files_modified': union('files_modified'),
+            'files_created': union('files_created'),
+            'errors': first.get('errors', []) + second.get('errors', []),
+            'citations': {**second.get('citations', {}), **first.get('citations', {})}
+        }
+    
+    def _ingest_with_retries(
+        self,
+        context: str,
+        source_metadata: Dict,
+        max_retries: int,
+        metrics: IngestMetrics
+    ) -> Dict:
+        """
+        Run ingestion attempts until edits are applied, then validate.
+        
+        Each attempt buffers its edits in an EditTransaction; nothing is
+        written until validation (and any repairs) ran on the buffers. Only
+        an attempt that applied nothing is re-run in full.
+        """
         # Retry loop
         for attempt in range(max_retries):
             print(f"{'='*60}")
@@ -170,43 +300,23 @@ class AgenticIngestionPipeline:
             print(f"{'='*60}\n")
             
             try:
-                result = self._ingest_attempt(context, source_metadata)
+                txn = EditTransaction(self.validator.validate_content, self.wal, self.citation_store)
+                result = self._ingest_attempt(context, source_metadata, metrics, txn, attempt + 1)
                 
                 if result['success']:
-                    # Validate all modified files
-                    validation_errors = self._validate_all_files(result)
-                    
-                    if not validation_errors:
-                        print(f"\n✅ SUCCESS on attempt {attempt + 1}")
-                        return result
-                    
-                    # Validation failed, try to fix
-                    print(f"\n⚠️  Validation errors on attempt {attempt + 1}:")
-                    for error in validation_errors:
-                        print(f"   - {error}")
-                    
-                    if attempt < max_retries - 1:
-                        # Feed errors back for retry
-                        context = self._create_retry_context(
-                            context,
-                            validation_errors,
-                            source_metadata
-                        )
-                        print(f"\n🔁 Retrying with error feedback...\n")
-                    else:
-                        result['errors'].extend(validation_errors)
-                        return result
+                    result = self._validate_and_repair(result, txn, attempt + 1, max_retries, metrics)
+                    return self._commit(result, txn, attempt, metrics)
+                
+                # Ingestion failed
+                print(f"\n❌ Attempt {attempt + 1} failed: {result['errors']}")
+                if attempt < max_retries - 1:
+                    context = self._create_retry_context(
+                        context,
+                        result['errors'],
+                        source_metadata
+                    )
                 else:
-                    # Ingestion failed
-                    print(f"\n❌ Attempt {attempt + 1} failed: {result['errors']}")
-                    if attempt < max_retries - 1:
-                        context = self._create_retry_context(
-                            context,
-                            result['errors'],
-                            source_metadata
-                        )
-                    else:
-                        return result
+                    return result
                         
             except Exception as e:
                 error_msg = f"Attempt {attempt + 1} exception: {str(e)}"
@@ -229,8 +339,131 @@ class AgenticIngestionPipeline:
             'errors': [f'Max retries ({max_retries}) exceeded']
         }
     
-    def _ingest_attempt(self, context: str, source_metadata: Dict) -> Dict:
-        """Single ingestion attempt."""
+    def _validate_and_repair(
+        self,
+        result: Dict,
+        txn: EditTransaction,
+        attempt: int,
+        max_retries: int,
+        metrics: IngestMetrics
+    ) -> Dict:
+        """
+        Validate buffered files and repair only the ones with errors.
+        
+        Only errors introduced by this transaction count: a note that was
+        already invalid before the ingest is neither repaired nor reported
+        for its old errors. Each repair round sends the LLM just the broken
+        file and its new errors, applies the returned line fixes to the
+        buffer, and re-validates those files. Files still failing are left
+        in result['invalid_files'].
+        """
+        files = None  # all changed buffers
+        
+        while True:
+            with metrics.span('validate', attempt):
+                # Errors a note already had are not this ingest's to repair
+                file_errors = txn.introduced_errors(txn.validate(files))
+            
+            if not file_errors:
+                print(f"\n✅ SUCCESS on attempt {attempt}")
+                result['invalid_files'] = []
+                return result
+            
+            validation_errors = [
+                f"{path.name}: {error}"
+                for path, errors in file_errors.items()
+                for error in errors
+            ]
+            print(f"\n⚠️  Validation errors on attempt {attempt}:")
+            for error in validation_errors:
+                print(f"   - {error}")
+            
+            if attempt >= max_retries:
+                result['errors'].extend(validation_errors)
+                result['invalid_files'] = list(file_errors)
+                return result
+            
+            attempt += 1
+            print(f"\n🔁 Repairing {len(file_errors)} file(s) (attempt {attempt}/{max_retries})...\n")
+            
+            with metrics.span('retry', attempt) as span:
+                span['files'] = len(file_errors)
+                for path, errors in file_errors.items():
+                    self._repair_file(txn, path, errors)
+            
+            # Files that passed stay as they are; only re-check repaired ones
+            files = list(file_errors)
+    
+    def _repair_file(self, txn: EditTransaction, file_path: Path, errors: List[str]) -> None:
+        """Apply a minimal LLM-planned fix to one buffered file that failed validation."""
+        buf = txn.open(file_path)
+        if not buf.exists:
+            return
+        
+        citation_numbers = sorted(buf.citations.keys(), key=int)
+        operations = self.modifier.determine_repairs(
+            file_path, errors, citation_numbers, content=buf.content
+        )
+        
+        if not operations:
+            print(f"   No repair operations for {file_path.name}")
+            return
+        
+        repaired = self.modifier.apply_repairs(buf.content, operations)
+        
+        if repaired != buf.content:
+            buf.content = repaired
+            print(f"   🔧 Repaired {file_path.name} ({len(operations)} operation(s))")
+    
+    def _commit(
+        self,
+        result: Dict,
+        txn: EditTransaction,
+        attempt: int,
+        metrics: IngestMetrics
+    ) -> Dict:
+        """
+        Write validated buffers to disk (one atomic write per changed file).
+        
+        Files whose buffers gained validation errors are not written and are
+        dropped from the result, so a failed edit never reaches the vault.
+        """
+        invalid = result.pop('invalid_files', [])
+        
+        with metrics.span('commit', attempt + 1) as span:
+            committed = txn.commit(skip=invalid)
+            self.citation_store.export_sidecars()
+            span['files'] = len(committed)
+        
+        # Keep the filename index current without rescanning the vault
+        index = get_filename_index(self.vault_path)
+        for path in committed:
+            if not txn.buffers[path].existed:
+                index.add(path.relative_to(self.vault_path).as_posix())
+        
+        if invalid:
+            skipped = {str(path) for path in invalid}
+            print(f"\n🚫 Not written (validation failed): {', '.join(p.name for p in invalid)}")
+            result['files_modified'] = [p for p in result['files_modified'] if p not in skipped]
+            result['files_created'] = [p for p in result['files_created'] if p not in skipped]
+            result['citations'] = {
+                rel: num for rel, num in result.get('citations', {}).items()
+                if str(self.vault_path / rel) not in skipped
+            }
+            result['success'] = bool(committed)
+        
+        print(f"💾 Wrote {len(committed)} file(s)")
+        return result
+    
+    def _ingest_attempt(
+        self,
+        context: str,
+        source_metadata: Dict,
+        metrics: IngestMetrics,
+        txn: EditTransaction,
+        attempt: int = 1
+    ) -> Dict:
+        """Single ingestion attempt. Edits are applied to `txn` buffers only."""
         results = {
             'success': False,
             'files_modified': [],
@@ -240,11 +473,13 @@ class AgenticIngestionPipeline:
         
         # STEP 1: Analyze and create edit plans
         print("🎯 Analyzing content...")
-        analysis = self.analyzer.analyze_and_route(
-            self.vault_path,
-            context,
-            source_metadata
-        )
+        with metrics.span('analyze', attempt) as span:
+            analysis = self.analyzer.analyze_and_route(
+                self.vault_path,
+                context,
+                source_metadata
+            )
+            span['edit_plans'] = len(analysis['edits'])
         
         source_citation = analysis['source_citation']
         edit_plans = analysis['edits']
@@ -261,42 +496,58 @@ class AgenticIngestionPipeline:
         
         # STEP 2: Apply each edit
         print()
-        for plan in edit_plans:
-            file_path = self.vault_path / plan['file']
-            action = plan['action']
-            content = plan.get('content', '')
-            
-            print(f"📝 Processing: {plan['file']}")
-            
-            try:
-                if action == 'create':
-                    success = self._create_file(file_path, content, plan)
-                    if success:
-                        results['files_created'].append(str(file_path))
+        with metrics.span('apply', attempt):
+            for plan in edit_plans:
+                action = plan['action']
+                content = plan.get('content', '')
                 
-                elif action in ['append', 'modify']:
-                    success = self._edit_file(file_path, content, plan)
-                    if success:
-                        results['files_modified'].append(str(file_path))
+                # Map misspelled note names from the LLM ("job-search.md",
+                # "Job Seach.md") to the closest existing note in the same
+                # folder - other folders or looser matches could redirect
+                # the edit into an unrelated note
+                if action != 'create' and not (self.vault_path / plan['file']).exists():
+                    match = find_similar_filename(
+                        self.vault_path, plan['file'], threshold=FILENAME_MATCH_THRESHOLD, same_folder=True
+                    )
+                    if match:
+                        print(f"   ↪️  Redirected {action} from '{plan['file']}' to existing note '{match}'")
+                        plan['file'] = match
                 
-                elif action == 'update_citation':
-                    # Add citation to existing fact
-                    success = self._update_citation(file_path, plan, source_citation)
-                    if success:
-                        results['files_modified'].append(str(file_path))
-            
-            except Exception as e:
-                error_msg = f"Error processing {plan['file']}: {str(e)}"
-                print(f"   ⚠️  {error_msg}")
-                results['errors'].append(error_msg)
+                file_path = self.vault_path / plan['file']
+                print(f"📝 Processing: {plan['file']}")
+                
+                try:
+                    if action == 'create':
+                        success = self._create_file(txn, file_path, content, plan)
+                        if success:
+                            results['files_created'].append(str(file_path))
+                
+                    elif action in ['append', 'modify']:
+                        success = self._edit_file(txn, file_path, content, plan)
+                        if success:
+                            results['files_modified'].append(str(file_path))
+                
+                    elif action == 'update_citation':
+                        # Add citation to existing fact
+                        success = self._update_citation(txn, file_path, plan, source_citation)
+                        if success:
+                            results['files_modified'].append(str(file_path))
+                
+                except Exception as e:
+                    error_msg = f"Error processing {plan['file']}: {str(e)}"
+                    print(f"   ⚠️  {error_msg}")
+                    results['errors'].append(error_msg)
         
         # STEP 3: Add citations
         print()
         print("📚 Adding citations...")
-        files_with_citation = self._add_citation_to_files(
-            edit_plans,
-            source_citation
-        )
+        with metrics.span('citations', attempt):
+            files_with_citation = self._add_citation_to_files(
+                txn,
+                edit_plans,
+                source_citation
+            )
+        results['citations'] = files_with_citation
         print(f"   ✅ Added citation to {len(files_with_citation)} file(s)")
         
         # Success if we made changes OR if no edits (duplicate detection)
@@ -309,8 +560,21 @@ class AgenticIngestionPipeline:
         
         return results
     
-    def _create_file(self, file_path: Path, content: str, plan: Dict) -> bool:
-        """Create new file with content."""
+    def _print_metrics(self, metrics: Dict) -> None:
+        """Print a one-line-per-stage timing summary."""
+        print(f"\n⏱️  Stage timings:")
+        for stage, stats in metrics['stages'].items():
+            print(
+                f"   {stage:<10} {stats['wall_ms']:>9.1f}ms  x{stats['count']}  "
+                f"tokens in/out {stats['input_tokens']}/{stats['output_tokens']}  "
+                f"{stats['bytes_written']}B written"
+            )
+        totals = metrics['totals']
+        cost = f"${totals['cost_usd']:.4f}" if totals['cost_usd'] is not None else "n/a"
+        print(f"   total      {totals['wall_ms']:>9.1f}ms  attempts {totals['attempts']}  cost {cost}")
+    
+    def _create_file(self, txn: EditTransaction, file_path: Path, content: str, plan: Dict) -> bool:
+        """Create new file with content (in the transaction buffer)."""
         print(f"   Creating new file...")
         
         filename = file_path.stem
@@ -324,24 +588,23 @@ class AgenticIngestionPipeline:
 
 """
         
-        # Write file
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        write_file(file_path, full_content)
+        txn.open(file_path).content = full_content
         print(f"   ✅ Created: {file_path.name}")
         
         return True
     
-    def _edit_file(self, file_path: Path, content: str, plan: Dict) -> bool:
+    def _edit_file(self, txn: EditTransaction, file_path: Path, content: str, plan: Dict) -> bool:
         """Edit existing file by appending content."""
         print(f"   Appending to file...")
         
+        buf = txn.open(file_path)
+        
         # Check if file exists
-        if not file_path.exists():
+        if not buf.exists:
             print(f"   File doesn't exist, creating instead...")
-            return self._create_file(file_path, content, plan)
+            return self._create_file(txn, file_path, content, plan)
         
-        # Read existing content
-        existing = read_file(file_path)
+        existing = buf.content
         
         # Simple append before ## Related section
         if '## Related' in existing:
@@ -351,21 +614,27 @@ class AgenticIngestionPipeline:
             # Append at end
             new_content = f"{existing}\n\n{content}\n"
         
-        # Write updated file
-        write_file(file_path, new_content)
+        buf.content = new_content
         print(f"   ✅ Updated: {file_path.name}")
         
         return True
     
-    def _update_citation(self, file_path: Path, plan: Dict, source_citation: Dict) -> bool:
+    def _update_citation(
+        self,
+        txn: EditTransaction,
+        file_path: Path,
+        plan: Dict,
+        source_citation: Dict
+    ) -> bool:
         """Update existing text to add citation reference."""
         print(f"   Updating citation on existing fact...")
         
-        if not file_path.exists():
+        buf = txn.open(file_path)
+        
+        if not buf.exists:
             print(f"   File doesn't exist, skipping...")
             return False
         
-        content = read_file(file_path)
         search_text = plan.get('search_text', '')
         replace_with = plan.get('replace_with', '')
         
@@ -373,39 +642,35 @@ class AgenticIngestionPipeline:
             print(f"   Missing search_text or replace_with, skipping...")
             return False
         
-        if search_text not in content:
+        if search_text not in buf.content:
             print(f"   Search text not found, skipping...")
             return False
         
-        # Get next citation number
-        existing_citations = self.citations.get_citations(file_path)
-        next_num = max([int(k) for k in existing_citations.keys()], default=0) + 1
-        
-        # Add citation JSON entry
-        new_citation = {
-            str(next_num): {
-                'platform': source_citation.get('platform', 'Manual'),
-                'timestamp': source_citation.get('timestamp', ''),
-                'url': source_citation.get('url'),
-                'quote': source_citation.get('quote', '')
-            }
-        }
-        self.citations.add_citations(file_path, new_citation)
+        # Add citation JSON entry under the next free number
+        next_num = buf.add_citation({
+            'platform': source_citation.get('platform', 'Manual'),
+            'timestamp': source_citation.get('timestamp', ''),
+            'url': source_citation.get('url'),
+            'quote': source_citation.get('quote', '')
+        })
         
         # Replace [NEW] placeholder with the actual citation number
         # LLM uses [NEW] as placeholder to avoid replacing existing citations
         replace_with_correct = replace_with.replace('[NEW]', f'[{next_num}]')
         
-        # Replace and write
-        new_content = content.replace(search_text, replace_with_correct)
-        write_file(file_path, new_content)
+        buf.content = buf.content.replace(search_text, replace_with_correct)
         print(f"   ✅ Updated citation in: {file_path.name} (added [{next_num}])")
         
         return True
     
-    def _add_citation_to_files(self, edit_plans: list, source_citation: dict) -> list:
-        """Add ONE citation to each file that references it."""
-        files_updated = []
+    def _add_citation_to_files(self, txn: EditTransaction, edit_plans: list, source_citation: dict) -> dict:
+        """
+        Add ONE citation to each file that references it.
+        
+        Returns:
+            Dict of {relative_path: citation_number} for each file cited
+        """
+        files_updated = {}
         
         for plan in edit_plans:
             # Skip update_citation actions (they don't add new citations)
@@ -418,50 +683,73 @@ class AgenticIngestionPipeline:
             if '[1]' not in plan.get('content', ''):
                 continue
             
-            # Get next available citation number
-            existing_citations = self.citations.get_citations(file_path)
-            next_num = max([int(k) for k in existing_citations.keys()], default=0) + 1
-            
-            # Add citation
-            new_citation = {
-                str(next_num): {
-                    'platform': source_citation.get('platform', 'Manual'),
-                    'timestamp': source_citation.get('timestamp', ''),
-                    'url': source_citation.get('url'),
-                    'quote': source_citation.get('quote', '')
-                }
-            }
-            
-            self.citations.add_citations(file_path, new_citation)
-            files_updated.append(plan['file'])
+            # Add citation under the next available number
+            buf = txn.open(file_path)
+            next_num = buf.add_citation({
+                'platform': source_citation.get('platform', 'Manual'),
+                'timestamp': source_citation.get('timestamp', ''),
+                'url': source_citation.get('url'),
+                'quote': source_citation.get('quote', '')
+            })
+            files_updated[plan['file']] = next_num
             
             # Update ONLY the newly added content to use correct citation number
             # Replace [1] only in the exact content we just added
-            if next_num != 1:
-                content = read_file(file_path)
+            if next_num != 1 and buf.exists:
                 # Replace [1] with [next_num] only in the newly added text
                 new_content_with_correct_num = plan.get('content', '').replace('[1]', f'[{next_num}]')
                 # Now replace the old content with the corrected version
-                updated = content.replace(plan.get('content', ''), new_content_with_correct_num)
-                write_file(file_path, updated)
+                buf.content = buf.content.replace(plan.get('content', ''), new_content_with_correct_num)
         
         return files_updated
     
-    def _validate_all_files(self, result: Dict) -> List[str]:
-        """Validate all modified/created files."""
-        all_errors = []
+    def _ingest_citation_only(
+        self,
+        context: str,
+        match: Dict,
+        source_metadata: Dict
+    ) -> Dict:
+        """
+        Cheap path for near-duplicates: cite the new source next to the
+        facts written for the earlier source, e.g. "[2]" becomes "[2][5]".
         
-        files_to_check = result['files_modified'] + result['files_created']
+        Skips (success with no changes) if the earlier facts are gone.
+        """
+        results = {
+            'success': True,
+            'files_modified': [],
+            'files_created': [],
+            'errors': []
+        }
+        txn = EditTransaction(self.validator.validate_content, self.wal, self.citation_store)
         
-        for file_path_str in files_to_check:
-            file_path = Path(file_path_str)
-            errors = self.validator.validate(file_path)
+        for relative_path, original_num in match['files'].items():
+            file_path = self.vault_path / relative_path
+            if not file_path.exists():
+                continue
             
-            if errors:
-                for error in errors:
-                    all_errors.append(f"{file_path.name}: {error}")
+            buf = txn.open(file_path)
+            marker = f'[{original_num}]'
+            if marker not in buf.content:
+                continue
+            
+            next_num = buf.add_citation({
+                'platform': source_metadata.get('platform', 'Manual'),
+                'timestamp': source_metadata.get('timestamp', ''),
+                'url': source_metadata.get('url'),
+                'quote': source_metadata.get('quote') or context[:200]
+            })
+            buf.content = buf.content.replace(marker, f'{marker}[{next_num}]')
+            results['files_modified'].append(str(file_path))
+            print(f"   ✅ Added citation [{next_num}] in: {file_path.name}")
+        
+        txn.commit()
+        self.citation_store.export_sidecars()
+        
+        if not results['files_modified']:
+            print(f"\n💡 Skipped - near-duplicate of existing content")
         
-        return all_errors
+        return results
     
     def _create_retry_context(
         self,
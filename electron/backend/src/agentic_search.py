@@ -10,18 +10,44 @@ Model: claude-haiku-4-5-20251001 (same as ingestion)
 
 import subprocess
 import json
+from time import perf_counter
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 
-import os
-from anthropic import Anthropic
-
 try:
     from src.utils.file_ops import read_file
+    from src.utils.llm_governor import INTERACTIVE, create_message, get_anthropic_client
+    from src.utils.citation_store import get_citation_store
+    from src.utils.temporal_index import TemporalIndex
+    from src.utils.timestamps import describe_range, find_time_range, parse_time_range
+    from src.utils.metrics import REGISTRY
+    from src.utils.tracing import start_span, traced
+    from src.utils.note_reader import read_window, referenced_citations, format_toc
 except ImportError:
     # Fallback for direct execution
     from utils.file_ops import read_file
+    from utils.llm_governor import INTERACTIVE, create_message, get_anthropic_client
+    from utils.citation_store import get_citation_store
+    from utils.temporal_index import TemporalIndex
+    from utils.timestamps import describe_range, find_time_range, parse_time_range
+    from utils.metrics import REGISTRY
+    from utils.tracing import start_span, traced
+    from utils.note_reader import read_window, referenced_citations, format_toc
+
+
+TOOL_CALLS = REGISTRY.counter(
+    'localbrain_search_tool_calls_total', 'Search agent tool calls', ('tool',)
+)
+TOOL_LATENCY = REGISTRY.histogram(
+    'localbrain_search_tool_duration_seconds', 'Search agent tool call latency', ('tool',)
+)
+SEARCH_ITERATIONS = REGISTRY.histogram(
+    'localbrain_search_iterations', 'LLM round trips per search', buckets=range(1, 11)
+)
+
+# read_file without a section returns at most this many lines (plus the TOC)
+READ_FILE_MAX_LINES = 300
 
 
 class Search:
@@ -39,18 +65,16 @@ class Search:
         self.vault_path = Path(vault_path)
         self.model = model
         
-        # Initialize Anthropic client
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment")
-        self.client = Anthropic(api_key=api_key)
+        # Shared Anthropic client (raises if ANTHROPIC_API_KEY is missing)
+        self.client = get_anthropic_client()
         
+    @traced('search')
     def search(self, query: str, max_results: int = 5) -> Dict:
         """
         Agentic search using LLM with grep and read tools.
         
         Flow:
-        1. Give LLM tools: grep_vault, read_file
+        1. Give LLM tools: grep_vault, read_file, search_by_time
         2. LLM decides what to search for
         3. LLM reads relevant files
         4. LLM synthesizes answer
@@ -62,7 +86,8 @@ class Search:
 
 Tools:
 - grep_vault(pattern) - Search files, returns matches with line numbers
-- read_file(filepath) - Read file
+- read_file(filepath, section?, around_line?) - Read a file, one section, or the section around a grep hit line; large files come back truncated with a table of contents
+- search_by_time(range, pattern) - Facts whose sources fall in a time range, oldest first
 
 IMPORTANT: Minimize output. Answer directly without explanation.
 
@@ -74,9 +99,10 @@ Q: Which device first, Samsung S22 or Dell XPS?
 Answer: Samsung Galaxy S22
 
 Strategy:
+0. For "when"/"last month"/"before X" questions, use search_by_time (or the dated facts given) instead of grepping for dates
 1. Grep for key terms
 2. Check line numbers and dates
-3. Read files ONLY if grep insufficient
+3. Read files ONLY if grep insufficient - prefer around_line=<grep line> or section over whole files
 4. Answer with facts, no hedging
 
 Vault: {self.vault_path}"""
@@ -102,15 +128,45 @@ Vault: {self.vault_path}"""
                     "required": ["pattern"]
                 }
             },
+            {
+                "name": "search_by_time",
+                "description": "List facts whose sources are dated within a time range (index lookup, oldest first). Each fact has its normalized UTC timestamp, file, section and line.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "range": {
+                            "type": "string",
+                            "description": "Time range, e.g. 'last month', 'past 2 weeks', 'before March 2024', 'in 2023', 'between Jan 2024 and March 2024'"
+                        },
+                        "pattern": {
+                            "type": "string",
+                            "description": "Optional regex the fact must match (case-insensitive)"
+                        },
+                        "platform": {
+                            "type": "string",
+                            "description": "Optional source platform, e.g. 'Gmail'"
+                        }
+                    },
+                    "required": ["range"]
+                }
+            },
             {
                 "name": "read_file",
-                "description": "Read the full contents of a markdown file from the vault.",
+                "description": f"Read a markdown file from the vault: one section, the section around a line, or the whole file (files over {READ_FILE_MAX_LINES} lines are truncated and include a table of contents to pick a section from).",
                 "input_schema": {
                     "type": "object",
                     "properties": {
                         "filepath": {
                             "type": "string",
                             "description": "Path to file relative to vault (e.g. 'career/Job Search.md')"
+                        },
+                        "section": {
+                            "type": "string",
+                            "description": "Heading to read (case-insensitive substring), including its subsections"
+                        },
+                        "around_line": {
+                            "type": "integer",
+                            "description": "Line number (e.g. from grep_vault); returns the section containing it"
                         }
                     },
                     "required": ["filepath"]
@@ -118,17 +174,34 @@ Vault: {self.vault_path}"""
             }
         ]
         
+        # Time-scoped question: hand the model the facts in range up front
+        # (one index scan) instead of letting it grep for dates
+        seeded = None
+        time_range = find_time_range(query)
+        if time_range:
+            expression, bounds = time_range
+            seeded = self._search_by_time(bounds)
+            print(f"  🕒 Time range '{expression}' ({describe_range(bounds)}): {seeded['count']} fact(s)")
+        
         # Run agentic loop
-        messages = [{"role": "user", "content": query}]
+        first_message = query
+        if seeded and seeded['facts']:
+            first_message = f"""{query}
+
+FACTS DATED {seeded['range'].upper()} (from the time index):
+{self._format_facts(seeded['facts'])}"""
+        messages = [{"role": "user", "content": first_message}]
         
         max_iterations = 10  # Prevent infinite loops
         iteration = 0
         
         while iteration < max_iterations:
             iteration += 1
+            iteration_span = start_span('search.iteration', iteration=iteration)
             
-            # Call LLM with tools
-            response = self.client.messages.create(
+            # Call LLM with tools (interactive lane: ahead of background ingestion)
+            response = create_message(
+                priority=INTERACTIVE,
                 model=self.model,
                 max_tokens=4000,
                 messages=messages,
@@ -156,15 +229,36 @@ Vault: {self.vault_path}"""
                         print(f"  🔧 Tool call: {tool_name}({tool_input})")
                         
                         # Execute tool
+                        tool_started = perf_counter()
+                        tool_span = start_span(f'tool.{tool_name}', input=tool_input)
                         if tool_name == "grep_vault":
                             result = self._grep_vault(
                                 pattern=tool_input['pattern'],
                                 limit=tool_input.get('limit', 20)
                             )
                         elif tool_name == "read_file":
-                            result = self._read_file(tool_input['filepath'])
+                            result = self._read_file(
+                                tool_input['filepath'],
+                                section=tool_input.get('section'),
+                                around_line=tool_input.get('around_line')
+                            )
+                        elif tool_name == "search_by_time":
+                            bounds = parse_time_range(tool_input['range'])
+                            if bounds is None:
+                                result = {"error": f"Unrecognized time range: {tool_input['range']}"}
+                            else:
+                                result = self._search_by_time(
+                                    bounds,
+                                    pattern=tool_input.get('pattern'),
+                                    platform=tool_input.get('platform')
+                                )
                         else:
                             result = {"error": f"Unknown tool: {tool_name}"}
+                        TOOL_CALLS.labels(tool_name).inc()
+                        TOOL_LATENCY.labels(tool_name).observe(perf_counter() - tool_started)
+                        if 'error' in result:
+                            tool_span.set(error=result['error'])
+                        tool_span.end()
                         
                         tool_results.append({
                             "type": "tool_result",
@@ -177,13 +271,19 @@ Vault: {self.vault_path}"""
                     "role": "user",
                     "content": tool_results
                 })
+                iteration_span.set(tool_calls=len(tool_results))
+                iteration_span.end()
                 
             else:
                 # LLM is done - extract context chunks
+                iteration_span.end()
                 print(f"✅ Search complete ({iteration} iterations)")
+                SEARCH_ITERATIONS.observe(iteration)
                 
                 # Extract files that were read
                 contexts = self._extract_contexts(messages)
+                if seeded:
+                    contexts = self._facts_to_contexts(seeded['facts']) + contexts
                 
                 return {
                     "success": True,
@@ -260,6 +360,11 @@ Vault: {self.vault_path}"""
                                     seen_files.add(file)
                         continue
                     
+                    # Handle search_by_time results
+                    if "facts" in result:
+                        contexts.extend(self._facts_to_contexts(result["facts"]))
+                        continue
+                    
                     # Handle read_file results
                     
                     if "content" not in result or "filepath" not in result:
@@ -437,8 +542,66 @@ Vault: {self.vault_path}"""
             "pattern": pattern
         }
     
-    def _read_file(self, filepath: str) -> Dict:
-        """Read a file from the vault."""
+    def _search_by_time(
+        self,
+        bounds,
+        pattern: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 40
+    ) -> Dict:
+        """Facts sourced within (start, end) epoch bounds, via the time index."""
+        try:
+            facts = TemporalIndex(self.vault_path).facts(
+                start=bounds[0],
+                end=bounds[1],
+                platform=platform,
+                pattern=pattern,
+                limit=limit
+            )
+        except Exception as e:
+            return {"error": str(e)}
+        
+        return {
+            "range": describe_range(bounds),
+            "facts": [
+                {key: fact[key] for key in ('timestamp', 'file', 'section', 'line', 'text', 'platform', 'citation')}
+                for fact in facts
+            ],
+            "count": len(facts)
+        }
+    
+    def _format_facts(self, facts: List[Dict]) -> str:
+        """One line per fact: '- [2024-10-01T19:00:00Z] file § section: text'."""
+        lines = []
+        for fact in facts:
+            section = f" § {fact['section']}" if fact.get('section') else ""
+            lines.append(f"- [{fact['timestamp']}] {fact['file']}{section}: {fact['text']}")
+        return "\n".join(lines)
+    
+    def _facts_to_contexts(self, facts: List[Dict]) -> List[Dict]:
+        """Time-index facts as search contexts, one per fact line."""
+        return [
+            {
+                "file": fact['file'],
+                "text": fact['text'],
+                "line_number": fact['line'],
+                "citations": [{
+                    "id": fact['citation'],
+                    "platform": fact.get('platform'),
+                    "timestamp": fact['timestamp']
+                }]
+            }
+            for fact in facts
+        ]
+    
+    def _read_file(self, filepath: str, section: Optional[str] = None, around_line: Optional[int] = None) -> Dict:
+        """
+        Read a file (or one section of it) from the vault.
+        
+        Markdown files are cut with the cached heading index: a section,
+        the section around a line, or the first READ_FILE_MAX_LINES lines.
+        Partial reads carry the file's table of contents.
+        """
         try:
             file_path = self.vault_path / filepath
             
@@ -448,23 +611,38 @@ Vault: {self.vault_path}"""
             if not file_path.is_relative_to(self.vault_path):
                 return {"error": "Access denied: file outside vault"}
             
-            content = read_file(file_path)
+            if file_path.suffix != '.md':
+                content = read_file(file_path)
+                return {
+                    "filepath": filepath,
+                    "content": content,
+                    "citations": {},
+                    "length": len(content)
+                }
             
-            # Also read citations if available
-            json_path = file_path.with_suffix('.json')
-            citations = {}
-            if json_path.exists():
-                try:
-                    citations = json.loads(read_file(json_path))
-                except:
-                    pass
+            try:
+                if section or around_line:
+                    window = read_window(file_path, section=section, around_line=around_line, include_toc=True)
+                else:
+                    window = read_window(file_path, lines=f"1-{READ_FILE_MAX_LINES}", include_toc=True)
+            except LookupError as e:
+                outline = read_window(file_path, include_toc=True, include_content=False)
+                return {"error": str(e), "toc": format_toc(outline['toc'])}
             
-            return {
+            content = window['content']
+            citations = get_citation_store(self.vault_path).get(file_path) or {}
+            result = {
                 "filepath": filepath,
                 "content": content,
-                "citations": citations,
+                "citations": referenced_citations(content, citations),
                 "length": len(content)
             }
+            if window['start_line'] > 1 or window['end_line'] < window['total_lines']:
+                result["lines"] = f"{window['start_line']}-{window['end_line']} of {window['total_lines']}"
+                if window['section']:
+                    result["section"] = window['section']
+                result["toc"] = format_toc(window['toc'])
+            return result
             
         except Exception as e:
             return {"error": str(e)}
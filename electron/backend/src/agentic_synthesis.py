@@ -7,6 +7,8 @@ Supports multi-turn conversations with context awareness.
 
 from typing import List, Dict, Optional
 from utils.llm_client import LLMClient
+from utils.llm_governor import INTERACTIVE
+from utils.tracing import traced
 
 
 class AnswerSynthesizer:
@@ -17,8 +19,9 @@ class AnswerSynthesizer:
 
     def __init__(self, model: str = "claude-haiku-4-5-20251001"):
         """Initialize synthesizer with LLM client."""
-        self.llm = LLMClient(model=model)
+        self.llm = LLMClient(model=model, priority=INTERACTIVE)
 
+    @traced('synthesize')
     def synthesize(
         self,
         query: str,
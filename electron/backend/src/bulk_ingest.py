@@ -2,25 +2,37 @@
 Bulk ingestion pipeline for LocalBrain.
 
 Optimized for ingesting large amounts of content quickly by:
-1. Batching similar content together
+1. Batching similar content together (pluggable strategies, see
+   core/ingestion/batching.py)
 2. Single LLM call per batch
-3. Parallel processing when safe
+3. Planning batches concurrently, applying them in parallel unless they
+   target the same file
 """
 
 import json
 import os
+import time
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Set, Union
 from datetime import datetime
-from collections import defaultdict
 from dotenv import load_dotenv
 
 # Load environment
 dotenv_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path)
 
-from anthropic import Anthropic
 from utils.file_ops import read_file, write_file
+from utils.llm_governor import BACKGROUND, create_message, get_anthropic_client
+from utils.llm_client import LLMClient
+from core.ingestion.batching import BatchingStrategy, get_batching_strategy, PROMPT_CHARS_PER_ITEM
+from core.ingestion.long_document import LongDocumentCondenser, LONG_DOCUMENT_CHARS
+from core.ingestion.edit_transaction import EditTransaction, FileBuffer
+from core.ingestion.write_ahead_log import get_write_ahead_log
+from utils.citation_store import get_citation_store
+from utils.timestamps import normalize_timestamp
 
 
 class BulkIngestionPipeline:
@@ -29,30 +41,70 @@ class BulkIngestionPipeline:
     def __init__(self, vault_path: Path, model: str = "claude-haiku-4-5-20251001"):
         self.vault_path = Path(vault_path)
         self.model = model
-        self.client = Anthropic()
+        self.client = get_anthropic_client()
+        
+        # Long documents (same threshold as single-item ingestion) are
+        # condensed into a digest that fits the per-item prompt budget;
+        # ordinary items over the budget are just truncated
+        self.condenser = LongDocumentCondenser.from_env(
+            LLMClient(model=model),
+            max_merge_chars=PROMPT_CHARS_PER_ITEM,
+            max_reduce_rounds=1
+        )
+        
+        # Per-file locks serializing the apply phase of concurrent batches
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
         
         # Ensure vault exists
         self.vault_path.mkdir(parents=True, exist_ok=True)
         
+        # Batch edits are logged before they are applied (crash recovery)
+        self.wal = get_write_ahead_log(self.vault_path)
+        self.citation_store = get_citation_store(self.vault_path)
+        
         print(f"🚀 Initialized bulk ingestion pipeline")
         print(f"📂 Vault: {vault_path}")
         print(f"🧠 Model: {model}")
     
-    def bulk_ingest(self, items: List[Dict[str, Any]], batch_size: int = 10) -> Dict:
+    def bulk_ingest(
+        self,
+        items: List[Dict[str, Any]],
+        batch_size: int = 10,
+        max_workers: int = 4,
+        batching: Optional[Union[str, BatchingStrategy]] = None,
+        condense_long_items: bool = True,
+        on_batch_committed: Optional[Callable[[List[int]], None]] = None
+    ) -> Dict:
         """
         Ingest multiple items efficiently.
         
+        Batches are planned concurrently (one LLM call each, bounded by
+        max_workers and the shared LLM governor). Applying a plan locks the
+        files it targets, so plans touching the same file apply one after
+        another while plans for disjoint files apply in parallel.
+        
         Args:
             items: List of {text, metadata} dicts
             batch_size: Number of items per batch
+            max_workers: Number of batches planned/applied concurrently
+            batching: Batching strategy or its name ('topic' clusters items
+                by shared keywords, 'source' groups by platform); default 'topic'
+            condense_long_items: Map-reduce items longer than
+                LOCALBRAIN_LONG_DOC_CHARS into fact digests (False: truncate them)
+            on_batch_committed: Called with the item indices of each batch
+                as soon as it is written (used for per-batch checkpoints)
             
         Returns:
-            Results dict with stats
+            Results dict with stats and failed_items (indices into items)
         """
-        print(f"\n📥 Bulk ingesting {len(items)} items (batch_size={batch_size})")
+        print(f"\n📥 Bulk ingesting {len(items)} items (batch_size={batch_size}, workers={max_workers})")
+        started = time.perf_counter()
+        condenser_usage = dict(self.condenser.llm.usage)
         
-        # Group by source/platform for better batching
-        grouped = self._group_by_source(items)
+        strategy = get_batching_strategy(batching)
+        batches = strategy.make_batches(items, batch_size)
+        print(f"📦 {len(batches)} batches ({strategy.name} batching)")
         
         stats = {
             'total_items': len(items),
@@ -60,67 +112,447 @@ class BulkIngestionPipeline:
             'failed': 0,
             'files_created': set(),
             'files_updated': set(),
-            'batches_processed': 0
+            'batches_processed': 0,
+            'input_tokens': 0,
+            'output_tokens': 0
         }
+        positions = {id(item): i for i, item in enumerate(items)}
+        failed_items = []
         
-        # Process each group in batches
-        for source, source_items in grouped.items():
-            print(f"\n📦 Processing {source}: {len(source_items)} items")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._process_batch, batch, source, condense_long_items): (n, batch)
+                for n, (source, batch) in enumerate(batches, 1)
+            }
             
-            for i in range(0, len(source_items), batch_size):
-                batch = source_items[i:i+batch_size]
+            for future in as_completed(futures):
+                n, batch = futures[future]
                 stats['batches_processed'] += 1
                 
-                print(f"  Batch {stats['batches_processed']}: {len(batch)} items")
-                
                 try:
-                    result = self._process_batch(batch, source)
-                    
-                    if result['success']:
-                        stats['successful'] += len(batch)
-                        stats['files_created'].update(result.get('files_created', []))
-                        stats['files_updated'].update(result.get('files_updated', []))
-                        print(f"    ✅ Success: {result.get('files_affected', [])}")
-                    else:
-                        stats['failed'] += len(batch)
-                        print(f"    ❌ Failed: {result.get('error')}")
-                
+                    result = future.result()
                 except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+                
+                stats['input_tokens'] += result.get('input_tokens', 0)
+                stats['output_tokens'] += result.get('output_tokens', 0)
+                
+                if result['success']:
+                    if on_batch_committed is not None:
+                        on_batch_committed([positions[id(item)] for item in batch])
+                    stats['successful'] += len(batch)
+                    stats['files_created'].update(result.get('files_created', []))
+                    stats['files_updated'].update(result.get('files_updated', []))
+                    print(f"  Batch {n}/{len(batches)} ({len(batch)} items) ✅ {result.get('files_affected', [])}")
+                else:
                     stats['failed'] += len(batch)
-                    print(f"    ❌ Error: {e}")
+                    failed_items.extend(positions[id(item)] for item in batch)
+                    print(f"  Batch {n}/{len(batches)} ({len(batch)} items) ❌ {result.get('error')}")
+        
+        # Citation sidecars are rewritten once per run, not per batch
+        self.citation_store.export_sidecars()
+        
+        # Long-item condensing calls
+        for key in ('input_tokens', 'output_tokens'):
+            stats[key] += self.condenser.llm.usage[key] - condenser_usage[key]
+        
+        elapsed = time.perf_counter() - started
+        tokens = stats['input_tokens'] + stats['output_tokens']
+        
+        print(
+            f"\n⏱️  {len(items)} items in {elapsed:.1f}s "
+            f"({len(items) / elapsed if elapsed else 0:.2f} items/s, "
+            f"{tokens / elapsed if elapsed else 0:.0f} tokens/s)"
+        )
         
         return {
             'success': True,
+            'failed_items': sorted(failed_items),
             'stats': {
                 'total_items': stats['total_items'],
                 'successful': stats['successful'],
                 'failed': stats['failed'],
                 'files_created': len(stats['files_created']),
                 'files_updated': len(stats['files_updated']),
-                'batches_processed': stats['batches_processed']
+                'batches_processed': stats['batches_processed'],
+                'elapsed_seconds': round(elapsed, 2),
+                'items_per_second': round(len(items) / elapsed, 3) if elapsed else 0.0,
+                'input_tokens': stats['input_tokens'],
+                'output_tokens': stats['output_tokens'],
+                'tokens_per_second': round(tokens / elapsed, 1) if elapsed else 0.0
             }
         }
     
-    def _group_by_source(self, items: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group items by source/platform for better batching."""
-        grouped = defaultdict(list)
+    def bulk_ingest_jsonl(
+        self,
+        input_path: Path,
+        state_path: Optional[Path] = None,
+        chunk_items: int = 200,
+        batch_size: int = 10,
+        max_workers: int = 4,
+        batching: Optional[Union[str, BatchingStrategy]] = None
+    ) -> Dict:
+        """
+        Stream a JSONL file (one {text, metadata} object per line) into the vault.
         
-        for item in items:
-            metadata = item.get('metadata', {})
-            source = metadata.get('platform', 'unknown')
-            grouped[source].append(item)
+        Only `chunk_items` lines are held in memory at a time. Every batch
+        that is written appends the byte offsets of its items to
+        <state>.results.jsonl; after each chunk the byte offset reached and
+        running totals are checkpointed to the state file. Re-running with
+        the same state file resumes after the last completed chunk and
+        skips the items of batches already written, so a crash mid-chunk
+        never applies a batch twice. Items of failed batches (API errors,
+        rate limits) are remembered by byte offset and retried first on the
+        next run.
+        
+        Args:
+            input_path: JSONL file to ingest
+            state_path: Checkpoint file (default: <input>.state.json)
+            chunk_items: Lines read and ingested per chunk
+            batch_size, max_workers, batching: Passed to bulk_ingest
+            
+        Returns:
+            Results dict with cumulative stats
+        """
+        input_path = Path(input_path)
+        state_path = Path(state_path) if state_path else input_path.with_name(input_path.name + '.state.json')
+        results_path = state_path.with_suffix('.results.jsonl')
+        total_bytes = input_path.stat().st_size
+        
+        state = self._load_stream_state(state_path, input_path, total_bytes)
+        if state['offset']:
+            print(f"⏩ Resuming {input_path.name} at byte {state['offset']} ({state['items_done']} items done)")
+        
+        run_started = time.perf_counter()
+        run_start_offset = state['offset']
+        
+        # Items written by batches after the last checkpoint (crash mid-chunk)
+        committed = self._committed_offsets(
+            results_path, state['run'], min([state['offset']] + state['retry_offsets'])
+        )
+        write_file(state_path, json.dumps(state, indent=2), atomic=True)
+        
+        with open(input_path, 'rb') as f:
+            if state['retry_offsets']:
+                self._retry_failed_items(
+                    f, state, state_path, results_path, committed, batch_size, max_workers, batching
+                )
+            
+            f.seek(state['offset'])
+            
+            while True:
+                items, offsets, malformed, offset = self._read_jsonl_chunk(f, chunk_items)
+                if not items and not malformed:
+                    break
+                
+                chunk = {'start': state['offset'], 'end': offset, 'items': len(items), 'malformed': malformed}
+                
+                done = [i for i, item_offset in enumerate(offsets) if item_offset in committed]
+                if done:
+                    print(f"⏭️  Skipping {len(done)} item(s) already written before the interruption")
+                    items = [item for i, item in enumerate(items) if offsets[i] not in committed]
+                    offsets = [item_offset for item_offset in offsets if item_offset not in committed]
+                    state['successful'] += len(done)
+                    state['items_done'] += len(done)
+                
+                if items:
+                    result = self.bulk_ingest(
+                        items, batch_size, max_workers, batching,
+                        on_batch_committed=self._batch_logger(results_path, state['run'], offsets)
+                    )
+                    chunk.update(result['stats'])
+                    state['retry_offsets'].extend(offsets[i] for i in result['failed_items'])
+                
+                for key in ('successful', 'failed', 'files_created', 'files_updated',
+                            'input_tokens', 'output_tokens'):
+                    state[key] += chunk.get(key, 0)
+                state['failed'] += malformed
+                state['items_done'] += len(items) + malformed
+                state['chunks_done'] += 1
+                state['offset'] = offset
+                state['updated'] = datetime.utcnow().isoformat() + 'Z'
+                
+                # Results first: a crash between the two writes only
+                # duplicates a log line, never skips a chunk
+                with open(results_path, 'a') as log:
+                    log.write(json.dumps(chunk) + '\n')
+                write_file(state_path, json.dumps(state, indent=2), atomic=True)
+                
+                self._print_stream_progress(state, total_bytes, run_start_offset, run_started)
+        
+        state['complete'] = True
+        write_file(state_path, json.dumps(state, indent=2), atomic=True)
+        
+        print(f"\n✅ Finished {input_path.name}: {state['successful']} successful, {state['failed']} failed")
+        if state['retry_offsets']:
+            print(f"🔁 {len(state['retry_offsets'])} failed item(s) will be retried on the next run")
+        return {
+            'success': True,
+            'stats': {k: v for k, v in state.items() if k not in ('input', 'input_size', 'run')}
+        }
+    
+    @staticmethod
+    def _load_stream_state(state_path: Path, input_path: Path, total_bytes: int) -> Dict:
+        """Load a checkpoint for input_path, or start fresh."""
+        fresh = {
+            'input': str(input_path.resolve()),
+            'run': uuid.uuid4().hex,
+            'offset': 0,
+            'items_done': 0,
+            'chunks_done': 0,
+            'successful': 0,
+            'failed': 0,
+            'files_created': 0,
+            'files_updated': 0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'retry_offsets': [],
+            'complete': False,
+            'updated': None
+        }
+        
+        if not state_path.exists():
+            return fresh
+        
+        try:
+            state = json.loads(read_file(state_path))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Ignoring unreadable state file {state_path}: {e}")
+            return fresh
+        
+        if state.get('input') != fresh['input'] or state.get('offset', 0) > total_bytes:
+            print(f"⚠️  State file {state_path} belongs to a different input, starting over")
+            return fresh
+        
+        # Appending to a finished file resumes at the new lines
+        state['complete'] = False
+        return {**fresh, **state}
+    
+    @staticmethod
+    def _batch_logger(results_path: Path, run: str, offsets: List[int]) -> Callable[[List[int]], None]:
+        """on_batch_committed callback recording a written batch's item offsets."""
+        def log_batch(indices: List[int]) -> None:
+            record = {'run': run, 'committed': sorted(offsets[i] for i in indices)}
+            with open(results_path, 'a') as log:
+                log.write(json.dumps(record) + '\n')
+        return log_batch
+    
+    @staticmethod
+    def _committed_offsets(results_path: Path, run: str, since: int) -> Set[int]:
+        """
+        Offsets (>= since) of items whose batch was written, from the results
+        log. Records are keyed by the state's run id, so a fresh run (state
+        file deleted) never skips anything an earlier run logged.
+        """
+        committed = set()
+        if not results_path.exists():
+            return committed
+        with open(results_path, 'r') as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line
+                if record.get('run') == run:
+                    committed.update(offset for offset in record.get('committed', []) if offset >= since)
+        return committed
+    
+    def _retry_failed_items(
+        self,
+        f,
+        state: Dict,
+        state_path: Path,
+        results_path: Path,
+        committed: Set[int],
+        batch_size: int,
+        max_workers: int,
+        batching: Optional[Union[str, BatchingStrategy]]
+    ) -> None:
+        """Re-ingest the items of batches that failed in earlier runs."""
+        items = []
+        offsets = []
+        recovered = 0
+        for offset in state['retry_offsets']:
+            if offset in committed:
+                # Retried successfully in a run that stopped before its checkpoint
+                recovered += 1
+                continue
+            f.seek(offset)
+            line_items, _, _, _ = self._read_jsonl_chunk(f, 1)
+            if line_items:
+                items.append(line_items[0])
+                offsets.append(offset)
+        
+        print(f"🔁 Retrying {len(items)} item(s) that failed in an earlier run")
+        if items:
+            result = self.bulk_ingest(
+                items, batch_size, max_workers, batching,
+                on_batch_committed=self._batch_logger(results_path, state['run'], offsets)
+            )
+        else:
+            result = {'failed_items': [], 'stats': {}}
+        stats = result['stats']
+        recovered += len(items) - len(result['failed_items'])
+        
+        state['successful'] += recovered
+        state['failed'] -= recovered
+        for key in ('files_created', 'files_updated', 'input_tokens', 'output_tokens'):
+            state[key] += stats.get(key, 0)
+        state['retry_offsets'] = [offsets[i] for i in result['failed_items']]
+        state['updated'] = datetime.utcnow().isoformat() + 'Z'
+        
+        with open(results_path, 'a') as log:
+            log.write(json.dumps({'retry': True, 'items': len(items), **stats}) + '\n')
+        write_file(state_path, json.dumps(state, indent=2), atomic=True)
+    
+    @staticmethod
+    def _read_jsonl_chunk(f, max_items: int):
+        """
+        Read up to max_items JSON lines from a binary file handle.
+        
+        Returns:
+            (items, byte offset of each item's line, malformed line count,
+            byte offset after the last line read)
+        """
+        items = []
+        offsets = []
+        malformed = 0
+        
+        while len(items) + malformed < max_items:
+            start = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if not line.endswith(b'\n'):
+                # Unterminated last line may still be being written: leave
+                # it for the next run unless it already parses
+                try:
+                    json.loads(line)
+                except json.JSONDecodeError:
+                    f.seek(-len(line), os.SEEK_CUR)
+                    break
+            
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                malformed += 1
+                continue
+            
+            if isinstance(item, dict) and item.get('text'):
+                items.append(item)
+                offsets.append(start)
+            else:
+                malformed += 1
         
-        return dict(grouped)
+        return items, offsets, malformed, f.tell()
     
-    def _process_batch(self, batch: List[Dict], source: str) -> Dict:
+    @staticmethod
+    def _print_stream_progress(state: Dict, total_bytes: int, run_start_offset: int, run_started: float) -> None:
+        """Progress line with byte-based percentage and ETA."""
+        elapsed = time.perf_counter() - run_started
+        done_bytes = state['offset'] - run_start_offset
+        percent = state['offset'] / total_bytes * 100 if total_bytes else 100.0
+        
+        if done_bytes > 0 and elapsed > 0:
+            eta = (total_bytes - state['offset']) / (done_bytes / elapsed)
+            eta_text = f"{eta / 60:.1f} min" if eta >= 60 else f"{eta:.0f}s"
+        else:
+            eta_text = "n/a"
+        
+        print(
+            f"\n📊 {percent:.1f}% | {state['items_done']} items "
+            f"({state['successful']} ok, {state['failed']} failed) | "
+            f"chunk {state['chunks_done']} | elapsed {elapsed / 60:.1f} min | ETA {eta_text}"
+        )
+    
+    def _process_batch(self, batch: List[Dict], source: str, condense_long_items: bool = True) -> Dict:
         """
         Process a batch of items with single LLM call.
         
         Strategy: Give LLM all items at once, let it decide organization.
-        Much faster than individual calls.
+        Much faster than individual calls. Planning runs without locks;
+        only the apply phase is serialized per target file.
+        
+        Long documents whose facts need more than one digest get follow-up
+        batches for the extra digests, planned and applied after the main
+        one; the batch fails if any of them fails.
+        """
+        try:
+            digests, overflow = self._condense_long_items(batch) if condense_long_items else ({}, [])
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        
+        result = self._plan_and_apply(batch, source, digests)
+        for start in range(0, len(overflow), len(batch)):
+            if not result['success']:
+                break
+            extra = self._plan_and_apply(overflow[start:start + len(batch)], source, {})
+            result = {
+                **extra,
+                'files_created': result.get('files_created', []) + extra.get('files_created', []),
+                'files_updated': result.get('files_updated', []) + extra.get('files_updated', []),
+                'files_affected': result.get('files_affected', []) + extra.get('files_affected', []),
+                'input_tokens': result['input_tokens'] + extra['input_tokens'],
+                'output_tokens': result['output_tokens'] + extra['output_tokens']
+            }
+        return result
+    
+    def _plan_and_apply(self, batch: List[Dict], source: str, digests: Dict[int, str]) -> Dict:
+        """One LLM planning call for `batch`, then apply the plan."""
+        try:
+            plan, usage = self._plan_batch(batch, source, digests)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'input_tokens': 0,
+                'output_tokens': 0
+            }
+        
+        try:
+            result = self._apply_plan(plan, batch)
+        except Exception as e:
+            result = {
+                'success': False,
+                'error': str(e)
+            }
+        
+        result['input_tokens'] = usage.input_tokens if usage else 0
+        result['output_tokens'] = usage.output_tokens if usage else 0
+        return result
+    
+    def _condense_long_items(self, batch: List[Dict]):
+        """
+        Fact digests for long documents (not every item over the prompt budget).
+        
+        Returns:
+            ({batch index: first digest}, items carrying the extra digests)
+        """
+        digests = {}
+        overflow = []
+        for i, item in enumerate(batch):
+            if not LongDocumentCondenser.is_long(item['text'], LONG_DOCUMENT_CHARS):
+                continue
+            parts = self.condenser.condense(item['text'], item.get('metadata', {}))
+            digests[i] = parts[0]
+            overflow.extend({**item, 'text': part} for part in parts[1:])
+        return digests, overflow
+    
+    def _plan_batch(self, batch: List[Dict], source: str, digests: Optional[Dict[int, str]] = None):
+        """
+        Ask the LLM how to organize a batch.
+        
+        Returns:
+            (plan dict with 'actions', API usage or None)
         """
         # Build combined prompt
-        batch_text = self._format_batch(batch)
+        batch_text = self._format_batch(batch, digests)
         
         # Get existing files for context
         existing_files = self._list_existing_files()
@@ -167,73 +599,99 @@ OUTPUT FORMAT (JSON only, no markdown fences):
   ]
 }}"""
 
+        response = create_message(
+            priority=BACKGROUND,
+            model=self.model,
+            max_tokens=4096,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        
+        # Parse response
+        response_text = response.content[0].text
+        
+        # Extract JSON
+        if "```json" in response_text:
+            json_str = response_text.split("```json")[1].split("```")[0].strip()
+        elif "```" in response_text:
+            json_str = response_text.split("```")[1].split("```")[0].strip()
+        else:
+            json_str = response_text.strip()
+        
+        return json.loads(json_str), getattr(response, 'usage', None)
+    
+    def _file_locks(self, plan: Dict) -> List[threading.Lock]:
+        """Locks for every file a plan writes, in a fixed order (no deadlocks)."""
+        keys = sorted({
+            str(Path(action['file'])).lower()
+            for action in plan.get('actions', [])
+        })
+        with self._locks_guard:
+            return [self._locks.setdefault(key, threading.Lock()) for key in keys]
+    
+    def _apply_plan(self, plan: Dict, batch: List[Dict]) -> Dict:
+        """Execute a batch plan while holding the locks of its target files."""
+        locks = self._file_locks(plan)
+        for lock in locks:
+            lock.acquire()
+        
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            # Parse response
-            response_text = response.content[0].text
-            
-            # Extract JSON
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                json_str = response_text.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            
-            plan = json.loads(json_str)
-            
-            # Execute actions
             files_created = []
             files_updated = []
             
+            # Buffer the whole plan, then log and write it in one go
+            txn = EditTransaction(lambda *args: [], self.wal, self.citation_store)
+            
             for action in plan['actions']:
                 action_type = action['action']
                 filepath = self.vault_path / action['file']
                 content = action['content']
                 
-                # Ensure directory exists
-                filepath.parent.mkdir(parents=True, exist_ok=True)
-                
-                if action_type == 'create' or not filepath.exists():
-                    write_file(filepath, content)
+                buf = txn.open(filepath)
+                if not buf.exists:
+                    buf.content = content
                     files_created.append(action['file'])
-                else:  # append
-                    existing = read_file(filepath)
-                    write_file(filepath, existing + "\n\n" + content)
+                else:
+                    # Never overwrite: a concurrently planned batch (or an
+                    # earlier action of this plan) may have created the note
+                    if action_type == 'create':
+                        print(f"  ↪️  {action['file']} already exists, appending instead of creating")
+                    buf.content = buf.content + "\n\n" + content
                     files_updated.append(action['file'])
                 
                 # Add citations
-                self._add_citations_batch(filepath, batch, action['items'])
+                self._add_citations_batch(buf, batch, action['items'])
             
-            return {
-                'success': True,
-                'files_created': files_created,
-                'files_updated': files_updated,
-                'files_affected': files_created + files_updated
-            }
+            txn.commit()
+        finally:
+            for lock in reversed(locks):
+                lock.release()
         
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return {
+            'success': True,
+            'files_created': files_created,
+            'files_updated': files_updated,
+            'files_affected': files_created + files_updated
+        }
     
-    def _format_batch(self, batch: List[Dict]) -> str:
-        """Format batch items for prompt."""
+    def _format_batch(self, batch: List[Dict], digests: Optional[Dict[int, str]] = None) -> str:
+        """Format batch items for prompt (long items as their fact digest)."""
+        digests = digests or {}
         lines = []
         for i, item in enumerate(batch):
             text = item['text']
             metadata = item.get('metadata', {})
             
+            if i in digests:
+                content = digests[i]
+            elif len(text) > PROMPT_CHARS_PER_ITEM:
+                content = text[:PROMPT_CHARS_PER_ITEM] + "..."  # Truncate for efficiency
+            else:
+                content = text
+            
             lines.append(f"--- ITEM {i} ---")
             lines.append(f"Source: {metadata.get('platform', 'unknown')}")
             lines.append(f"Date: {metadata.get('timestamp', 'unknown')}")
-            lines.append(f"Content:\n{text[:500]}...")  # Truncate for efficiency
+            lines.append(f"Content:\n{content}")
             lines.append("")
         
         return "\n".join(lines)
@@ -247,31 +705,46 @@ OUTPUT FORMAT (JSON only, no markdown fences):
                 files.append(str(rel_path))
         return files[:50]  # Limit for prompt size
     
-    def _add_citations_batch(self, filepath: Path, batch: List[Dict], item_indices: List[int]):
-        """Add citations for multiple items to a file."""
-        json_path = filepath.with_suffix('.json')
-        
-        # Load existing citations
-        if json_path.exists():
-            citations = json.loads(read_file(json_path))
-        else:
-            citations = {}
-        
-        # Add new citations
+    def _add_citations_batch(self, buf: FileBuffer, batch: List[Dict], item_indices: List[int]):
+        """Add citations for multiple items to a buffered file."""
         for idx in item_indices:
             item = batch[idx]
             metadata = item.get('metadata', {})
             
-            # Find next citation ID
-            citation_id = max([int(k) for k in citations.keys()], default=0) + 1
-            
-            citations[str(citation_id)] = {
+            buf.add_citation({
                 'platform': metadata.get('platform', 'unknown'),
-                'timestamp': metadata.get('timestamp'),
+                'timestamp': normalize_timestamp(metadata.get('timestamp')),
                 'url': metadata.get('url'),
                 'quote': item['text'][:200],
                 'note': metadata.get('note')
-            }
-        
-        # Save citations
-        write_file(json_path, json.dumps(citations, indent=2))
+            })
+
+
+def main():
+    """CLI: stream a JSONL file into a vault (resumable)."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Resumable bulk ingestion from JSONL")
+    parser.add_argument('vault_path')
+    parser.add_argument('input', help="JSONL file, one {text, metadata} object per line")
+    parser.add_argument('--state', help="Checkpoint file (default: <input>.state.json)")
+    parser.add_argument('--chunk-items', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batching', default='topic', choices=['topic', 'source'])
+    args = parser.parse_args()
+    
+    pipeline = BulkIngestionPipeline(Path(args.vault_path))
+    result = pipeline.bulk_ingest_jsonl(
+        Path(args.input),
+        state_path=Path(args.state) if args.state else None,
+        chunk_items=args.chunk_items,
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        batching=args.batching
+    )
+    print(json.dumps(result['stats'], indent=2))
+
+
+if __name__ == "__main__":
+    main()
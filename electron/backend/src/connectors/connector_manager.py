@@ -7,11 +7,27 @@ Provides a unified interface for interacting with all connectors.
 
 import importlib
 import inspect
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Type
 from datetime import datetime
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from .base_connector import BaseConnector, ConnectorMetadata, ConnectorStatus, SyncResult
+from utils.process_lock import ProcessLock
+from utils.metrics import REGISTRY
+
+
+SYNCS = REGISTRY.counter(
+    'localbrain_connector_syncs_total', 'Connector syncs by outcome (ok, error, busy)', ('connector', 'outcome')
+)
+SYNC_LATENCY = REGISTRY.histogram(
+    'localbrain_connector_sync_duration_seconds', 'Connector sync wall time', ('connector',)
+)
+SYNC_ITEMS = REGISTRY.counter(
+    'localbrain_connector_items_total', 'Items fetched and ingested by connector syncs', ('connector', 'kind')
+)
 
 
 class ConnectorManager:
@@ -182,13 +198,31 @@ class ConnectorManager:
         if not connector:
             return None
         
+        # One sync per connector at a time, even across daemon workers
+        lock = ProcessLock(connector.config_dir / 'sync.lock')
+        if not lock.acquire(blocking=False):
+            SYNCS.labels(connector_id, 'busy').inc()
+            return SyncResult(
+                success=False,
+                errors=[f"A {connector_id} sync is already running"]
+            )
+        
+        started = time.perf_counter()
         try:
-            return connector.sync(auto_ingest=auto_ingest, limit=limit)
+            result = connector.sync(auto_ingest=auto_ingest, limit=limit)
         except Exception as e:
-            return SyncResult(
+            result = SyncResult(
                 success=False,
                 errors=[str(e)]
             )
+        finally:
+            lock.release()
+        
+        SYNCS.labels(connector_id, 'ok' if result.success else 'error').inc()
+        SYNC_LATENCY.labels(connector_id).observe(time.perf_counter() - started)
+        SYNC_ITEMS.labels(connector_id, 'fetched').inc(result.items_fetched or 0)
+        SYNC_ITEMS.labels(connector_id, 'ingested').inc(result.items_ingested or 0)
+        return result
     
     def sync_all(self, auto_ingest: bool = True) -> Dict[str, SyncResult]:
         """
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Batching Strategies - How bulk ingestion splits items into LLM batches
+
+- SourceBatching: consecutive items of the same platform (original behavior)
+- TopicBatching: lexical clustering, so each batch covers one topic and
+  related batches are scheduled next to each other
+
+Strategies return (label, items) pairs; the label is shown to the LLM as
+the batch source.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.ingestion.near_duplicate import tokenize
+
+
+# Characters of each item that end up in the batch prompt (see _format_batch);
+# longer items are truncated, long documents condensed to a digest of about this size
+PROMPT_CHARS_PER_ITEM = 1500
+
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did
+do does for from had has have he her him his how i if in into is it its just
+me my no not of on or our out she so than that the their them then there
+these they this to up us was we were what when which who will with would you
+your re fw fwd hi hello thanks thank regards dear please
+""".split())
+
+
+def estimate_item_tokens(item: Dict) -> int:
+    """Approximate prompt tokens an item adds to a batch."""
+    return min(len(item.get('text', '')), PROMPT_CHARS_PER_ITEM) // 4 + 20
+
+
+def _platform(item: Dict) -> str:
+    return item.get('metadata', {}).get('platform', 'unknown')
+
+
+class BatchingStrategy(ABC):
+    """Base class: split items into batches for bulk ingestion."""
+
+    name = 'base'
+
+    @abstractmethod
+    def make_batches(self, items: List[Dict], batch_size: int) -> List[Tuple[str, List[Dict]]]:
+        """Split items into (label, items) batches of at most batch_size items."""
+
+
+class SourceBatching(BatchingStrategy):
+    """Group by metadata.platform, then cut into fixed-size batches."""
+
+    name = 'source'
+
+    def make_batches(self, items: List[Dict], batch_size: int) -> List[Tuple[str, List[Dict]]]:
+        grouped = defaultdict(list)
+        for item in items:
+            grouped[_platform(item)].append(item)
+
+        batches = []
+        for source, source_items in grouped.items():
+            for i in range(0, len(source_items), batch_size):
+                batches.append((source, source_items[i:i + batch_size]))
+        return batches
+
+
+class TopicBatching(BatchingStrategy):
+    """
+    Cluster items by shared keywords into bounded, topic-coherent batches.
+
+    Each item is reduced to its top keywords by tf-idf. A batch starts from
+    the first unassigned item and greedily takes the unassigned items that
+    share the most keywords with the batch so far (found through an inverted
+    index, not pairwise comparison), until it reaches batch_size items or
+    max_batch_tokens. Batches are then chained so each one is followed by
+    the remaining batch whose keywords overlap it most.
+    """
+
+    name = 'topic'
+
+    def __init__(self, max_batch_tokens: int = 4000, keywords_per_item: int = 12):
+        """
+        Args:
+            max_batch_tokens: Upper bound on estimated prompt tokens per batch
+            keywords_per_item: Keywords kept per item for clustering
+        """
+        self.max_batch_tokens = max_batch_tokens
+        self.keywords_per_item = keywords_per_item
+
+    def _keywords(self, items: List[Dict]) -> List[Set[str]]:
+        term_counts = []
+        document_freq = Counter()
+        for item in items:
+            counts = Counter(
+                token for token in tokenize(item.get('text', ''))
+                if len(token) > 2 and token not in STOPWORDS and not token.isdigit()
+            )
+            term_counts.append(counts)
+            document_freq.update(counts.keys())
+
+        n = len(items)
+        # Terms in most items say nothing about topic
+        max_df = max(2, n // 2)
+
+        keywords = []
+        for counts in term_counts:
+            scored = [
+                (count * math.log(n / document_freq[term]), term)
+                for term, count in counts.items()
+                if 1 < document_freq[term] <= max_df
+            ]
+            scored.sort(reverse=True)
+            keywords.append({term for _, term in scored[:self.keywords_per_item]})
+        return keywords
+
+    def make_batches(self, items: List[Dict], batch_size: int) -> List[Tuple[str, List[Dict]]]:
+        if not items:
+            return []
+
+        keywords = self._keywords(items)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, terms in enumerate(keywords):
+            for term in terms:
+                postings[term].append(idx)
+
+        assigned = [False] * len(items)
+        clusters: List[Tuple[List[int], Counter]] = []
+
+        for seed in range(len(items)):
+            if assigned[seed]:
+                continue
+
+            members = [seed]
+            assigned[seed] = True
+            tokens = estimate_item_tokens(items[seed])
+            profile = Counter(keywords[seed])
+
+            # scores[idx] = keywords idx shares with the batch, weighted by
+            # how many members use them; updated as members are added
+            scores = Counter()
+            for term in keywords[seed]:
+                for idx in postings[term]:
+                    scores[idx] += 1
+
+            while len(members) < batch_size:
+                best = None
+                for idx, _ in scores.most_common():
+                    if assigned[idx]:
+                        continue
+                    if tokens + estimate_item_tokens(items[idx]) <= self.max_batch_tokens:
+                        best = idx
+                        break
+                if best is None:
+                    break
+
+                members.append(best)
+                assigned[best] = True
+                tokens += estimate_item_tokens(items[best])
+                profile.update(keywords[best])
+                for term in keywords[best]:
+                    for idx in postings[term]:
+                        scores[idx] += 1
+
+            clusters.append((members, profile))
+
+        clusters = self._merge_small(clusters, items, batch_size)
+        ordered = self._order(clusters)
+
+        batches = []
+        for members, _ in ordered:
+            batch = [items[idx] for idx in sorted(members)]
+            platforms = sorted({_platform(item) for item in batch})
+            batches.append((', '.join(platforms), batch))
+        return batches
+
+    def _merge_small(
+        self,
+        clusters: List[Tuple[List[int], Counter]],
+        items: List[Dict],
+        batch_size: int
+    ) -> List[Tuple[List[int], Counter]]:
+        """
+        Pack under-filled clusters (items whose topic mates were already
+        taken, or without keywords) together instead of one LLM call each.
+        """
+        min_size = max(2, batch_size // 2)
+        merged = []
+        leftovers: List[Tuple[int, Counter]] = []
+        for members, profile in clusters:
+            if len(members) < min_size:
+                leftovers.extend((idx, profile) for idx in members)
+            else:
+                merged.append((members, profile))
+
+        batch: List[int] = []
+        batch_profile = Counter()
+        tokens = 0
+        for idx, profile in leftovers:
+            cost = estimate_item_tokens(items[idx])
+            if batch and (len(batch) >= batch_size or tokens + cost > self.max_batch_tokens):
+                merged.append((batch, batch_profile))
+                batch, batch_profile, tokens = [], Counter(), 0
+            batch.append(idx)
+            batch_profile.update(profile)
+            tokens += cost
+        if batch:
+            merged.append((batch, batch_profile))
+        return merged
+
+    @staticmethod
+    def _order(clusters: List[Tuple[List[int], Counter]]) -> List[Tuple[List[int], Counter]]:
+        """Nearest-neighbour chain over cluster keyword profiles."""
+        if not clusters:
+            return []
+
+        by_term: Dict[str, List[int]] = defaultdict(list)
+        for i, (_, profile) in enumerate(clusters):
+            for term in profile:
+                by_term[term].append(i)
+
+        used = [False] * len(clusters)
+        order = [0]
+        used[0] = True
+        next_unused = 1
+
+        while len(order) < len(clusters):
+            current = clusters[order[-1]][1]
+            overlap = Counter()
+            for term in current:
+                for i in by_term[term]:
+                    if not used[i]:
+                        overlap[i] += 1
+
+            if overlap:
+                nxt = overlap.most_common(1)[0][0]
+            else:
+                while used[next_unused]:
+                    next_unused += 1
+                nxt = next_unused
+
+            used[nxt] = True
+            order.append(nxt)
+
+        return [clusters[i] for i in order]
+
+
+BATCHING_STRATEGIES = {
+    SourceBatching.name: SourceBatching,
+    TopicBatching.name: TopicBatching,
+}
+
+
+def get_batching_strategy(strategy: Optional[object] = None) -> BatchingStrategy:
+    """
+    Resolve a strategy name ('source', 'topic') or instance.
+
+    Defaults to TopicBatching.
+    """
+    if strategy is None:
+        return TopicBatching()
+    if isinstance(strategy, BatchingStrategy):
+        return strategy
+    if strategy not in BATCHING_STRATEGIES:
+        raise ValueError(
+            f"Unknown batching strategy: {strategy} "
+            f"(expected one of {', '.join(BATCHING_STRATEGIES)})"
+        )
+    return BATCHING_STRATEGIES[strategy]()
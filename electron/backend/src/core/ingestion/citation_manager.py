@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
-Citation Manager - Manages JSON citation files
+Citation Manager - Manages citations of vault notes
+
+Backed by the vault's CitationStore when given one, otherwise by the JSON
+sidecar files directly.
 """
 
 from pathlib import Path
@@ -14,6 +17,13 @@ from utils.file_ops import read_json_citations, write_json_citations
 class CitationManager:
     """Manages citation JSON files."""
     
+    def __init__(self, store=None):
+        """
+        Args:
+            store: Optional CitationStore (default: read/write sidecars)
+        """
+        self.store = store
+    
     def add_citations(self, file_path: Path, new_citations: Dict) -> None:
         """
         Add new citations to file's JSON.
@@ -22,6 +32,11 @@ class CitationManager:
             file_path: Path to markdown file
             new_citations: Dict of new citations to add {num: {platform, timestamp, url, quote}}
         """
+        if self.store is not None:
+            existing = self.store.get(file_path) or {}
+            self.store.apply([(file_path, existing, {**existing, **new_citations})])
+            return
+        
         # Read existing citations
         existing = read_json_citations(file_path)
         
@@ -33,12 +48,19 @@ class CitationManager:
     
     def update_citation(self, file_path: Path, citation_num: str, metadata: Dict) -> None:
         """Update a specific citation."""
+        if self.store is not None:
+            existing = self.store.get(file_path) or {}
+            self.store.apply([(file_path, existing, {**existing, citation_num: metadata})])
+            return
+        
         citations = read_json_citations(file_path)
         citations[citation_num] = metadata
         write_json_citations(file_path, citations)
     
     def get_citations(self, file_path: Path) -> Dict:
         """Get all citations for a file."""
+        if self.store is not None:
+            return self.store.get(file_path) or {}
         return read_json_citations(file_path)
     
     def validate_citation(self, citation: Dict) -> bool:
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Edit Transaction - Buffers all edits of one ingest attempt in memory
+
+Every target file (markdown + JSON citation sidecar) is read once when first
+touched. Edits and citation additions are applied to the in-memory buffers,
+validation runs on the buffers, and each file is committed with a single
+atomic write per changed file - only if validation passes.
+
+With a write-ahead log, the whole commit is logged first so a crash halfway
+through is replayed on the next startup. With a citation store, citations
+are read from and committed to the store (numbers allocated atomically)
+instead of the JSON sidecars.
+
+Transactions may run concurrently (the daemon serves ingests from a thread
+pool, possibly in several worker processes). Commit re-checks every target file against the state it was read
+in and raises EditConflict instead of overwriting another transaction's
+edits; the ingest attempt is then retried on fresh buffers.
+"""
+
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.file_ops import read_file, write_file, read_json_citations, write_json_citations
+from utils.process_lock import ProcessLock
+
+
+# Striped file locks serializing the check-then-write of concurrent commits
+# (across threads and worker processes); commits on disjoint files still
+# overlap and share WAL fsyncs
+LOCK_DIR = Path(tempfile.gettempdir()) / 'localbrain-locks'
+LOCK_STRIPES = 64
+
+
+class EditConflict(Exception):
+    """A target file changed on disk after the transaction read it."""
+
+    def __init__(self, paths: List[Path]):
+        super().__init__(f"Files changed by a concurrent edit: {', '.join(str(p) for p in paths)}")
+        self.paths = paths
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, None if it doesn't exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _disk_state(path: Path, store) -> Tuple:
+    """On-disk state a buffer was read from (the sidecar too, without a store)."""
+    return _stat(path), _stat(path.with_suffix('.json')) if store is None else None
+
+
+def _lock_paths(paths: List[Path]) -> List[ProcessLock]:
+    """Acquire the lock stripes of `paths` in a fixed order (no deadlocks)."""
+    stripes = sorted({
+        int(hashlib.sha1(str(path.resolve()).encode()).hexdigest(), 16) % LOCK_STRIPES
+        for path in paths
+    })
+    locks = [ProcessLock(LOCK_DIR / f"commit-{stripe:02d}.lock") for stripe in stripes]
+    for lock in locks:
+        lock.acquire()
+    return locks
+
+
+class FileBuffer:
+    """In-memory state of one markdown file and its citation JSON."""
+
+    def __init__(self, path: Path, store=None):
+        self.path = path
+        self.store = store
+        self.disk_state = _disk_state(path, store)
+        self.existed = self.disk_state[0] is not None
+
+        self.original = read_file(path) if self.existed else None
+        self.content: Optional[str] = self.original
+
+        if store is not None:
+            stored = store.get(path)
+            self.json_existed = stored is not None
+            self.original_citations = stored or {}
+        else:
+            self.json_existed = path.with_suffix('.json').exists()
+            self.original_citations = read_json_citations(path) if self.json_existed else {}
+        self.citations: Dict = dict(self.original_citations)
+
+        # Errors the file already had before this transaction
+        self.baseline_errors: List[str] = []
+
+    @property
+    def exists(self) -> bool:
+        return self.content is not None
+
+    def add_citation(self, citation: Dict) -> int:
+        """Allocate the next citation number for `citation` and return it."""
+        if self.store is not None:
+            # Unique even across concurrent transactions on the same note
+            num = self.store.allocate(self.path)
+        else:
+            num = max([int(k) for k in self.citations.keys()], default=0) + 1
+        self.citations[str(num)] = citation
+        return num
+
+    @property
+    def content_changed(self) -> bool:
+        return self.content != self.original
+
+    @property
+    def citations_changed(self) -> bool:
+        return self.citations != self.original_citations
+
+    def log_entry(self) -> Dict:
+        """Pending changes in the form WriteAheadLog.begin expects."""
+        return {
+            'path': self.path,
+            'content': self.content if self.content_changed else None,
+            'original': self.original,
+            'citations': self.citations if self.citations_changed else None,
+            'original_citations': self.original_citations if self.json_existed else None,
+        }
+
+
+class EditTransaction:
+    """
+    Coalesces all reads and writes of an ingest attempt.
+
+    Usage:
+        txn = EditTransaction(MarkdownValidator.validate_content)
+        buf = txn.open(path)
+        buf.content += "..."
+        file_errors = txn.validate()
+        committed = txn.commit(skip=txn.new_errors(file_errors))
+    """
+
+    def __init__(
+        self,
+        validate: Callable[[Path, str, Optional[Dict]], List[str]],
+        wal=None,
+        store=None
+    ):
+        """
+        Args:
+            validate: fn(file_path, content, citations or None if no JSON)
+                returning a list of validation errors
+            wal: Optional WriteAheadLog that records the commit before it
+                is applied
+            store: Optional CitationStore holding the citations (default:
+                JSON sidecars)
+        """
+        self._validate = validate
+        self.wal = wal
+        self.store = store
+        self.buffers: Dict[Path, FileBuffer] = {}
+
+    def open(self, path: Path) -> FileBuffer:
+        """Buffer for `path`, loading it from disk on first access only."""
+        path = Path(path)
+        if path not in self.buffers:
+            buf = FileBuffer(path, self.store)
+            if buf.existed:
+                buf.baseline_errors = self._validate(
+                    path, buf.original, buf.original_citations if buf.json_existed else None
+                )
+            self.buffers[path] = buf
+        return self.buffers[path]
+
+    def validate(self, paths: Optional[List[Path]] = None) -> Dict[Path, List[str]]:
+        """
+        Validate buffered content (no disk access).
+
+        Args:
+            paths: Buffers to check (default: all changed buffers)
+
+        Returns:
+            {path: errors} for buffers with errors
+        """
+        if paths is None:
+            paths = self.changed_paths()
+
+        file_errors = {}
+        for path in paths:
+            buf = self.buffers[path]
+            if not buf.exists:
+                file_errors[path] = [f"File does not exist: {path}"]
+                continue
+
+            has_json = buf.json_existed or bool(buf.citations)
+            errors = self._validate(path, buf.content, buf.citations if has_json else None)
+            if errors:
+                file_errors[path] = errors
+        return file_errors
+
+    def new_errors(self, file_errors: Dict[Path, List[str]]) -> List[Path]:
+        """Paths whose errors were introduced by this transaction."""
+        return [
+            path for path, errors in file_errors.items()
+            if set(errors) - set(self.buffers[path].baseline_errors)
+        ]
+
+    def introduced_errors(self, file_errors: Dict[Path, List[str]]) -> Dict[Path, List[str]]:
+        """
+        Only the errors this transaction introduced ({path: errors});
+        errors a note already had before it was opened are dropped.
+        """
+        introduced = {}
+        for path, errors in file_errors.items():
+            baseline = set(self.buffers[path].baseline_errors)
+            errors = [error for error in errors if error not in baseline]
+            if errors:
+                introduced[path] = errors
+        return introduced
+
+    def changed_paths(self) -> List[Path]:
+        return [
+            path for path, buf in self.buffers.items()
+            if buf.content_changed or buf.citations_changed
+        ]
+
+    def commit(self, skip: Optional[List[Path]] = None) -> List[Path]:
+        """
+        Atomically write every changed buffer not in `skip`.
+
+        With a citation store, citations go to the store in one database
+        transaction; sidecars are written later by store.export_sidecars().
+
+        Returns:
+            Paths that were written
+
+        Raises:
+            EditConflict: A target changed on disk since it was buffered
+                (nothing is written)
+        """
+        skip = set(skip or [])
+        paths = [path for path in self.changed_paths() if path not in skip]
+        if not paths:
+            return []
+
+        locks = _lock_paths(paths)
+        try:
+            stale = [
+                path for path in paths
+                if _disk_state(path, self.store) != self.buffers[path].disk_state
+            ]
+            if stale:
+                raise EditConflict(stale)
+            return self._write(paths)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _write(self, paths: List[Path]) -> List[Path]:
+        txn_id = None
+        if self.wal is not None:
+            txn_id = self.wal.begin([self.buffers[path].log_entry() for path in paths])
+
+        # Citations first: a crash in between leaves unused citations,
+        # never [n] markers without JSON entries
+        if self.store is not None:
+            self.store.apply([
+                (path, self.buffers[path].original_citations, self.buffers[path].citations)
+                for path in paths if self.buffers[path].citations_changed
+            ])
+
+        committed = []
+        for path in paths:
+            buf = self.buffers[path]
+            if buf.citations_changed and self.store is None:
+                write_json_citations(path, buf.citations, atomic=True)
+            if buf.content_changed:
+                write_file(path, buf.content, atomic=True)
+            committed.append(path)
+
+        if txn_id is not None:
+            self.wal.commit(txn_id)
+        return committed
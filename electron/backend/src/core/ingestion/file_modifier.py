@@ -4,13 +4,14 @@ File Modifier - Makes surgical edits to existing markdown files
 """
 
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from utils.llm_client import LLMClient
 from utils.file_ops import read_file, get_next_citation_number
 from utils.fuzzy_matcher import find_best_section_match
+from utils.markdown_outline import get_outline
 
 
 SYSTEM_PROMPT = """You are a precise file editing assistant for LocalBrain knowledge management.
@@ -65,6 +66,28 @@ Be SURGICAL and PRECISE. Make minimal changes.
 """
 
 
+REPAIR_SYSTEM_PROMPT = """You fix validation errors in a markdown file. Be surgical.
+
+RULES (violations = failure):
+1. Fix ONLY the listed errors - never rewrite, reorder or re-add other content
+2. Use the fewest operations possible
+3. Citation markers [n] may only use the valid citation numbers given
+4. Line numbers refer to the file as shown (1-indexed)
+
+OUTPUT: Valid JSON only. No markdown fences.
+
+{
+  "operations": [
+    {
+      "type": "replace_line|insert_after_line|delete_line",
+      "line_number": 12,
+      "content": "Corrected line (omit for delete_line)"
+    }
+  ]
+}
+"""
+
+
 class FileModifier:
     """Makes intelligent edits to existing files."""
     
@@ -234,25 +257,102 @@ Return JSON with operations list."""
             section_name = matched_section
             print(f"   Fuzzy matched '{section_name}' to '{matched_section}'")
         
-        lines = content.split('\n')
-        
-        # Find the section
-        section_line = -1
-        next_section_line = len(lines)
+        # Find the section in the cached outline (no rescan of the file)
+        outline = get_outline(content)
+        heading = outline.find_section(section_name)
         
-        for i, line in enumerate(lines):
-            if line.startswith('##') and section_name.lower() in line.lower():
-                section_line = i
-            elif section_line != -1 and line.startswith('##'):
-                next_section_line = i
-                break
-        
-        if section_line == -1:
+        if heading is None:
             # Section not found even with fuzzy match, append at end
             return content + f"\n\n{new_content}"
         
         # Insert before next section
-        lines.insert(next_section_line, new_content)
-        lines.insert(next_section_line, '')  # Blank line
+        next_heading = outline.next_heading(heading)
+        if next_heading is None:
+            return content + f"\n\n{new_content}"
+        
+        offset = next_heading.offset
+        return f"{content[:offset]}\n{new_content}\n{content[offset:]}"
+    
+    def determine_repairs(
+        self,
+        file_path: Path,
+        errors: List[str],
+        citation_numbers: List[str],
+        content: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Ask the LLM for minimal line operations that fix validation errors.
+        
+        Only the broken file and its errors are sent, so retries don't
+        re-analyze (or re-append) content that was already applied.
+        
+        Args:
+            file_path: Path to file that failed validation
+            errors: Validation errors for this file
+            citation_numbers: Citation numbers present in the JSON sidecar
+            content: In-memory content to repair (read from disk if None)
+            
+        Returns:
+            List of line operations (empty if the LLM call fails)
+        """
+        if content is None:
+            content = read_file(file_path)
+        lines = content.split('\n')
+        numbered_lines = '\n'.join([f"{i+1:3d} | {line}" for i, line in enumerate(lines)])
+        
+        prompt = f"""Fix these validation errors in {file_path.name}:
+
+ERRORS:
+{chr(10).join('- ' + e for e in errors)}
+
+VALID CITATION NUMBERS: {', '.join(citation_numbers) if citation_numbers else '(none)'}
+
+FILE:
+```
+{numbered_lines}
+```
+
+Return JSON with the minimal operations list."""
+        
+        try:
+            response = self.llm.call_json(prompt, system=REPAIR_SYSTEM_PROMPT, max_tokens=1024)
+            return response.get('operations', [])
+        except Exception as e:
+            print(f"⚠️  Repair determination failed: {e}")
+            return []
+    
+    def apply_repairs(self, content: str, operations: List[Dict]) -> str:
+        """
+        Apply line operations from determine_repairs.
+        
+        Operations are applied bottom-up so line numbers from the original
+        file stay valid. Line numbers come from LLM JSON and may be strings
+        ("12"); operations whose line number doesn't parse are skipped.
+        """
+        lines = content.split('\n')
+        
+        numbered = []
+        for op in operations:
+            try:
+                numbered.append((int(op.get('line_number', 0)), op))
+            except (TypeError, ValueError):
+                print(f"   ⚠️  Skipping repair with invalid line number: {op.get('line_number')!r}")
+        
+        for line_number, op in sorted(numbered, key=lambda pair: pair[0], reverse=True):
+            op_type = op.get('type')
+            line_idx = line_number - 1
+            
+            if op_type == 'insert_after_line':
+                if -1 <= line_idx < len(lines):
+                    lines.insert(line_idx + 1, op.get('content', ''))
+            
+            elif not 0 <= line_idx < len(lines):
+                continue
+            
+            elif op_type == 'replace_line':
+                lines[line_idx] = op.get('content', '')
+            
+            elif op_type == 'delete_line':
+                del lines[line_idx]
         
         return '\n'.join(lines)
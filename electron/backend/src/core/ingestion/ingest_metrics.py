@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Ingest Metrics - Per-stage spans for the agentic ingestion pipeline
+
+Each stage of an ingest (extract, analyze, apply, citations, validate,
+retry, commit) is wrapped in a span that records wall time, API tokens,
+attempt number and file I/O. Edits are buffered in memory, so all vault
+writes land in 'commit'. Spans are aggregated into per-stage counters and latency
+histograms, both per ingest (returned in the ingest result) and for the
+whole process (STAGE_STATS).
+
+An 'extract' span covers map-reduce condensing of long documents. A
+'retry' span covers a targeted repair of files that failed validation;
+full re-runs show up as analyze/apply/... spans with a higher attempt.
+"""
+
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.file_ops import io_counters
+from utils.metrics import REGISTRY
+
+
+STAGES = ('extract', 'analyze', 'apply', 'citations', 'validate', 'retry', 'commit')
+
+STAGE_LATENCY = REGISTRY.histogram(
+    'localbrain_ingest_stage_duration_seconds', 'Wall time of ingestion stages', ('stage',)
+)
+STAGE_ERRORS = REGISTRY.counter(
+    'localbrain_ingest_stage_errors_total', 'Ingestion stages that raised', ('stage',)
+)
+
+# Latency histogram upper bounds in milliseconds (last bucket is +Inf)
+LATENCY_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+# USD per million tokens (input, output)
+MODEL_PRICING = {
+    'claude-haiku-4-5-20251001': (1.0, 5.0),
+    'claude-sonnet-4-5-20250929': (3.0, 15.0),
+}
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Estimated USD cost, or None for models without known pricing."""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    return (input_tokens * pricing[0] + output_tokens * pricing[1]) / 1_000_000
+
+
+class StageStats:
+    """Thread-safe per-stage counters and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict] = {}
+
+    def record(self, span: Dict) -> None:
+        with self._lock:
+            stats = self._stages.get(span['stage'])
+            if stats is None:
+                stats = self._stages[span['stage']] = {
+                    'count': 0,
+                    'wall_ms': 0.0,
+                    'max_wall_ms': 0.0,
+                    'llm_calls': 0,
+                    'input_tokens': 0,
+                    'output_tokens': 0,
+                    'writes': 0,
+                    'bytes_written': 0,
+                    'reads': 0,
+                    'bytes_read': 0,
+                    'errors': 0,
+                    'histogram': [0] * len(LATENCY_BUCKETS_MS),
+                }
+
+            stats['count'] += 1
+            stats['wall_ms'] += span['wall_ms']
+            stats['max_wall_ms'] = max(stats['max_wall_ms'], span['wall_ms'])
+            for key in ('llm_calls', 'input_tokens', 'output_tokens',
+                        'writes', 'bytes_written', 'reads', 'bytes_read'):
+                stats[key] += span[key]
+            if span.get('error'):
+                stats['errors'] += 1
+
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if span['wall_ms'] <= bound:
+                    stats['histogram'][i] += 1
+                    break
+
+    def snapshot(self, model: Optional[str] = None) -> Dict:
+        """
+        Copy of all stage stats. Histograms are keyed by bucket upper bound
+        ("le" in ms, "+Inf" for the last) and are non-cumulative.
+        """
+        with self._lock:
+            result = {}
+            for stage, stats in self._stages.items():
+                entry = {k: v for k, v in stats.items() if k != 'histogram'}
+                entry['wall_ms'] = round(entry['wall_ms'], 2)
+                entry['max_wall_ms'] = round(entry['max_wall_ms'], 2)
+                entry['avg_wall_ms'] = round(stats['wall_ms'] / stats['count'], 2)
+                entry['histogram'] = {
+                    ('+Inf' if bound == float('inf') else str(bound)): count
+                    for bound, count in zip(LATENCY_BUCKETS_MS, stats['histogram'])
+                }
+                if model:
+                    entry['cost_usd'] = estimate_cost(
+                        model, stats['input_tokens'], stats['output_tokens']
+                    )
+                result[stage] = entry
+            return result
+
+
+# Process-wide aggregate across every ingest
+STAGE_STATS = StageStats()
+
+
+class IngestMetrics:
+    """Collects the spans of a single ingest."""
+
+    def __init__(self, llm, model: str):
+        """
+        Args:
+            llm: LLMClient whose cumulative `usage` is sampled around spans
+            model: Model name (for cost estimates)
+        """
+        self.llm = llm
+        self.model = model
+        self.spans: List[Dict] = []
+        self._started = perf_counter()
+
+    @contextmanager
+    def span(self, stage: str, attempt: int):
+        """
+        Time a stage. Yields the span dict so callers can attach extra
+        fields (e.g. number of edit plans).
+        """
+        usage_before = dict(self.llm.usage)
+        io_before = dict(io_counters())
+        start = perf_counter()
+        span = {'stage': stage, 'attempt': attempt}
+
+        try:
+            yield span
+        except Exception as e:
+            span['error'] = str(e)
+            raise
+        finally:
+            io_after = io_counters()
+            span['wall_ms'] = round((perf_counter() - start) * 1000, 2)
+            span['llm_calls'] = self.llm.usage['calls'] - usage_before['calls']
+            span['input_tokens'] = self.llm.usage['input_tokens'] - usage_before['input_tokens']
+            span['output_tokens'] = self.llm.usage['output_tokens'] - usage_before['output_tokens']
+            for key in ('writes', 'bytes_written', 'reads', 'bytes_read'):
+                span[key] = io_after[key] - io_before[key]
+
+            self.spans.append(span)
+            STAGE_STATS.record(span)
+            STAGE_LATENCY.labels(stage).observe(span['wall_ms'] / 1000)
+            if span.get('error'):
+                STAGE_ERRORS.labels(stage).inc()
+
+    def summary(self) -> Dict:
+        """Spans, per-stage aggregates and totals for this ingest."""
+        stages = StageStats()
+        for span in self.spans:
+            stages.record(span)
+
+        input_tokens = sum(s['input_tokens'] for s in self.spans)
+        output_tokens = sum(s['output_tokens'] for s in self.spans)
+
+        return {
+            'spans': self.spans,
+            'stages': stages.snapshot(self.model),
+            'totals': {
+                'wall_ms': round((perf_counter() - self._started) * 1000, 2),
+                'attempts': max((s['attempt'] for s in self.spans), default=0),
+                'llm_calls': sum(s['llm_calls'] for s in self.spans),
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'bytes_written': sum(s['bytes_written'] for s in self.spans),
+                'cost_usd': estimate_cost(self.model, input_tokens, output_tokens),
+            }
+        }
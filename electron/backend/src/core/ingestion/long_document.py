@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Long Document Condenser - Map-reduce fact extraction for large sources
+
+Long emails, browser pages and Notion exports don't fit the analyzer's
+single prompt. Instead of truncating them we:
+
+1. Split on structure: MIME parts, markdown headings, then paragraphs
+2. Map: extract concise facts from every chunk in parallel (one LLM call each)
+3. Reduce: dedupe the facts and, if they still exceed the merge budget,
+   consolidate them in parallel rounds until they fit
+
+The resulting fact digest replaces the raw text for routing, so the normal
+analyzer produces one edit plan covering the whole document. Facts that
+still don't fit the budget after the last round are never dropped: they
+go into further digests, each ingested on its own.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.llm_client import LLMClient
+
+
+# Documents longer than this go through map-reduce
+LONG_DOCUMENT_CHARS = int(os.getenv("LOCALBRAIN_LONG_DOC_CHARS", 12000))
+
+EXTRACT_SYSTEM_PROMPT = """You extract facts from one part of a longer document. Be concise.
+
+RULES:
+1. One fact per entry, a single self-contained sentence
+2. Keep exact names, numbers, dates, amounts, links and decisions
+3. Skip boilerplate: signatures, footers, navigation, legal text, quoted replies
+4. No opinions or commentary about the document
+
+OUTPUT: Valid JSON only. No markdown fences.
+{"title": "Short topic of this part", "facts": ["...", "..."]}
+"""
+
+MERGE_SYSTEM_PROMPT = """You merge fact lists extracted from parts of one document.
+
+RULES:
+1. Combine duplicates and near-duplicates into one fact
+2. Keep every distinct fact with its exact names, numbers and dates
+3. One self-contained sentence per fact
+
+OUTPUT: Valid JSON only. No markdown fences.
+{"facts": ["...", "..."]}
+"""
+
+_MIME_BOUNDARY = re.compile(r'^--[\w\'()+,./:=?-]{6,}(--)?\s*$', re.MULTILINE)
+_MIME_HEADER = re.compile(r'^(Content-[\w-]+|MIME-Version):.*$\n?', re.MULTILINE | re.IGNORECASE)
+_HEADING = re.compile(r'^(?=#{1,6}\s)', re.MULTILINE)
+_PARAGRAPH = re.compile(r'\n\s*\n')
+_SENTENCE = re.compile(r'(?<=[.!?])\s+')
+
+
+def _split_block(block: str, max_chars: int) -> List[str]:
+    """Split one oversized block on sentences, then hard-cut as a last resort."""
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_document(text: str, max_chunk_chars: int = 6000) -> List[str]:
+    """
+    Split text into chunks of at most max_chunk_chars along its structure.
+
+    MIME boundaries and headings always start a new block; blocks are split
+    further on blank lines and packed greedily into chunks.
+    """
+    blocks = []
+    for part in _MIME_BOUNDARY.split(text):
+        if not part:
+            continue
+        part = _MIME_HEADER.sub('', part)
+        for section in _HEADING.split(part):
+            for paragraph in _PARAGRAPH.split(section):
+                paragraph = paragraph.strip()
+                if not paragraph:
+                    continue
+                if len(paragraph) > max_chunk_chars:
+                    blocks.extend(_split_block(paragraph, max_chunk_chars))
+                else:
+                    blocks.append(paragraph)
+
+    chunks = []
+    current = ""
+    for block in blocks:
+        if current and len(current) + len(block) + 2 > max_chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _fact_list(facts) -> List[str]:
+    """Facts from an LLM response: a list of strings (anything else is dropped)."""
+    if isinstance(facts, str):
+        return [facts]
+    if not isinstance(facts, list):
+        return []
+    return [str(fact) for fact in facts if isinstance(fact, (str, int, float))]
+
+
+class LongDocumentCondenser:
+    """Condenses long documents into a fact digest via parallel LLM calls."""
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        max_chunk_chars: int = 6000,
+        max_chunks: int = 32,
+        max_merge_chars: int = 8000,
+        max_workers: int = 4,
+        max_reduce_rounds: int = 3
+    ):
+        """
+        Args:
+            llm: Client used for extraction and merging
+            max_chunk_chars: Target size of each map chunk
+            max_chunks: Upper bound on map calls; longer documents get
+                proportionally larger chunks instead of being truncated
+            max_merge_chars: Budget for one fact digest
+            max_workers: Parallel LLM calls
+            max_reduce_rounds: Consolidation rounds before the facts are
+                split over several digests
+        """
+        self.llm = llm
+        self.max_chunk_chars = max_chunk_chars
+        self.max_chunks = max_chunks
+        self.max_merge_chars = max_merge_chars
+        self.max_workers = max_workers
+        self.max_reduce_rounds = max_reduce_rounds
+
+    @classmethod
+    def from_env(cls, llm: LLMClient, **overrides) -> 'LongDocumentCondenser':
+        """
+        Condenser configured from LOCALBRAIN_LONG_DOC_CHUNK_CHARS,
+        LOCALBRAIN_LONG_DOC_MAX_CHUNKS and LOCALBRAIN_LONG_DOC_MERGE_CHARS.
+        """
+        settings = {
+            'max_chunk_chars': int(os.getenv("LOCALBRAIN_LONG_DOC_CHUNK_CHARS", 6000)),
+            'max_chunks': int(os.getenv("LOCALBRAIN_LONG_DOC_MAX_CHUNKS", 32)),
+            'max_merge_chars': int(os.getenv("LOCALBRAIN_LONG_DOC_MERGE_CHARS", 8000)),
+        }
+        settings.update(overrides)
+        return cls(llm, **settings)
+
+    @staticmethod
+    def is_long(text: str, threshold: int = LONG_DOCUMENT_CHARS) -> bool:
+        return len(text) > threshold
+
+    def condense(self, text: str, source_metadata: Optional[Dict] = None) -> List[str]:
+        """
+        Map-reduce a long document into digests for the content analyzer.
+
+        Returns:
+            Digest texts (document titles followed by one fact per line),
+            each within max_merge_chars; usually just one
+        """
+        chunk_chars = max(self.max_chunk_chars, -(-len(text) // self.max_chunks))
+        chunks = split_document(text, chunk_chars)
+        platform = (source_metadata or {}).get('platform', 'unknown')
+        print(f"📑 Long document ({len(text)} chars) → {len(chunks)} chunk(s)")
+
+        # Map
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            extracted = list(executor.map(
+                lambda args: self._extract(*args),
+                [(chunk, i + 1, len(chunks), platform) for i, chunk in enumerate(chunks)]
+            ))
+
+        titles = []
+        facts = []
+        seen = set()
+        for result in extracted:
+            title = result.get('title')
+            if isinstance(title, str) and title and title not in titles:
+                titles.append(title)
+            for fact in _fact_list(result.get('facts')):
+                key = ' '.join(fact.lower().split())
+                if key and key not in seen:
+                    seen.add(key)
+                    facts.append(fact.strip())
+
+        # Reduce
+        rounds = 0
+        while self._size(facts) > self.max_merge_chars and rounds < self.max_reduce_rounds:
+            rounds += 1
+            before = len(facts)
+            facts = self._reduce(facts)
+            print(f"   Merge round {rounds}: {before} → {len(facts)} facts")
+            if len(facts) >= before:
+                break
+
+        header = f"LONG DOCUMENT ({len(text)} chars, {len(chunks)} parts) - extracted facts"
+        if titles:
+            header += f"\nTopics: {'; '.join(titles[:10])}"
+
+        # Facts over the budget start another digest instead of being cut
+        budget = max(self.max_merge_chars - len(header) - 16, 1)
+        groups: List[List[str]] = [[]]
+        size = 0
+        for fact in facts:
+            fact = fact[:budget - 3]
+            if groups[-1] and size + len(fact) + 3 > budget:
+                groups.append([])
+                size = 0
+            groups[-1].append(fact)
+            size += len(fact) + 3
+
+        if len(groups) > 1:
+            print(f"   Digest budget reached, {len(facts)} facts split over {len(groups)} digests")
+            return [
+                f"{header} (digest {i}/{len(groups)})\n\n" + "\n".join(f"- {fact}" for fact in group)
+                for i, group in enumerate(groups, 1)
+            ]
+        return [header + "\n\n" + "\n".join(f"- {fact}" for fact in groups[0])]
+
+    @staticmethod
+    def _size(facts: List[str]) -> int:
+        return sum(len(fact) + 3 for fact in facts)
+
+    def _extract(self, chunk: str, index: int, total: int, platform: str) -> Dict:
+        prompt = f"""PART {index}/{total} of a {platform} document:
+
+{chunk}
+
+Extract the facts from this part."""
+        try:
+            response = self.llm.call_json(prompt, system=EXTRACT_SYSTEM_PROMPT, max_tokens=2048)
+            return response if isinstance(response, dict) else {}
+        except Exception as e:
+            # Keep the raw text rather than losing the chunk
+            print(f"   ⚠️  Extraction failed for part {index}: {e}")
+            return {'facts': [p.strip() for p in _PARAGRAPH.split(chunk) if p.strip()]}
+
+    def _reduce(self, facts: List[str]) -> List[str]:
+        """One parallel consolidation round over groups of facts."""
+        groups = []
+        current: List[str] = []
+        for fact in facts:
+            if current and self._size(current) + len(fact) > self.max_chunk_chars:
+                groups.append(current)
+                current = []
+            current.append(fact)
+        if current:
+            groups.append(current)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            merged = list(executor.map(self._merge_group, groups))
+        return [fact for group in merged for fact in group]
+
+    def _merge_group(self, facts: List[str]) -> List[str]:
+        prompt = "FACTS:\n" + "\n".join(f"- {fact}" for fact in facts)
+        try:
+            response = self.llm.call_json(prompt, system=MERGE_SYSTEM_PROMPT, max_tokens=2048)
+            merged = _fact_list(response.get('facts') if isinstance(response, dict) else None)
+            return [fact.strip() for fact in merged if fact.strip()] or facts
+        except Exception as e:
+            print(f"   ⚠️  Fact merge failed: {e}")
+            return facts
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detector - SimHash fingerprints for ingested source texts
+
+Exact hashes miss forwarded emails, quoted replies and re-captured pages
+that only differ by a footer. We fingerprint every successfully ingested
+source with a 64-bit SimHash over word shingles and keep a banded index so
+lookups touch only a handful of candidates instead of the whole history.
+
+Concurrent ingests (daemon threads, bulk runs, worker processes) share one
+index per vault and process (get_near_duplicate_index). save() appends only
+the new entries to near_duplicates.log under a file lock and picks up
+whatever other processes appended since, so an ingest costs O(1) I/O
+instead of rewriting the whole index. Every COMPACT_ENTRIES log records
+the log is folded into the near_duplicates.json snapshot (written
+atomically) and truncated.
+"""
+
+import json
+import os
+import re
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.file_ops import write_file
+from utils.process_lock import ProcessLock
+
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+MIN_TOKENS = 8
+
+# 8 bands of 8 bits: by pigeonhole any two fingerprints within Hamming
+# distance 7 (similarity >= 0.89) share at least one band; slightly less
+# similar pairs are still found with high probability
+NUM_BANDS = 8
+BAND_BITS = FINGERPRINT_BITS // NUM_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+INDEX_FILENAME = "near_duplicates.json"
+LOG_FILENAME = "near_duplicates.log"
+
+# Log records before they are folded into the snapshot
+COMPACT_ENTRIES = 1000
+
+_QUOTE_PREFIX = re.compile(r'^\s*>+\s?', re.MULTILINE)
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, ignoring reply quote markers ('> ')."""
+    return _TOKEN.findall(_QUOTE_PREFIX.sub('', text).lower())
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Compute a 64-bit SimHash over word shingles.
+
+    Returns:
+        Fingerprint as int, or None if text is too short to fingerprint
+        reliably (fewer than MIN_TOKENS words)
+    """
+    tokens = tokenize(text)
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights: Dict[str, int] = {}
+    for i in range(len(tokens) - SHINGLE_SIZE + 1):
+        shingle = ' '.join(tokens[i:i + SHINGLE_SIZE])
+        weights[shingle] = weights.get(shingle, 0) + 1
+
+    vector = [0] * FINGERPRINT_BITS
+    for shingle, weight in weights.items():
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(),
+            'big'
+        )
+        for bit in range(FINGERPRINT_BITS):
+            if h & (1 << bit):
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    fingerprint = 0
+    for bit, value in enumerate(vector):
+        if value > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def similarity(a: int, b: int) -> float:
+    """Similarity between two fingerprints (1.0 = identical)."""
+    return 1 - (a ^ b).bit_count() / FINGERPRINT_BITS
+
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index stored in <vault>/.localbrain/near_duplicates.json
+    (snapshot) plus near_duplicates.log (entries appended since).
+
+    Each entry remembers which files the source was written to and the
+    citation number it got there, so a near-duplicate can be routed to a
+    citation-only update instead of a full LLM analysis.
+    """
+
+    def __init__(self, vault_path: Path, threshold: float = 0.85):
+        """
+        Args:
+            vault_path: Path to vault root
+            threshold: Minimum similarity (0.0-1.0) to treat as near-duplicate
+        """
+        self.index_path = Path(vault_path) / '.localbrain' / INDEX_FILENAME
+        self.log_path = self.index_path.with_name(LOG_FILENAME)
+        self.threshold = threshold
+
+        # entries: [fingerprint, timestamp, {relative_path: citation_num}]
+        self.entries: List[list] = []
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(NUM_BANDS)]
+        self._known = set()  # (fingerprint, timestamp) of every entry
+        self._unsaved: List[list] = []
+
+        # How far the log has been read (a new inode means it was compacted)
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._log_records = 0
+
+        self._lock = threading.Lock()
+        self._file_lock = ProcessLock(self.index_path.with_name(INDEX_FILENAME + '.lock'))
+
+        with self._file_lock, self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        """Merge entries from disk into memory (caller holds both locks)."""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            stat = None
+
+        # First load, or another process compacted: reread the snapshot
+        if stat is None or stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            self._load_snapshot()
+            self._log_inode = stat.st_ino if stat else None
+            self._log_offset = 0
+            self._log_records = 0
+        if stat is None:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Only complete lines; a torn last record is skipped for good once
+        # the next append terminates it
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                fp_hex, timestamp, files = json.loads(line)
+                self._insert([int(fp_hex, 16), timestamp, files])
+            except (ValueError, TypeError):
+                continue
+            self._log_records += 1
+        self._log_offset += end
+
+    def _load_snapshot(self) -> None:
+        if not self.index_path.exists():
+            return
+
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️  Could not load near-duplicate index: {e}")
+            return
+
+        for fp_hex, timestamp, files in data.get('entries', []):
+            self._insert([int(fp_hex, 16), timestamp, files])
+
+    def _insert(self, entry: list) -> None:
+        key = (entry[0], entry[1])
+        if key in self._known:
+            return
+        self._known.add(key)
+        idx = len(self.entries)
+        self.entries.append(entry)
+        fingerprint = entry[0]
+        for band in range(NUM_BANDS):
+            key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+            self.bands[band].setdefault(key, []).append(idx)
+
+    def save(self) -> None:
+        """
+        Append entries added since the last save to the log (fingerprints
+        as hex strings), after merging entries other processes appended.
+        """
+        with self._file_lock, self._lock:
+            self._load()
+            if self._unsaved:
+                self._append(self._unsaved)
+                self._unsaved = []
+            if self._log_records >= COMPACT_ENTRIES:
+                self._compact()
+
+    def _append(self, entries: List[list]) -> None:
+        records = ''.join(
+            json.dumps([f"{fp:016x}", timestamp, files], separators=(',', ':')) + '\n'
+            for fp, timestamp, files in entries
+        ).encode('utf-8')
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'ab+') as f:
+            # Terminate a record torn by a crash so it can't swallow ours
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    records = b'\n' + records
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+            stat = os.fstat(f.fileno())
+
+        self._log_inode = stat.st_ino
+        self._log_offset = stat.st_size
+        self._log_records += len(entries)
+
+    def _compact(self) -> None:
+        """Fold the log into the snapshot and start an empty log."""
+        data = {
+            'version': 1,
+            'entries': [
+                [f"{fp:016x}", timestamp, files]
+                for fp, timestamp, files in self.entries
+            ]
+        }
+        write_file(self.index_path, json.dumps(data, separators=(',', ':')), atomic=True)
+        write_file(self.log_path, '', atomic=True)
+
+        stat = os.stat(self.log_path)
+        self._log_inode = stat.st_ino
+        self._log_offset = 0
+        self._log_records = 0
+
+    def query(self, fingerprint: Optional[int]) -> Optional[Tuple[float, Dict]]:
+        """
+        Find the most similar previously ingested source.
+
+        Only entries sharing at least one band are compared, so the cost
+        is proportional to the bucket sizes, not the index size.
+
+        Returns:
+            (similarity, {'files': {...}, 'timestamp': ...}) for the best
+            candidate, or None if nothing shares a band
+        """
+        if fingerprint is None:
+            return None
+
+        with self._lock:
+            candidates = set()
+            for band in range(NUM_BANDS):
+                key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+                candidates.update(self.bands[band].get(key, ()))
+
+            best = None
+            best_similarity = 0.0
+            for idx in candidates:
+                score = similarity(fingerprint, self.entries[idx][0])
+                if score > best_similarity:
+                    best_similarity = score
+                    best = self.entries[idx]
+
+        if best is None:
+            return None
+
+        return best_similarity, {'timestamp': best[1], 'files': best[2]}
+
+    def is_duplicate(self, score: float) -> bool:
+        """Whether a similarity score is above the configured threshold."""
+        return score >= self.threshold
+
+    def add(self, fingerprint: Optional[int], files: Dict[str, int]) -> None:
+        """Record a successfully ingested source."""
+        if fingerprint is None:
+            return
+        with self._lock:
+            entry = [fingerprint, datetime.utcnow().isoformat() + 'Z', files]
+            if (entry[0], entry[1]) not in self._known:
+                self._unsaved.append(entry)
+            self._insert(entry)
+
+
+_indexes: Dict[str, NearDuplicateIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_near_duplicate_index(vault_path: Path) -> NearDuplicateIndex:
+    """Shared index for a vault, loaded on first use."""
+    key = str(vault_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = NearDuplicateIndex(Path(vault_path))
+        return _indexes[key]
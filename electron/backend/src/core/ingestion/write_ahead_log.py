@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Write-Ahead Log - Crash recovery for vault edits
+
+Before an edit set touches the vault, its full new state (markdown content
+and citations of every file) is appended to the process's log,
+<vault>/.localbrain/ingest-<pid>.wal, and fsynced. After the files are
+written a commit marker is appended. If the process dies in between,
+whoever recovers its log finds the entry without a marker and:
+
+- replays it: files still in their pre-edit state get the logged content,
+  so [n] markers never end up without their JSON entries
+- rolls it back: an entry whose record is torn (crash while logging) is
+  discarded - nothing was written for it yet
+- leaves files that changed since (e.g. edited by hand) untouched
+
+Fsyncs are grouped: concurrent transactions that log while an fsync is in
+flight share the next one, and commit markers are only flushed (replaying
+a committed entry is a no-op). The log is truncated once it grows past a
+size limit and no transaction is open.
+
+Every process (daemon, daemon worker, bulk_ingest CLI) appends to its own
+ingest-<pid>.wal and holds an exclusive flock on <log>.lock for as long
+as the log is open, so transaction ids never collide and nobody replays
+or truncates another live process's records. Recovery only touches logs
+whose lock it can take - their owner has exited - and removes them
+afterwards. In a multi-worker daemon the supervisor recovers them with
+recover_write_ahead_logs() before the workers start (workers skip it),
+and the leader worker recovers the logs of workers that crash later.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.file_ops import read_file, write_file, write_json_citations
+from utils.citation_store import get_citation_store
+from utils.process_lock import ProcessLock
+
+
+# Shared log name used before logs were per process (still recovered)
+WAL_FILENAME = 'ingest.wal'
+
+# Truncate the log once it is larger than this and idle
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+
+
+class LogInUse(RuntimeError):
+    """The log is owned by another live process."""
+
+
+def process_log_name() -> str:
+    """Log file name of the current process."""
+    return f"ingest-{os.getpid()}.wal"
+
+
+def _hash_text(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _hash_citations(citations: Optional[Dict]) -> Optional[str]:
+    """Formatting-independent hash of a citation dict."""
+    if citations is None:
+        return None
+    return _hash_text(json.dumps(citations, sort_keys=True))
+
+
+def _encode(record: Dict) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False)
+    return f"{zlib.crc32(payload.encode('utf-8')):08x} {payload}\n".encode('utf-8')
+
+
+def _decode(line: bytes) -> Optional[Dict]:
+    """Parse one log line; None if it is torn or corrupt."""
+    try:
+        text = line.decode('utf-8').rstrip('\n')
+        checksum, payload = text.split(' ', 1)
+        if int(checksum, 16) != zlib.crc32(payload.encode('utf-8')):
+            return None
+        return json.loads(payload)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+class WriteAheadLog:
+    """Append-only redo log for the edit sets of one vault."""
+
+    def __init__(
+        self,
+        vault_path: Path,
+        checkpoint_bytes: int = CHECKPOINT_BYTES,
+        store=None,
+        log_name: Optional[str] = None
+    ):
+        """
+        Args:
+            vault_path: Path to vault root
+            checkpoint_bytes: Log size above which it is truncated when idle
+            store: CitationStore that replayed citations go to (default:
+                JSON sidecars)
+            log_name: File name of the log in <vault>/.localbrain
+                (default: this process's ingest-<pid>.wal)
+
+        Raises:
+            LogInUse: Another live process owns the log
+        """
+        self.vault_path = Path(vault_path)
+        self.store = store
+        self.log_path = self.vault_path / '.localbrain' / (log_name or process_log_name())
+        self.checkpoint_bytes = checkpoint_bytes
+
+        # Held while the log is open: recover/checkpoint never run on a log
+        # another process is still appending to
+        self.owner_lock = ProcessLock(self.log_path.with_name(self.log_path.name + '.lock'))
+        if not self.owner_lock.acquire(blocking=False):
+            raise LogInUse(f"{self.log_path} is in use by another process")
+
+        self._lock = threading.Lock()         # appends, txn bookkeeping
+        self._sync_lock = threading.Lock()    # one fsync at a time
+        self._next_txn = 1
+        self._open_txns: Dict[int, List[str]] = {}
+        self._written_since_checkpoint = set()
+        self._appended = 0                    # records appended
+        self._synced = 0                      # records known durable
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.log_path, 'ab')
+
+        self.stats = {'transactions': 0, 'fsyncs': 0, 'checkpoints': 0}
+
+    # ------------------------------------------------------------------
+    # Logging
+    # ------------------------------------------------------------------
+
+    def begin(self, files: List[Dict]) -> int:
+        """
+        Durably log an edit set before it is applied.
+
+        Args:
+            files: One dict per file: {path, content, citations,
+                original, original_citations}; content/citations are None
+                when that part is unchanged, original/original_citations
+                are None when it did not exist
+
+        Returns:
+            Transaction id to pass to commit()
+        """
+        entries = []
+        for f in files:
+            entries.append({
+                'path': self._relative(f['path']),
+                'md': f.get('content'),
+                'md_before': _hash_text(f.get('original')),
+                'json': f.get('citations'),
+                'json_before': _hash_citations(f.get('original_citations')),
+            })
+
+        with self._lock:
+            txn_id = self._next_txn
+            self._next_txn += 1
+            self._open_txns[txn_id] = [e['path'] for e in entries]
+            seq = self._append({'txn': txn_id, 'op': 'begin', 'files': entries})
+            self.stats['transactions'] += 1
+
+        self._sync(seq)
+        return txn_id
+
+    def commit(self, txn_id: int) -> None:
+        """Mark a logged edit set as fully applied."""
+        with self._lock:
+            self._append({'txn': txn_id, 'op': 'commit'})
+            self._written_since_checkpoint.update(self._open_txns.pop(txn_id, []))
+            idle = not self._open_txns
+
+        if idle and self.log_path.stat().st_size > self.checkpoint_bytes:
+            self.checkpoint()
+
+    def _append(self, record: Dict) -> int:
+        """Append a record (caller holds self._lock); returns its sequence number."""
+        self._file.write(_encode(record))
+        self._file.flush()
+        self._appended += 1
+        return self._appended
+
+    def _sync(self, seq: int) -> None:
+        """
+        Make records up to `seq` durable.
+
+        Whoever gets the sync lock fsyncs everything appended so far, so
+        threads that queued behind an fsync usually find their record
+        already covered.
+        """
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target = self._appended
+            os.fsync(self._file.fileno())
+            self._synced = target
+            self.stats['fsyncs'] += 1
+
+    def checkpoint(self) -> None:
+        """Flush written files to disk and truncate the log (only when idle)."""
+        with self._sync_lock, self._lock:
+            if self._open_txns:
+                return
+
+            # Committed entries may only be dropped once their files are durable
+            for relative_path in self._written_since_checkpoint:
+                path = self.vault_path / relative_path
+                for target in (path, path.with_suffix('.json')):
+                    try:
+                        fd = os.open(target, os.O_RDONLY)
+                    except OSError:
+                        continue
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+
+            self._written_since_checkpoint.clear()
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._synced = self._appended
+            self.stats['checkpoints'] += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+        self.owner_lock.release()
+
+    def remove(self) -> None:
+        """Close and delete the log (after recovering another process's log)."""
+        with self._lock:
+            self._file.close()
+        self.log_path.unlink(missing_ok=True)
+        self.owner_lock.path.unlink(missing_ok=True)
+        self.owner_lock.release()
+
+    def _relative(self, path) -> str:
+        path = Path(path)
+        try:
+            return path.relative_to(self.vault_path).as_posix()
+        except ValueError:
+            return str(path)
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def recover(self) -> Dict:
+        """
+        Replay edit sets that were logged but never marked committed.
+
+        Returns:
+            {replayed, conflicts, discarded} counts
+        """
+        summary = {'replayed': 0, 'conflicts': 0, 'discarded': 0}
+
+        with open(self.log_path, 'rb') as f:
+            lines = f.readlines()
+
+        begun: Dict[int, Dict] = {}
+        for line in lines:
+            record = _decode(line)
+            if record is None:
+                summary['discarded'] += 1
+                continue
+            if record['op'] == 'begin':
+                begun[record['txn']] = record
+            elif record['op'] == 'commit':
+                begun.pop(record['txn'], None)
+
+        for txn_id in sorted(begun):
+            for entry in begun[txn_id]['files']:
+                replayed, conflict = self._replay_file(entry)
+                summary['replayed'] += replayed
+                summary['conflicts'] += conflict
+
+        if begun or summary['discarded']:
+            print(
+                f"🩹 WAL recovery: {len(begun)} incomplete edit set(s), "
+                f"{summary['replayed']} write(s) replayed, {summary['conflicts']} conflict(s), "
+                f"{summary['discarded']} torn record(s) discarded"
+            )
+
+        # Everything is applied (or deliberately skipped) - start a fresh log
+        for entry in (e for record in begun.values() for e in record['files']):
+            self._written_since_checkpoint.add(entry['path'])
+        if self.store is not None:
+            self.store.export_sidecars()
+        self.checkpoint()
+        return summary
+
+    def _replay_file(self, entry: Dict):
+        """
+        Bring one file to its logged state if it is still in its pre-edit
+        state. Returns (parts replayed, parts in conflict).
+        """
+        path = self.vault_path / entry['path']
+        replayed = 0
+        conflicts = 0
+
+        # Leftovers of an interrupted atomic write
+        for tmp in (path.with_name(f".{path.name}.tmp"),
+                    path.with_name(f".{path.with_suffix('.json').name}.tmp")):
+            if tmp.exists():
+                tmp.unlink()
+
+        # Citations first, matching EditTransaction.commit
+        if entry['json'] is not None:
+            json_path = path.with_suffix('.json')
+            try:
+                if self.store is not None:
+                    current = _hash_citations(self.store.get(path))
+                else:
+                    current = _hash_citations(json.loads(read_file(json_path))) if json_path.exists() else None
+            except json.JSONDecodeError:
+                current = 'invalid'
+            if current != _hash_citations(entry['json']):
+                if current == entry['json_before']:
+                    if self.store is not None:
+                        self.store.replace(path, entry['json'])
+                    else:
+                        write_json_citations(path, entry['json'], atomic=True)
+                    replayed += 1
+                else:
+                    print(f"   ⚠️  Citations of {path.name} changed since the interrupted edit, not replayed")
+                    conflicts += 1
+
+        if entry['md'] is not None:
+            current = _hash_text(read_file(path)) if path.exists() else None
+            if current != _hash_text(entry['md']):
+                if current == entry['md_before']:
+                    write_file(path, entry['md'], atomic=True)
+                    replayed += 1
+                else:
+                    print(f"   ⚠️  {path.name} changed since the interrupted edit, not replayed")
+                    conflicts += 1
+
+        return replayed, conflicts
+
+
+_logs: Dict[str, WriteAheadLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_write_ahead_log(
+    vault_path: Path,
+    recover: bool = True,
+    log_name: Optional[str] = None
+) -> WriteAheadLog:
+    """
+    This process's log for a vault; on first use, recovers the logs
+    left behind by processes that exited mid-edit.
+
+    Args:
+        vault_path: Path to vault root
+        recover: Recover orphaned logs first (daemon workers pass False -
+            the supervisor already recovered them)
+        log_name: Log file to use (default: ingest-<pid>.wal); only the
+            first call for a vault decides
+    """
+    key = str(vault_path)
+    with _logs_lock:
+        if key not in _logs:
+            if recover:
+                recover_write_ahead_logs(vault_path)
+            _logs[key] = WriteAheadLog(
+                Path(vault_path), store=get_citation_store(vault_path), log_name=log_name
+            )
+        return _logs[key]
+
+
+def recover_write_ahead_logs(vault_path: Path) -> Dict:
+    """
+    Recover every log of a vault whose owner has exited (ingest.wal and
+    per-process logs) and remove it. Logs of live processes are skipped,
+    so this is safe to call while other processes ingest.
+
+    Returns:
+        Summed {replayed, conflicts, discarded} counts
+    """
+    vault_path = Path(vault_path)
+    total = {'replayed': 0, 'conflicts': 0, 'discarded': 0}
+    log_dir = vault_path / '.localbrain'
+    if not log_dir.exists():
+        return total
+
+    store = get_citation_store(vault_path)
+    for log_path in sorted(log_dir.glob('ingest*.wal')):
+        if str(vault_path) in _logs and _logs[str(vault_path)].log_path == log_path:
+            continue
+        try:
+            wal = WriteAheadLog(vault_path, store=store, log_name=log_path.name)
+        except LogInUse:
+            continue
+        try:
+            summary = wal.recover()
+        except Exception:
+            wal.close()
+            raise
+        wal.remove()
+        for name in total:
+            total[name] += summary[name]
+    return total
@@ -5,7 +5,7 @@ Adds JSON-RPC 2.0 endpoint to existing MCP server for compatibility with
 MCP-compliant clients and remote bridges.
 """
 
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 from loguru import logger
@@ -52,12 +52,12 @@ class JSONRPCHandler:
             is_batch = isinstance(body, list)
             requests = body if is_batch else [body]
             
-            # Process each request
-            responses = []
-            for req in requests:
-                resp = await self._handle_request(req)
-                if resp:
-                    responses.append(resp)
+            # Process each request (tool calls of a batch share one daemon round trip)
+            if is_batch:
+                responses = await self._handle_batch(requests)
+            else:
+                responses = [await self._handle_request(req) for req in requests]
+            responses = [resp for resp in responses if resp]
             
             # Return batch or single response
             if not responses:
@@ -156,13 +156,29 @@ class JSONRPCHandler:
                 },
                 {
                     "name": "open",
-                    "description": "Retrieve full contents of a file",
+                    "description": "Retrieve a file, one section of it, or its table of contents",
                     "inputSchema": {
                         "type": "object",
                         "properties": {
                             "file_path": {
                                 "type": "string",
                                 "description": "Relative path to file in vault"
+                            },
+                            "section": {
+                                "type": "string",
+                                "description": "Heading to return (with its subsections)"
+                            },
+                            "around_line": {
+                                "type": "integer",
+                                "description": "Return the section containing this line"
+                            },
+                            "include_toc": {
+                                "type": "boolean",
+                                "description": "Include the file's table of contents"
+                            },
+                            "outline_only": {
+                                "type": "boolean",
+                                "description": "Return only the table of contents"
                             }
                         },
                         "required": ["file_path"]
@@ -185,30 +201,25 @@ class JSONRPCHandler:
             ]
         }
     
-    async def _handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle tools/call request"""
+    def _tool_request(self, params: Dict[str, Any]) -> Tuple[str, Any]:
+        """(tool name, request model) of a tools/call request"""
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
         
         if not tool_name:
             raise ValueError("Tool name required")
         
-        # Route to appropriate tool
         if tool_name == "search":
-            # Create SearchRequest object
-            search_req = SearchRequest(query=arguments.get("query"))
-            result = await self.tools.search(search_req)
-        elif tool_name == "open":
-            # Create OpenRequest object
-            open_req = OpenRequest(file_path=arguments.get("file_path"))
-            result = await self.tools.open_file(open_req)
-        elif tool_name == "list":
-            # Create ListRequest object
-            list_req = ListRequest(directory_path=arguments.get("directory_path", ""))
-            result = await self.tools.list_directory(list_req)
-        else:
-            raise ValueError(f"Unknown tool: {tool_name}")
-        
+            return tool_name, SearchRequest(query=arguments.get("query"))
+        if tool_name == "open":
+            return tool_name, OpenRequest(**arguments)
+        if tool_name == "list":
+            path = arguments.get("directory_path") or arguments.get("path") or None
+            return tool_name, ListRequest(path=path)
+        raise ValueError(f"Unknown tool: {tool_name}")
+    
+    def _tool_result(self, result: Any) -> Dict[str, Any]:
+        """tools/call result wrapping a tool response"""
         return {
             "content": [
                 {
@@ -218,6 +229,66 @@ class JSONRPCHandler:
             ]
         }
     
+    async def _handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle tools/call request"""
+        tool_name, tool_request = self._tool_request(params)
+        
+        # Route to appropriate tool
+        if tool_name == "search":
+            result = await self.tools.search(tool_request)
+        elif tool_name == "open":
+            result = await self.tools.open(tool_request)
+        else:
+            result = await self.tools.list(tool_request)
+        
+        return self._tool_result(result)
+    
+    async def _handle_batch(self, requests: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Handle a JSON-RPC batch.
+        
+        tools/call requests are sent to the daemon together in one /batch
+        request (run concurrently there); everything else is handled one
+        by one. Responses keep the order of the requests.
+        """
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        calls = []  # (index, request id, tool name, request model)
+        
+        for index, req in enumerate(requests):
+            if not (
+                isinstance(req, dict)
+                and req.get("jsonrpc") == "2.0"
+                and req.get("method") == "tools/call"
+                and req.get("id") is not None
+            ):
+                if not isinstance(req, dict):
+                    responses[index] = self._error_response(None, -32600, "Invalid Request")
+                else:
+                    responses[index] = await self._handle_request(req)
+                continue
+            try:
+                tool_name, tool_request = self._tool_request(req.get("params", {}))
+            except Exception as e:
+                logger.error(f"Error handling tools/call: {e}")
+                responses[index] = self._error_response(req["id"], -32603, f"Internal error: {str(e)}")
+                continue
+            calls.append((index, req["id"], tool_name, tool_request))
+        
+        if calls:
+            results = await self.tools.batch([(tool, tool_request) for _, _, tool, tool_request in calls])
+            for (index, req_id, tool_name, _), result in zip(calls, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error handling tools/call ({tool_name}): {result}")
+                    responses[index] = self._error_response(req_id, -32603, f"Internal error: {str(result)}")
+                else:
+                    responses[index] = {
+                        "jsonrpc": "2.0",
+                        "id": req_id,
+                        "result": self._tool_result(result)
+                    }
+        
+        return responses
+    
     async def _handle_resources_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle resources/list request"""
         # Future: Return available resources (files in vault)
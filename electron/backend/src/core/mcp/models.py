@@ -54,10 +54,15 @@ class OpenRequest(BaseModel):
     """
     Request model for file open tool.
 
-    Retrieve full contents of specific files.
+    Retrieve a file, one section of it, or just its outline.
     """
     file_path: str = Field(..., description="Path to file within vault directory")
     include_metadata: bool = Field(True, description="Include file metadata in response")
+    section: Optional[str] = Field(None, description="Heading to return (with its subsections)")
+    around_line: Optional[int] = Field(None, ge=1, description="Return the section containing this line")
+    lines: Optional[str] = Field(None, description="Line range, e.g. '200-400' (relative to section if given)")
+    include_toc: bool = Field(False, description="Include the file's table of contents")
+    outline_only: bool = Field(False, description="Return only the table of contents")
 
     @validator('file_path')
     def validate_file_path(cls, v):
@@ -137,11 +142,24 @@ class FileMetadata(BaseModel):
     file_type: str
 
 
+class TocEntry(BaseModel):
+    """One heading of a file's table of contents."""
+    level: int
+    title: str
+    line: int
+    end_line: int
+
+
 class OpenResponse(BaseModel):
     """Response model for open tool."""
     file_path: str
     content: str
     metadata: Optional[FileMetadata]
+    section: Optional[str] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    total_lines: Optional[int] = None
+    toc: Optional[List[TocEntry]] = None
 
 
 class IngestResponse(BaseModel):
@@ -5,15 +5,24 @@ Provides HTTP and WebSocket endpoints for MCP tools with authentication,
 rate limiting, and audit logging.
 """
 
+import os
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Dict, Any
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Header, Depends, status
+from fastapi import FastAPI, HTTPException, Header, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from loguru import logger
 
+try:
+    from src.utils.metrics import REGISTRY, CONTENT_TYPE
+    from src.utils import tracing
+except ImportError:
+    from utils.metrics import REGISTRY, CONTENT_TYPE
+    from utils import tracing
+
 from .models import (
     MCPResponse,
     SearchRequest, OpenRequest,
@@ -86,6 +95,12 @@ class MCPServer:
         else:
             logger.warning("Audit logging is disabled")
 
+        # Spans share the daemon's trace file so one trace covers both processes
+        if os.getenv('LOCALBRAIN_TRACING', '1') != '0':
+            tracing.configure_tracing(Path(os.getenv(
+                'LOCALBRAIN_TRACE_FILE', str(Path.home() / '.localbrain' / 'traces.jsonl')
+            )))
+
         # Initialize MCP tools (proxy to daemon)
         daemon_url = f"http://127.0.0.1:{self.config.server.daemon_port}"
 
@@ -113,6 +128,9 @@ class MCPServer:
         if self.audit_logger:
             self.audit_logger.cleanup_old_logs()
 
+        if tracing.get_exporter():
+            tracing.get_exporter().flush()
+
         logger.info("MCP server shutdown complete")
 
     def _setup_middleware(self):
@@ -124,8 +142,26 @@ class MCPServer:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=[tracing.TRACE_HEADER],
         )
 
+        # Trace id: continue the caller's (stdio bridge) or start one; tools
+        # forward it to the daemon
+        @self.app.middleware("http")
+        async def trace_requests(request: Request, call_next):
+            token = tracing.start_trace(request.headers.get(tracing.TRACE_HEADER))
+            request_span = tracing.start_span('mcp.http', method=request.method, path=request.url.path)
+            status_code = 500
+            try:
+                response = await call_next(request)
+                status_code = response.status_code
+                response.headers[tracing.TRACE_HEADER] = tracing.current_trace_id()
+                return response
+            finally:
+                request_span.set(status=status_code)
+                request_span.end()
+                tracing.end_trace(token)
+
     def _setup_exception_handlers(self):
         """Setup global exception handlers."""
         @self.app.exception_handler(Exception)
@@ -231,6 +267,13 @@ class MCPServer:
                 "performance": self.audit_logger.get_performance_metrics()
             }
 
+        @self.app.get("/metrics")
+        async def metrics_endpoint(
+            client: MCPClientAuth = Depends(self._get_current_client)
+        ):
+            """Tool call counters and latency histograms (Prometheus text format)."""
+            return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
         @self.app.get("/mcp/tools")
         async def tools_endpoint():
             """List available MCP tools."""
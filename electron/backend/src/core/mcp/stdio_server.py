@@ -17,6 +17,7 @@ Note: Vault path is configured in ~/.localbrain/config.json, not via environment
 
 import os
 import sys
+import uuid
 import asyncio
 import httpx
 from pathlib import Path
@@ -75,7 +76,7 @@ class LocalBrainMCPServer:
                 ),
                 types.Tool(
                     name="open",
-                    description="Retrieve the full contents of a specific file from the vault. Use when you need to read an entire file.",
+                    description="Retrieve a file from the vault, or just the part you need. For large notes, call with outline_only first, then open one section (or around_line from a search hit) instead of the whole file.",
                     inputSchema={
                         "type": "object",
                         "properties": {
@@ -87,6 +88,28 @@ class LocalBrainMCPServer:
                                 "type": "boolean",
                                 "description": "Include file metadata (size, dates, etc.)",
                                 "default": True
+                            },
+                            "section": {
+                                "type": "string",
+                                "description": "Heading to return, including its subsections (case-insensitive substring)"
+                            },
+                            "around_line": {
+                                "type": "integer",
+                                "description": "Return the section containing this line number"
+                            },
+                            "lines": {
+                                "type": "string",
+                                "description": "Line range, e.g. '200-400' (relative to the section if one is given)"
+                            },
+                            "include_toc": {
+                                "type": "boolean",
+                                "description": "Include the file's table of contents",
+                                "default": False
+                            },
+                            "outline_only": {
+                                "type": "boolean",
+                                "description": "Return only the table of contents",
+                                "default": False
                             }
                         },
                         "required": ["file_path"]
@@ -158,6 +181,10 @@ class LocalBrainMCPServer:
                         text=f"Error: Unknown tool '{name}'"
                     )]
 
+                # One trace per tool call; the MCP server and daemon continue it
+                trace_id = uuid.uuid4().hex
+                print(f"{name}: trace {trace_id}", file=sys.stderr)
+
                 # Call FastAPI server
                 async with httpx.AsyncClient(timeout=30.0) as client:
                     response = await client.post(
@@ -165,7 +192,8 @@ class LocalBrainMCPServer:
                         json=arguments,
                         headers={
                             "X-API-Key": self.api_key,
-                            "Content-Type": "application/json"
+                            "Content-Type": "application/json",
+                            "X-Trace-Id": trace_id
                         }
                     )
 
@@ -255,6 +283,8 @@ class LocalBrainMCPServer:
         content = data.get("content", "")
         metadata = data.get("metadata")
 
+        toc = data.get("toc")
+
         output = f"# {file_path}\n\n"
 
         if metadata:
@@ -262,6 +292,17 @@ class LocalBrainMCPServer:
             modified = metadata.get("modified", "")
             output += f"*Size: {size} bytes | Modified: {modified[:10]}*\n\n"
 
+        if data.get("start_line") and content:
+            where = f" of section '{data['section']}'" if data.get("section") else ""
+            output += f"*Lines {data['start_line']}-{data['end_line']} of {data['total_lines']}{where}*\n\n"
+
+        if toc:
+            output += "**Contents:**\n"
+            for entry in toc:
+                indent = "  " * (entry["level"] - 1)
+                output += f"{indent}- {entry['title']} (lines {entry['line']}-{entry['end_line']})\n"
+            output += "\n"
+
         output += "---\n\n"
         output += content
 
@@ -3,14 +3,24 @@ MCP Tools Implementation - Proxy Layer
 
 Forwards MCP tool requests to the LocalBrain daemon.py backend.
 Acts as a thin wrapper that translates MCP protocol to daemon API calls.
+Every daemon call carries the current trace id (X-Trace-Id).
 """
 
+import time
+import functools
 import httpx
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from loguru import logger
 
+try:
+    from src.utils.metrics import REGISTRY
+    from src.utils.tracing import start_span, trace_headers
+except ImportError:
+    from utils.metrics import REGISTRY
+    from utils.tracing import start_span, trace_headers
+
 from .models import (
     SearchRequest, OpenRequest,
     IngestRequest, ListRequest,
@@ -19,6 +29,48 @@ from .models import (
 )
 
 
+TOOL_CALLS = REGISTRY.counter(
+    'localbrain_mcp_tool_calls_total', 'MCP tool calls by outcome (ok, error)', ('tool', 'outcome')
+)
+TOOL_LATENCY = REGISTRY.histogram(
+    'localbrain_mcp_tool_duration_seconds', 'MCP tool call latency (including the daemon round trip)', ('tool',)
+)
+
+
+# Levels a recursive list tool call expands
+RECURSIVE_LIST_DEPTH = 8
+
+
+def _flatten_tree(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Depth-first entries of a /tree response."""
+    flat = []
+    for item in items:
+        flat.append(item)
+        flat.extend(_flatten_tree(item.get('children', [])))
+    return flat
+
+
+def _instrumented(tool: str):
+    """Count, time and trace calls of an async tool method."""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'error'
+            span = start_span(f'mcp.tool.{tool}')
+            try:
+                result = await method(*args, **kwargs)
+                outcome = 'ok'
+                return result
+            finally:
+                TOOL_CALLS.labels(tool, outcome).inc()
+                TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+                span.set(outcome=outcome)
+                span.end()
+        return wrapper
+    return decorator
+
+
 class MCPTools:
     """
     MCP Tools proxy layer.
@@ -48,6 +100,7 @@ class MCPTools:
     # TOOL: search
     # ========================================================================
 
+    @_instrumented('search')
     async def search(self, request: SearchRequest) -> SearchResponse:
         """
         PURE PROXY - forward search to daemon with ZERO logic.
@@ -57,47 +110,52 @@ class MCPTools:
         try:
             response = await self.client.post(
                 f"{self.daemon_url}/protocol/search",
-                json={"q": request.query}
+                json={"q": request.query},
+                headers=trace_headers()
             )
             response.raise_for_status()
             data = response.json()
 
-            if not data.get('success'):
-                raise RuntimeError(data.get('error', 'Search failed'))
-
-            # Convert daemon response to MCP SearchResponse format
-            contexts = data.get('contexts', [])
-            results = []
-            for i, ctx in enumerate(contexts):
-                # Map daemon fields to MCP SearchResult fields
-                file_path = ctx.get('file', '')  # daemon uses 'file' not 'file_path'
-                text = ctx.get('text', '')
-                
-                results.append(SearchResult(
-                    chunk_id=f"{file_path}:{i}",  # Generate ID from file + index
-                    text=text,
-                    snippet=text[:200] if len(text) > 200 else text,
-                    file_path=file_path,
-                    similarity_score=1.0,  # daemon doesn't return scores yet
-                    final_score=1.0,
-                    platform=ctx.get('platform'),
-                    timestamp=ctx.get('timestamp'),
-                    chunk_position=i,
-                    source={}  # Empty dict - daemon citations are list, not dict
-                ))
-
-            return SearchResponse(
-                query=request.query,
-                processed_query=data.get('query', request.query),
-                results=results,
-                total=len(results),
-                took_ms=0  # Calculated by caller
-            )
+            return self._search_response(request, data)
 
         except httpx.HTTPError as e:
             logger.error(f"Daemon request failed: {e}")
             raise RuntimeError(f"Failed to connect to daemon: {e}")
 
+    def _search_response(self, request: SearchRequest, data: Dict[str, Any]) -> SearchResponse:
+        """Convert a daemon /protocol/search body to a SearchResponse."""
+        if not data.get('success'):
+            raise RuntimeError(data.get('error', 'Search failed'))
+
+        # Convert daemon response to MCP SearchResponse format
+        contexts = data.get('contexts', [])
+        results = []
+        for i, ctx in enumerate(contexts):
+            # Map daemon fields to MCP SearchResult fields
+            file_path = ctx.get('file', '')  # daemon uses 'file' not 'file_path'
+            text = ctx.get('text', '')
+            
+            results.append(SearchResult(
+                chunk_id=f"{file_path}:{i}",  # Generate ID from file + index
+                text=text,
+                snippet=text[:200] if len(text) > 200 else text,
+                file_path=file_path,
+                similarity_score=1.0,  # daemon doesn't return scores yet
+                final_score=1.0,
+                platform=ctx.get('platform'),
+                timestamp=ctx.get('timestamp'),
+                chunk_position=i,
+                source={}  # Empty dict - daemon citations are list, not dict
+            ))
+
+        return SearchResponse(
+            query=request.query,
+            processed_query=data.get('query', request.query),
+            results=results,
+            total=len(results),
+            took_ms=0  # Calculated by caller
+        )
+
     # Note: No summarize tool - was fake logic in MCP layer.
     # If needed in future, implement properly in daemon.
 
@@ -105,12 +163,14 @@ class MCPTools:
     # TOOL: open
     # ========================================================================
 
+    @_instrumented('open')
     async def open(self, request: OpenRequest) -> OpenResponse:
         """
-        Retrieve full contents of a specific file - proxies to daemon /file/{filepath}.
+        Retrieve a file, one of its sections or its outline - proxies to daemon /file/{filepath}.
 
         Args:
-            request: OpenRequest with file path
+            request: OpenRequest with file path and optional section /
+                around_line / lines window and table of contents flags
 
         Returns:
             OpenResponse with file content and metadata
@@ -120,28 +180,14 @@ class MCPTools:
         # Forward to daemon
         try:
             response = await self.client.get(
-                f"{self.daemon_url}/file/{request.file_path}"
+                f"{self.daemon_url}/file/{request.file_path}",
+                params=self._open_params(request),
+                headers=trace_headers()
             )
             response.raise_for_status()
             data = response.json()
 
-            # Build metadata if requested
-            metadata = None
-            if request.include_metadata:
-                metadata = FileMetadata(
-                    name=Path(data['path']).name,
-                    path=data['path'],
-                    size=data.get('size', 0),
-                    created=datetime.fromtimestamp(data.get('last_modified', 0)),
-                    modified=datetime.fromtimestamp(data.get('last_modified', 0)),
-                    file_type=Path(data['path']).suffix[1:] if Path(data['path']).suffix else "unknown"
-                )
-
-            return OpenResponse(
-                file_path=data['path'],
-                content=data['content'],
-                metadata=metadata
-            )
+            return self._open_response(request, data)
 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -154,10 +200,51 @@ class MCPTools:
             logger.error(f"Daemon request failed: {e}")
             raise RuntimeError(f"Failed to connect to daemon: {e}")
 
+    def _open_params(self, request: OpenRequest) -> Dict[str, Any]:
+        """Daemon /file query parameters of an open request."""
+        params = {}
+        if request.section:
+            params['section'] = request.section
+        if request.around_line is not None:
+            params['around_line'] = request.around_line
+        if request.lines:
+            params['lines'] = request.lines
+        if request.outline_only:
+            params['toc'] = 'only'
+        elif request.include_toc:
+            params['toc'] = 'true'
+        return params
+
+    def _open_response(self, request: OpenRequest, data: Dict[str, Any]) -> OpenResponse:
+        """Convert a daemon /file body to an OpenResponse."""
+        # Build metadata if requested
+        metadata = None
+        if request.include_metadata:
+            metadata = FileMetadata(
+                name=Path(data['path']).name,
+                path=data['path'],
+                size=data.get('size', 0),
+                created=datetime.fromtimestamp(data.get('last_modified', 0)),
+                modified=datetime.fromtimestamp(data.get('last_modified', 0)),
+                file_type=Path(data['path']).suffix[1:] if Path(data['path']).suffix else "unknown"
+            )
+
+        return OpenResponse(
+            file_path=data['path'],
+            content=data.get('content') or '',
+            metadata=metadata,
+            section=data.get('section'),
+            start_line=data.get('start_line'),
+            end_line=data.get('end_line'),
+            total_lines=data.get('total_lines'),
+            toc=data.get('toc')
+        )
+
     # ========================================================================
     # TOOL: ingest
     # ========================================================================
 
+    @_instrumented('ingest')
     async def ingest(self, request: IngestRequest) -> IngestResponse:
         """
         Ingest new content into the vault - proxies to daemon /protocol/ingest.
@@ -177,7 +264,8 @@ class MCPTools:
                     "context": request.content,
                     "source_metadata": request.source_metadata or {},
                     "filename": request.filename
-                }
+                },
+                headers=trace_headers()
             )
             response.raise_for_status()
             data = response.json()
@@ -196,6 +284,7 @@ class MCPTools:
     # TOOL: list
     # ========================================================================
 
+    @_instrumented('list')
     async def list(self, request: ListRequest) -> ListResponse:
         """
         List directory contents - proxies to daemon /list endpoint.
@@ -208,44 +297,21 @@ class MCPTools:
         """
         logger.info(f"MCP proxy list: {request.path or '/'}")
 
-        # Forward to daemon
+        # Forward to daemon (recursive listings come from /tree in one round trip)
         try:
             path = request.path or ""
-            url = f"{self.daemon_url}/list/{path}" if path else f"{self.daemon_url}/list"
-
-            response = await self.client.get(url)
+            if request.recursive:
+                response = await self.client.get(
+                    f"{self.daemon_url}/tree",
+                    params={"path": path, "depth": RECURSIVE_LIST_DEPTH},
+                    headers=trace_headers()
+                )
+            else:
+                url = f"{self.daemon_url}/list/{path}" if path else f"{self.daemon_url}/list"
+                response = await self.client.get(url, headers=trace_headers())
             response.raise_for_status()
             data = response.json()
-
-            # Convert daemon response to MCP ListResponse format
-            items = []
-            total_size = 0
-            for item in data.get('items', []):
-                list_item = ListItem(
-                    name=item['name'],
-                    path=item.get('name'),  # daemon returns relative name
-                    is_directory=item['type'] == 'directory',
-                    size=item.get('size'),
-                    modified=datetime.fromtimestamp(item['last_modified']) if request.include_metadata else None,
-                    file_type=Path(item['name']).suffix[1:] if item['type'] == 'file' and Path(item['name']).suffix else None
-                )
-                items.append(list_item)
-                if list_item.size:
-                    total_size += list_item.size
-
-            # Filter by file types if requested
-            if request.file_types:
-                items = [
-                    item for item in items
-                    if item.is_directory or (item.file_type and item.file_type in request.file_types)
-                ]
-
-            return ListResponse(
-                path=data.get('path', '/'),
-                items=items,
-                total_items=len(items),
-                total_size=total_size if request.include_metadata else None
-            )
+            return self._list_response(request, data)
 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -258,6 +324,121 @@ class MCPTools:
             logger.error(f"Daemon request failed: {e}")
             raise RuntimeError(f"Failed to connect to daemon: {e}")
 
+    def _list_response(self, request: ListRequest, data: Dict[str, Any]) -> ListResponse:
+        """Convert a daemon /list or /tree body to a ListResponse."""
+        entries = _flatten_tree(data['items']) if request.recursive else data.get('items', [])
+
+        # Convert daemon response to MCP ListResponse format
+        items = []
+        total_size = 0
+        for item in entries:
+            list_item = ListItem(
+                name=item['name'],
+                path=item.get('path', item['name']),  # /list returns names only
+                is_directory=item['type'] == 'directory',
+                size=item.get('size'),
+                modified=datetime.fromtimestamp(item['last_modified']) if request.include_metadata else None,
+                file_type=Path(item['name']).suffix[1:] if item['type'] == 'file' and Path(item['name']).suffix else None
+            )
+            items.append(list_item)
+            if list_item.size:
+                total_size += list_item.size
+
+        # Filter by file types if requested
+        if request.file_types:
+            items = [
+                item for item in items
+                if item.is_directory or (item.file_type and item.file_type in request.file_types)
+            ]
+
+        return ListResponse(
+            path=data.get('path', '/'),
+            items=items,
+            total_items=len(items),
+            total_size=total_size if request.include_metadata else None
+        )
+
+    # ========================================================================
+    # Batches
+    # ========================================================================
+
+    def _batch_operation(self, tool: str, request) -> Dict[str, Any]:
+        """Daemon /batch operation of one search / open / list call."""
+        if tool == 'search':
+            return {'op': 'search', 'q': request.query}
+        if tool == 'open':
+            return {'op': 'file', 'path': request.file_path, **self._open_params(request)}
+        if tool == 'list':
+            if request.recursive:
+                return {'op': 'tree', 'path': request.path or '', 'depth': RECURSIVE_LIST_DEPTH}
+            return {'op': 'list', 'path': request.path or ''}
+        raise ValueError(f"Tool cannot be batched: {tool}")
+
+    async def batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Run several search / open / list calls in one daemon round trip
+        (POST /batch); the daemon runs them concurrently.
+
+        Args:
+            calls: (tool name, request model) pairs
+
+        Returns:
+            One response model per call, in order - or the exception the
+            call would have raised on its own
+        """
+        if not calls:
+            return []
+        logger.info(f"MCP proxy batch: {len(calls)} calls")
+
+        started = time.perf_counter()
+        with start_span('mcp.batch', calls=len(calls)):
+            try:
+                response = await self.client.post(
+                    f"{self.daemon_url}/batch",
+                    json={"operations": [
+                        {'id': i, **self._batch_operation(tool, request)}
+                        for i, (tool, request) in enumerate(calls)
+                    ]},
+                    headers=trace_headers()
+                )
+                response.raise_for_status()
+                results = response.json()['results']
+            except httpx.HTTPError as e:
+                logger.error(f"Daemon request failed: {e}")
+                results = None
+                error = RuntimeError(f"Failed to connect to daemon: {e}")
+
+        elapsed = time.perf_counter() - started
+        outcomes = []
+        for i, (tool, request) in enumerate(calls):
+            if results is None:
+                outcome = error
+            else:
+                outcome = self._batch_result(tool, request, results[i])
+            TOOL_CALLS.labels(tool, 'error' if isinstance(outcome, Exception) else 'ok').inc()
+            TOOL_LATENCY.labels(tool).observe(elapsed)
+            outcomes.append(outcome)
+        return outcomes
+
+    def _batch_result(self, tool: str, request, result: Dict[str, Any]) -> Any:
+        """Response model (or exception) of one /batch result."""
+        status, body = result['status'], result.get('body') or {}
+        target = getattr(request, 'file_path', None) or getattr(request, 'path', None)
+        try:
+            if status == 404:
+                raise FileNotFoundError(f"Not found: {target}")
+            if status == 403:
+                raise PermissionError(f"Access denied: {target}")
+            if status != 200:
+                raise RuntimeError(f"{tool} failed ({status}): {body.get('error', body)}")
+            if tool == 'search':
+                return self._search_response(request, body)
+            if tool == 'open':
+                return self._open_response(request, body)
+            return self._list_response(request, body)
+        except Exception as e:
+            return e
+
     async def close(self):
         """Close HTTP client connection."""
         await self.client.aclose()
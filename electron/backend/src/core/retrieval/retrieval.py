@@ -19,6 +19,10 @@ from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from loguru import logger
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.timestamps import to_epoch
+
 
 class RetrievalEngine:
     """
@@ -287,18 +291,20 @@ class RetrievalEngine:
                 if file_path in r['metadata'].get('file_path', '')
             ]
         
-        if 'date_from' in filters:
-            date_from = filters['date_from']
+        # Compare as UTC epochs: chunk timestamps come in mixed formats
+        # (ISO with offsets, RFC 2822 email dates), so strings don't sort
+        date_from = to_epoch(filters.get('date_from'))
+        if date_from is not None:
             filtered = [
                 r for r in filtered
-                if r['metadata'].get('timestamp', '') >= date_from
+                if (to_epoch(r['metadata'].get('timestamp')) or 0) >= date_from
             ]
         
-        if 'date_to' in filters:
-            date_to = filters['date_to']
+        date_to = to_epoch(filters.get('date_to'))
+        if date_to is not None:
             filtered = [
                 r for r in filtered
-                if r['metadata'].get('timestamp', '') <= date_to
+                if (to_epoch(r['metadata'].get('timestamp')) or 0) <= date_to
             ]
         
         # Exclude archived content
@@ -369,8 +375,7 @@ class RetrievalEngine:
             return 0.5  # Neutral if no timestamp
         
         try:
-            ts = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            age_days = (datetime.now() - ts).days
+            age_days = (datetime.now().timestamp() - to_epoch(timestamp)) / 86400
             
             # Exponential decay: newest = 1.0, older = lower
             if age_days <= 7:
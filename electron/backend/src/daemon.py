@@ -9,11 +9,21 @@ Runs as a background service (even when Electron app is closed) and handles:
 
 Usage:
     python src/daemon.py
+
+With LOCALBRAIN_DAEMON_WORKERS=N (or "workers": N in the config) the
+daemon runs N uvicorn worker processes. Shared state (conversation
+sessions, the MCP server pid) lives in ~/.localbrain/daemon-state.db, and
+one leader worker - whoever holds ~/.localbrain/daemon.leader - recovers
+the write-ahead logs of workers that crashed (connector auto-sync is
+disabled; syncing is manual).
 """
 
+import os
 import sys
+import signal
 import json
 import logging
+import time
 import asyncio
 import subprocess
 from pathlib import Path
@@ -22,7 +32,7 @@ from datetime import datetime
 from typing import Dict, Optional, List
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from dotenv import load_dotenv
@@ -40,8 +50,25 @@ from agentic_synthesis import AnswerSynthesizer
 from slack_synthesizer import SlackAnswerSynthesizer
 from bulk_ingest import BulkIngestionPipeline
 from utils.file_ops import read_file
-from config import load_config, update_config, get_vault_path
+from config import load_config, update_config, get_vault_path, CONFIG_DIR
 from connectors.browser.ingest import ingest_browser_data
+from core.ingestion.write_ahead_log import get_write_ahead_log, recover_write_ahead_logs
+from utils.citation_store import get_citation_store
+from utils.timestamps import parse_time_range
+from utils.executors import get_executors, route_limit, RouteSaturated
+from utils.shared_state import get_shared_state
+from utils.process_lock import ProcessLock
+from utils.conversation_store import ConversationStore, DEFAULT_SESSION
+from utils.metrics import REGISTRY, CONTENT_TYPE, gauge_family, merge_snapshots, render_families, write_snapshot
+from utils.llm_governor import get_governor
+from utils.llm_cache import get_default_cache
+from utils.vault_tree import build_tree, tree_etag, etag_matches
+from utils.note_reader import (
+    file_validators, not_modified, read_window, referenced_citations,
+    iter_file_chunks, iter_json_document
+)
+from utils import profiler
+from utils import tracing
 
 # Setup logging
 logging.basicConfig(
@@ -58,16 +85,161 @@ logger = logging.getLogger('localbrain-daemon')
 CONFIG = load_config()
 VAULT_PATH = get_vault_path()
 PORT = CONFIG.get('port', 8765)
+WORKERS = int(os.getenv('LOCALBRAIN_DAEMON_WORKERS', CONFIG.get('workers', 1)))
+
+# Set by main() for the worker processes of a multi-worker daemon
+WORKER_MODE = os.getenv('LOCALBRAIN_DAEMON_WORKER') == '1'
 
 # FastAPI app
 app = FastAPI(title="LocalBrain Background Service")
 
-# MCP process tracking
+# State shared by all workers (MCP server pid)
+STATE_DB = CONFIG_DIR / 'daemon-state.db'
+state = get_shared_state(STATE_DB)
+
+# MCP process started by this worker (any worker can see its pid in state)
 mcp_process: Optional[subprocess.Popen] = None
 
-# Conversation history storage (simple in-memory, last 25 messages)
-conversation_history: List[Dict] = []
+# Conversation history per session (last 25 messages, token-trimmed);
+# evicted sessions spill to the state database, workers share it directly
 MAX_CONVERSATION_HISTORY = 25
+conversations = ConversationStore(
+    max_sessions=int(os.getenv('LOCALBRAIN_MAX_SESSIONS', 256)),
+    max_tokens=int(os.getenv('LOCALBRAIN_SESSION_MAX_TOKENS', 8000)),
+    max_messages=MAX_CONVERSATION_HISTORY,
+    spill_path=STATE_DB if WORKER_MODE or os.getenv('LOCALBRAIN_CONVERSATION_SPILL', '1') != '0' else None,
+    shared=WORKER_MODE
+)
+
+# Held by the one worker that runs vault-wide background duties
+leader_lock = ProcessLock(CONFIG_DIR / 'daemon.leader')
+
+# Seconds between the leader's scans for logs of crashed workers
+WAL_RECOVERY_INTERVAL = int(os.getenv('LOCALBRAIN_WAL_RECOVERY_INTERVAL', 60))
+
+# Workers publish their metrics here every few seconds so that a /metrics
+# scrape, which lands on one worker, reports all of them
+METRICS_DIR = CONFIG_DIR / 'metrics'
+METRICS_EXPORT_INTERVAL = float(os.getenv('LOCALBRAIN_METRICS_EXPORT_INTERVAL', 5))
+
+# Thread pools for blocking work (search, ingestion, LLM calls, disk reads)
+executors = get_executors()
+
+# Request spans (search iterations, tool and LLM calls) go to a local JSONL file
+TRACE_FILE = Path(os.getenv('LOCALBRAIN_TRACE_FILE', str(CONFIG_DIR / 'traces.jsonl')))
+if os.getenv('LOCALBRAIN_TRACING', '1') != '0':
+    tracing.configure_tracing(TRACE_FILE)
+
+# /file streams notes larger than this instead of building one JSON string
+FILE_STREAM_BYTES = int(os.getenv('LOCALBRAIN_FILE_STREAM_BYTES', 1024 * 1024))
+
+# /debug/* endpoints are off unless explicitly enabled
+DEBUG_ENDPOINTS = os.getenv('LOCALBRAIN_DEBUG_ENDPOINTS', str(CONFIG.get('debug_endpoints', ''))).lower() in ('1', 'true')
+
+
+# Request metrics (see /metrics)
+HTTP_REQUESTS = REGISTRY.counter(
+    'localbrain_http_requests_total', 'Daemon HTTP requests', ('route', 'method', 'status')
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    'localbrain_http_request_duration_seconds', 'Daemon HTTP request latency', ('route', 'method')
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'localbrain_http_requests_in_flight', 'Daemon HTTP requests being handled'
+)
+BATCH_OPERATIONS = REGISTRY.counter(
+    'localbrain_batch_operations_total', 'Operations run through /batch', ('op', 'status')
+)
+
+
+def _collect_daemon_gauges():
+    """Queue depths and cache sizes, read at scrape time."""
+    stats = executors.stats()
+    pools, routes = stats['pools'], stats['routes']
+    governor = get_governor().stats()
+    sessions = conversations.stats()
+    families = [
+        gauge_family('localbrain_executor_active_threads', 'Busy threads per pool',
+                     [({'pool': name}, pool['active']) for name, pool in pools.items()]),
+        gauge_family('localbrain_executor_queued_tasks', 'Tasks waiting for a pool thread',
+                     [({'pool': name}, pool['queued']) for name, pool in pools.items()]),
+        gauge_family('localbrain_executor_max_threads', 'Pool size',
+                     [({'pool': name}, pool['max_workers']) for name, pool in pools.items()]),
+        ('localbrain_executor_tasks_total', 'counter', 'Pool tasks finished by outcome',
+         [({'pool': name, 'outcome': outcome}, pool[outcome])
+          for name, pool in pools.items() for outcome in ('completed', 'failed')]),
+        gauge_family('localbrain_route_in_flight', 'Requests holding a route slot',
+                     [({'route': name}, route['in_flight']) for name, route in routes.items()]),
+        gauge_family('localbrain_route_waiting', 'Requests waiting for a route slot',
+                     [({'route': name}, route['waiting']) for name, route in routes.items()]),
+        ('localbrain_route_rejected_total', 'counter', 'Requests rejected with 503 after waiting for a slot',
+         [({'route': name}, route['rejected']) for name, route in routes.items()]),
+        gauge_family('localbrain_llm_in_flight', 'Anthropic calls admitted by the governor', [({}, governor['in_flight'])]),
+        gauge_family('localbrain_llm_waiting', 'Anthropic calls waiting for admission', [({}, governor['waiting'])]),
+        gauge_family('localbrain_conversation_sessions', 'Conversation sessions by tier',
+                     [({'tier': 'memory'}, sessions['sessions_in_memory']),
+                      ({'tier': 'spilled'}, sessions['sessions_spilled'])]),
+    ]
+    cache = get_default_cache()
+    if cache is not None:
+        cache_stats = cache.stats()
+        families += [
+            gauge_family('localbrain_llm_cache_entries', 'LLM response cache entries', [({}, cache_stats['entries'])]),
+            gauge_family('localbrain_llm_cache_bytes', 'LLM response cache size', [({}, cache_stats['size_bytes'])]),
+            ('localbrain_llm_cache_lookups_total', 'counter', 'LLM response cache lookups by result',
+             [({'result': 'hit'}, cache_stats['hits']), ({'result': 'miss'}, cache_stats['misses'])]),
+        ]
+    return families
+
+
+REGISTRY.register_collector(_collect_daemon_gauges)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count, time and trace every request by its route template."""
+    started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+    # Tag the request so profiler samples on pool threads can be attributed to it
+    profile_token = profiler.begin_request(f"{request.method} {request.url.path}")
+    # Continue the caller's trace (MCP server, stdio bridge) or start one
+    trace_token = tracing.start_trace(request.headers.get(tracing.TRACE_HEADER))
+    request_span = tracing.start_span('http', method=request.method, path=request.url.path)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers[tracing.TRACE_HEADER] = tracing.current_trace_id()
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        profiler.end_request(profile_token, elapsed)
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get('route')
+        path = getattr(route, 'path', 'unmatched')
+        request_span.set(route=path, status=status)
+        request_span.end()
+        tracing.end_trace(trace_token)
+        HTTP_REQUESTS.labels(path, request.method, status).inc()
+        HTTP_LATENCY.labels(path, request.method).observe(elapsed)
+
+
+def _slack_session(slack_context: Dict) -> str:
+    """Session id of a Slack conversation: one per thread (or channel)."""
+    server = slack_context.get('server_name', '')
+    channel = slack_context.get('channel_name', '')
+    thread = slack_context.get('thread_id')
+    return f"slack:{server}:{channel}:{thread}" if thread else f"slack:{server}:{channel}"
+
+
+def _saturated(error: RouteSaturated) -> JSONResponse:
+    """503 for a request that waited too long for a route slot."""
+    logger.warning(str(error))
+    return JSONResponse(
+        status_code=503,
+        headers={'Retry-After': '5'},
+        content={'error': str(error), 'route': error.route}
+    )
 
 # Include connector plugin routes
 from connectors.connector_api import create_connector_router
@@ -80,6 +252,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["ETag", "Last-Modified", tracing.TRACE_HEADER],  # Readable by the UI (conditional requests)
 )
 
 # Background task for auto-syncing all connectors
@@ -93,7 +266,7 @@ async def auto_sync_connectors():
             from connectors.connector_manager import get_connector_manager
             
             manager = get_connector_manager(vault_path=VAULT_PATH)
-            results = manager.sync_all(auto_ingest=True)
+            results = await executors.llm.run(manager.sync_all, auto_ingest=True)
             
             # Log results
             for connector_id, result in results.items():
@@ -125,20 +298,21 @@ async def auto_sync_calendar():
                 # Check if initial sync is needed (first connection)
                 if connector.needs_initial_sync():
                     logger.info("📅 Auto-sync: First connection detected, performing initial sync (30 days)...")
-                    result = connector.initial_sync(max_results=500)
+                    result = await executors.llm.run(connector.initial_sync, max_results=500)
                     logger.info(f"📅 Auto-sync: Initial sync completed - fetched {result.get('events_processed', 0)} events from past 30 days")
                 else:
                     logger.info("📅 Auto-sync: Syncing Calendar...")
-                    result = connector.sync(max_results=100, days=7)
+                    result = await executors.llm.run(connector.sync, max_results=100, days=7)
                 
                 if result['success'] and result['events']:
                     logger.info(f"📅 Auto-sync: Found {len(result['events'])} calendar events, ingesting...")
-                    pipeline = AgenticIngestionPipeline(VAULT_PATH)
+                    pipeline = await executors.disk.run(AgenticIngestionPipeline, VAULT_PATH)
                     
                     ingested = 0
                     for event_data in result['events']:
                         try:
-                            pipeline.ingest(
+                            await executors.llm.run(
+                                pipeline.ingest,
                                 context=event_data['text'],
                                 source_metadata=event_data['metadata']
                             )
@@ -158,18 +332,219 @@ async def auto_sync_calendar():
         # Wait 1 hour before next sync
         await asyncio.sleep(3600)  # 3600 seconds = 1 hour
 
+async def leader_election():
+    """Take over leader duties once no other worker holds the leader lock."""
+    while not leader_lock.acquire(blocking=False):
+        await asyncio.sleep(30)
+    logger.info(f"👑 Worker {os.getpid()} is the leader")
+    
+    # DISABLED: Auto-sync removed - all syncing is now manual only
+    # asyncio.create_task(auto_sync_connectors())
+    
+    # A worker that crashes is restarted with a new pid and log; replay its
+    # old log now instead of on the next daemon start
+    while True:
+        await asyncio.sleep(WAL_RECOVERY_INTERVAL)
+        try:
+            summary = await executors.disk.run(recover_write_ahead_logs, VAULT_PATH)
+            if any(summary.values()):
+                logger.info(f"🩹 Recovered write-ahead logs of exited processes: {summary}")
+        except Exception as e:
+            logger.error(f"Write-ahead log recovery failed: {e}")
+
+
+async def export_metrics():
+    """Publish this worker's metrics for the other workers' /metrics."""
+    worker = str(os.getpid())
+    while True:
+        try:
+            await executors.disk.run(write_snapshot, METRICS_DIR, worker, REGISTRY.families())
+        except Exception as e:
+            logger.error(f"Metrics export failed: {e}")
+        await asyncio.sleep(METRICS_EXPORT_INTERVAL)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on app startup."""
-    # DISABLED: Auto-sync removed - all syncing is now manual only
-    # asyncio.create_task(auto_sync_connectors())
+    try:
+        if WORKER_MODE:
+            # The supervisor already recovered every log; append to our own
+            await executors.disk.run(get_write_ahead_log, VAULT_PATH, recover=False)
+        else:
+            # Finish edit sets interrupted by a crash before serving requests
+            await executors.disk.run(get_write_ahead_log, VAULT_PATH)
+    except Exception as e:
+        logger.error(f"Write-ahead log recovery failed: {e}")
+    
+    asyncio.create_task(leader_election())
+    if WORKER_MODE:
+        asyncio.create_task(export_metrics())
     logger.info("⚠️  Auto-sync DISABLED - all syncing is manual only")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist in-memory conversation sessions and buffered spans."""
+    try:
+        conversations.flush()
+    except Exception as e:
+        logger.error(f"Failed to persist conversations: {e}")
+    if tracing.get_exporter():
+        tracing.get_exporter().flush()
+    if WORKER_MODE:
+        (METRICS_DIR / f"{os.getpid()}.json").unlink(missing_ok=True)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "localbrain-daemon"}
+    return {
+        "status": "healthy",
+        "service": "localbrain-daemon",
+        "worker": os.getpid(),
+        "leader": leader_lock.held
+    }
+
+
+@app.get("/executors")
+async def executor_stats():
+    """
+    Saturation of the worker pools and per-route limits.
+    
+    Pools report active/queued workers, saturation (active / max_workers)
+    and average queue wait and run times; routes report in-flight, waiting
+    and rejected (503) requests.
+    """
+    return executors.stats()
+
+
+def _mcp_pid() -> Optional[int]:
+    """Pid of the running MCP server (started by any worker), else None."""
+    global mcp_process
+    
+    # Reap our own child if it exited
+    if mcp_process and mcp_process.poll() is not None:
+        mcp_process = None
+    
+    pid = state.get('mcp_pid')
+    if pid is None:
+        return None
+    if mcp_process and mcp_process.pid == pid:
+        return pid
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        state.delete('mcp_pid')
+        return None
+    except PermissionError:
+        pass
+    return pid
+
+
+def _wait_for_exit(pid: int, timeout: float) -> bool:
+    """Wait until a process (not necessarily our child) is gone."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: per-route request counts and latency, LLM calls
+    and tokens, search tool calls, connector syncs, ingestion stages, pool
+    and route queue depths, cache and session sizes.
+    
+    With several workers every sample carries a worker="<pid>" label; the
+    other workers' values are their last export (at most a few seconds old).
+    """
+    if not WORKER_MODE:
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+    
+    families = await executors.disk.run(
+        merge_snapshots, METRICS_DIR, str(os.getpid()), REGISTRY.families(), 3 * METRICS_EXPORT_INTERVAL
+    )
+    return PlainTextResponse(render_families(families), media_type=CONTENT_TYPE)
+
+
+@app.get("/debug/profile")
+async def debug_profile(
+    request: Request,
+    seconds: float = 10,
+    format: str = 'collapsed',
+    min_request_ms: Optional[float] = None,
+    interval_ms: float = 5,
+    idle: bool = False
+):
+    """
+    Sample the stacks of every thread of this worker for `seconds`.
+    
+    Requires LOCALBRAIN_DEBUG_ENDPOINTS=1 (or "debug_endpoints": true in
+    the config) and a loopback client. With several workers only the
+    worker that serves the request is profiled (see X-Profile-Pid).
+    
+    Query params:
+    - seconds: Capture length (max 120)
+    - format: "collapsed" (flamegraph.pl / speedscope text) or "speedscope" (JSON)
+    - min_request_ms: Keep only samples of requests at least this slow
+      (samples on the event loop thread can't be attributed and are dropped)
+    - interval_ms: Sampling interval (default 5)
+    - idle: Include threads waiting for work
+    """
+    client = request.client.host if request.client else ''
+    if not DEBUG_ENDPOINTS or client not in ('127.0.0.1', '::1', 'localhost'):
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    if format not in ('collapsed', 'speedscope'):
+        return JSONResponse(status_code=400, content={"error": "format must be 'collapsed' or 'speedscope'"})
+    
+    logger.info(f"🔬 Profiling worker {os.getpid()} for {seconds}s")
+    try:
+        # Runs on its own thread: the sampler must not take a pool slot
+        result = await asyncio.to_thread(
+            profiler.profile,
+            seconds,
+            interval=max(interval_ms, 1) / 1000,
+            min_request_ms=min_request_ms,
+            include_idle=idle
+        )
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
+    
+    headers = {'X-Profile-Pid': str(os.getpid()), 'X-Profile-Samples': str(result.samples)}
+    if format == 'speedscope':
+        return JSONResponse(content=result.speedscope(), headers=headers)
+    return PlainTextResponse(result.collapsed(), headers=headers)
+
+
+@app.get("/debug/traces/{trace_id}")
+async def debug_trace(request: Request, trace_id: str, format: str = 'chrome'):
+    """
+    Spans of one trace (the X-Trace-Id response header of any request).
+    
+    Same guard as /debug/profile. format=chrome returns a Trace Event
+    Format document for ui.perfetto.dev / chrome://tracing; format=tree
+    returns an indented text breakdown. Spans of every worker and of the
+    MCP server are read from the shared trace file.
+    """
+    client = request.client.host if request.client else ''
+    if not DEBUG_ENDPOINTS or client not in ('127.0.0.1', '::1', 'localhost'):
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    exporter = tracing.get_exporter()
+    if exporter is None:
+        return JSONResponse(status_code=404, content={"error": "Tracing disabled (LOCALBRAIN_TRACING=0)"})
+    
+    events = await executors.disk.run(exporter.read, trace_id)
+    if not events:
+        return JSONResponse(status_code=404, content={"error": f"No spans for trace {trace_id}"})
+    if format == 'tree':
+        return PlainTextResponse('\n'.join(tracing.summarize(events)) + '\n')
+    return tracing.chrome_trace(events)
 
 
 @app.post("/mcp/start")
@@ -177,8 +552,9 @@ async def start_mcp():
     """Start the MCP server with remote tunnel."""
     global mcp_process
     
-    if mcp_process and mcp_process.poll() is None:
-        return {"success": True, "message": "MCP already running", "pid": mcp_process.pid}
+    pid = _mcp_pid()
+    if pid:
+        return {"success": True, "message": "MCP already running", "pid": pid}
     
     try:
         # Start the MCP server launcher (includes tunnel)
@@ -192,6 +568,7 @@ async def start_mcp():
             cwd=backend_dir
         )
         
+        state.set('mcp_pid', mcp_process.pid)
         logger.info(f"✅ MCP server started (PID: {mcp_process.pid})")
         return {
             "success": True,
@@ -208,20 +585,36 @@ async def stop_mcp():
     """Stop the MCP server."""
     global mcp_process
     
-    if not mcp_process or mcp_process.poll() is not None:
+    pid = _mcp_pid()
+    if not pid:
         return {"success": True, "message": "MCP not running"}
     
     try:
-        mcp_process.terminate()
-        mcp_process.wait(timeout=5)
-        logger.info("✅ MCP server stopped")
-        mcp_process = None
-        return {"success": True, "message": "MCP server stopped"}
-    except subprocess.TimeoutExpired:
-        mcp_process.kill()
+        if mcp_process and mcp_process.pid == pid:
+            try:
+                mcp_process.terminate()
+                await executors.disk.run(mcp_process.wait, timeout=5)
+                stopped = True
+            except subprocess.TimeoutExpired:
+                mcp_process.kill()
+                stopped = False
+            mcp_process = None
+        else:
+            # Started by another worker: signal it by pid
+            os.kill(pid, signal.SIGTERM)
+            stopped = await executors.disk.run(_wait_for_exit, pid, 5)
+            if not stopped:
+                os.kill(pid, signal.SIGKILL)
+        state.delete('mcp_pid')
+        
+        if stopped:
+            logger.info("✅ MCP server stopped")
+            return {"success": True, "message": "MCP server stopped"}
         logger.warning("⚠️ MCP server force killed")
-        mcp_process = None
         return {"success": True, "message": "MCP server force stopped"}
+    except ProcessLookupError:
+        state.delete('mcp_pid')
+        return {"success": True, "message": "MCP not running"}
     except Exception as e:
         logger.error(f"Failed to stop MCP: {e}")
         return {"success": False, "error": str(e)}
@@ -230,8 +623,9 @@ async def stop_mcp():
 @app.get("/mcp/status")
 async def mcp_status():
     """Get MCP server status."""
-    if mcp_process and mcp_process.poll() is None:
-        return {"running": True, "pid": mcp_process.pid}
+    pid = _mcp_pid()
+    if pid:
+        return {"running": True, "pid": pid}
     return {"running": False}
 
 
@@ -260,10 +654,11 @@ async def update_config_endpoint(request: Request):
         {
             "vault_path": "/path/to/vault",  # optional
             "port": 8765,                     # optional
-            "auto_start": true                # optional
+            "auto_start": true,               # optional
+            "workers": 4                      # optional
         }
     
-    Note: Changing vault_path or port requires restart.
+    Note: Changing vault_path, port or workers requires restart.
     """
     try:
         body = await request.json()
@@ -288,7 +683,7 @@ async def update_config_endpoint(request: Request):
         updated_config = update_config(body)
         
         # Check if restart needed
-        restart_needed = 'vault_path' in body or 'port' in body
+        restart_needed = any(key in body for key in ('vault_path', 'port', 'workers'))
         
         return JSONResponse(content={
             'success': True,
@@ -306,6 +701,7 @@ async def update_config_endpoint(request: Request):
 
 
 @app.post("/protocol/ingest")
+@route_limit('ingest', _saturated)
 async def handle_ingest(request: Request):
     """
     Handle localbrain://ingest protocol requests.
@@ -345,9 +741,10 @@ async def handle_ingest(request: Request):
             'quote': None  # Will be auto-generated by ContentAnalyzer
         }
         
-        # Run ingestion
-        pipeline = AgenticIngestionPipeline(VAULT_PATH)
-        result = pipeline.ingest(text, metadata, max_retries=3)
+        # Run ingestion (building the pipeline reads indexes and may run
+        # WAL recovery - keep it off the event loop)
+        pipeline = await executors.disk.run(AgenticIngestionPipeline, VAULT_PATH)
+        result = await executors.llm.run(pipeline.ingest, text, metadata, max_retries=3)
         
         if result['success']:
             logger.info("Ingestion successful")
@@ -355,6 +752,8 @@ async def handle_ingest(request: Request):
                 'success': True,
                 'files_created': result.get('files_created', []),
                 'files_modified': result.get('files_modified', []),
+                'near_duplicate': result.get('near_duplicate'),
+                'metrics': result.get('metrics'),
                 'message': 'Content ingested successfully'
             })
         else:
@@ -377,6 +776,7 @@ async def handle_ingest(request: Request):
 
 
 @app.post("/browser/ingest")
+@route_limit('browser_ingest', _saturated)
 async def handle_browser_ingest(request: Request):
     """
     Ingest data from the browser connector.
@@ -417,7 +817,7 @@ async def handle_browser_ingest(request: Request):
                 content={'error': 'Missing required parameter: items'}
             )
         
-        result = ingest_browser_data(items, VAULT_PATH)
+        result = await executors.llm.run(ingest_browser_data, items, VAULT_PATH)
         
         return JSONResponse(content=result)
             
@@ -430,6 +830,7 @@ async def handle_browser_ingest(request: Request):
 
 
 @app.post("/protocol/bulk-ingest")
+@route_limit('bulk_ingest', _saturated)
 async def handle_bulk_ingest(request: Request):
     """
     Bulk ingestion endpoint for large datasets.
@@ -446,14 +847,17 @@ async def handle_bulk_ingest(request: Request):
                 {"text": "...", "metadata": {...}},
                 {"text": "...", "metadata": {...}}
             ],
-            "batch_size": 10  // optional
+            "batch_size": 10,  // optional
+            "max_workers": 4,  // optional, batches processed concurrently
+                               // (capped at the LLM pool size)
+            "batching": "topic"  // optional, "topic" or "source"
         }
     """
     try:
         body = await request.json()
         
         items = body.get('items', [])
-        batch_size = body.get('batch_size', 10)
+        batching = body.get('batching', 'topic')
         
         if not items:
             return JSONResponse(
@@ -461,11 +865,27 @@ async def handle_bulk_ingest(request: Request):
                 content={'error': 'Missing required parameter: items'}
             )
         
-        logger.info(f"📦 Bulk ingest: {len(items)} items (batch_size={batch_size})")
+        try:
+            batch_size = int(body.get('batch_size', 10))
+            max_workers = int(body.get('max_workers', 4))
+        except (TypeError, ValueError):
+            return JSONResponse(
+                status_code=400,
+                content={'error': 'batch_size and max_workers must be integers'}
+            )
+        
+        # Each batch worker is a thread of its own; never more than the LLM pool
+        batch_size = max(batch_size, 1)
+        max_workers = min(max(max_workers, 1), executors.llm.max_workers)
+        
+        logger.info(f"📦 Bulk ingest: {len(items)} items (batch_size={batch_size}, workers={max_workers})")
         
         # Run bulk ingestion
-        pipeline = BulkIngestionPipeline(VAULT_PATH)
-        result = pipeline.bulk_ingest(items, batch_size=batch_size)
+        pipeline = await executors.disk.run(BulkIngestionPipeline, VAULT_PATH)
+        result = await executors.llm.run(
+            pipeline.bulk_ingest,
+            items, batch_size=batch_size, max_workers=max_workers, batching=batching
+        )
         
         if result.get('success'):
             stats = result['stats']
@@ -493,6 +913,7 @@ async def handle_bulk_ingest(request: Request):
 
 
 @app.post("/protocol/search")
+@route_limit('search', _saturated)
 async def handle_search(request: Request):
     """
     Handle localbrain://search protocol requests.
@@ -521,7 +942,7 @@ async def handle_search(request: Request):
 
         # Run search
         searcher = Search(VAULT_PATH)
-        result = searcher.search(query)
+        result = await executors.llm.run(searcher.search, query)
 
         if result.get('success'):
             logger.info(f"✅ Search complete: {result.get('total_results', 0)} contexts found")
@@ -551,6 +972,7 @@ async def handle_search(request: Request):
 
 
 @app.post("/protocol/ask")
+@route_limit('ask', _saturated)
 async def handle_ask(request: Request):
     """
     Handle conversational queries with answer synthesis.
@@ -563,7 +985,8 @@ async def handle_ask(request: Request):
 
     Query parameters:
         - q (required): Natural language query
-        - clear_history (optional): Clear conversation history before processing
+        - session_id (optional): Conversation to continue (default: "default")
+        - clear_history (optional): Clear the session's history before processing
 
     Response:
         {
@@ -572,15 +995,15 @@ async def handle_ask(request: Request):
             "answer": "Natural language answer",
             "contexts": [...],
             "total_results": N,
+            "session_id": "...",
             "conversation_length": N
         }
     """
-    global conversation_history
-
     try:
         # Parse request body
         body = await request.json()
         query = body.get('q', body.get('query', ''))
+        session_id = str(body.get('session_id') or DEFAULT_SESSION)
         clear_history = body.get('clear_history', False)
 
         if not query:
@@ -591,14 +1014,14 @@ async def handle_ask(request: Request):
 
         # Clear history if requested
         if clear_history:
-            conversation_history = []
-            logger.info("🗑️  Conversation history cleared")
+            conversations.clear(session_id)
+            logger.info(f"🗑️  Conversation history cleared ({session_id})")
 
         logger.info(f"🧠 Ask: {query}")
 
         # 1. Run agentic search to get contexts
         searcher = Search(VAULT_PATH)
-        search_result = searcher.search(query)
+        search_result = await executors.llm.run(searcher.search, query)
 
         if not search_result.get('success'):
             return JSONResponse(
@@ -615,20 +1038,16 @@ async def handle_ask(request: Request):
 
         # 2. Synthesize conversational answer
         synthesizer = AnswerSynthesizer()
-        answer = synthesizer.synthesize(
+        answer = await executors.llm.run(
+            synthesizer.synthesize,
             query=query,
             contexts=contexts,
-            conversation_history=conversation_history
+            conversation_history=conversations.get(session_id)
         )
         logger.info("✅ Answer synthesis complete")
 
-        # 3. Update conversation history
-        conversation_history.append({"role": "user", "content": query})
-        conversation_history.append({"role": "assistant", "content": answer})
-
-        # Trim to last 25 messages
-        if len(conversation_history) > MAX_CONVERSATION_HISTORY:
-            conversation_history = conversation_history[-MAX_CONVERSATION_HISTORY:]
+        # 3. Update the session's history (trimmed to its budget)
+        conversation_length = conversations.append(session_id, query, answer)
 
         # 4. Return response
         return JSONResponse(content={
@@ -637,7 +1056,8 @@ async def handle_ask(request: Request):
             'answer': answer,
             'contexts': contexts,
             'total_results': len(contexts),
-            'conversation_length': len(conversation_history)
+            'session_id': session_id,
+            'conversation_length': conversation_length
         })
 
     except Exception as e:
@@ -690,6 +1110,7 @@ def _should_respond_to_message(
 
 
 @app.post("/protocol/slack/answer")
+@route_limit('slack', _saturated)
 async def handle_slack_answer(request: Request):
     """
     Handle Slack bot queries with user impersonation.
@@ -707,6 +1128,7 @@ async def handle_slack_answer(request: Request):
                 "asker_name": "John Doe",
                 "thread_id": "optional_thread_id"
             },
+            "session_id": "optional",  // default: one session per thread
             "clear_history": false  // optional
         }
 
@@ -720,8 +1142,6 @@ async def handle_slack_answer(request: Request):
             "conversation_length": N
         }
     """
-    global conversation_history
-
     try:
         # Parse request body
         body = await request.json()
@@ -743,16 +1163,18 @@ async def handle_slack_answer(request: Request):
                 content={'error': 'Missing required parameter: slack_context'}
             )
 
+        session_id = str(body.get('session_id') or _slack_session(slack_context))
+
         # Clear history if requested
         if clear_history:
-            conversation_history = []
-            logger.info("🗑️  Conversation history cleared")
+            conversations.clear(session_id)
+            logger.info(f"🗑️  Conversation history cleared ({session_id})")
 
         logger.info(f"💬 Slack question from {slack_context.get('asker_name', 'Unknown')}: {question}")
 
         # 1. Run agentic search to get contexts
         searcher = Search(VAULT_PATH)
-        search_result = searcher.search(question)
+        search_result = await executors.llm.run(searcher.search, question)
 
         if not search_result.get('success'):
             return JSONResponse(
@@ -786,11 +1208,12 @@ async def handle_slack_answer(request: Request):
             })
 
         # 3. Synthesize Slack-appropriate answer (poses as user)
-        # Use channel history if available, otherwise use conversation_history
-        history_for_context = channel_history if channel_history else conversation_history
+        # Use channel history if available, otherwise the thread's history
+        history_for_context = channel_history if channel_history else conversations.get(session_id)
 
         synthesizer = SlackAnswerSynthesizer()
-        answer = synthesizer.synthesize(
+        answer = await executors.llm.run(
+            synthesizer.synthesize,
             question=question,
             contexts=contexts,
             slack_context=slack_context,
@@ -798,13 +1221,8 @@ async def handle_slack_answer(request: Request):
         )
         logger.info("✅ Slack answer synthesis complete")
 
-        # 4. Update conversation history
-        conversation_history.append({"role": "user", "content": question})
-        conversation_history.append({"role": "assistant", "content": answer})
-
-        # Trim to last 25 messages
-        if len(conversation_history) > MAX_CONVERSATION_HISTORY:
-            conversation_history = conversation_history[-MAX_CONVERSATION_HISTORY:]
+        # 4. Update the thread's history (trimmed to its budget)
+        conversation_length = conversations.append(session_id, question, answer)
 
         # 5. Return response
         return JSONResponse(content={
@@ -813,7 +1231,8 @@ async def handle_slack_answer(request: Request):
             'reason': 'user_interested',
             'question': question,
             'answer': answer,
-            'conversation_length': len(conversation_history)
+            'session_id': session_id,
+            'conversation_length': conversation_length
         })
 
     except Exception as e:
@@ -825,6 +1244,7 @@ async def handle_slack_answer(request: Request):
 
 
 @app.post("/protocol/slack/webhook")
+@route_limit('slack', _saturated)
 async def handle_slack_webhook(request: Request):
     """
     Handle Slack Events API webhook.
@@ -901,12 +1321,13 @@ async def handle_slack_webhook(request: Request):
                 'asker_name': user_id,  # In production, fetch user name via Slack API
                 'thread_id': thread_ts
             }
+            session_id = _slack_session(slack_context)
 
             logger.info(f"🔔 Slack webhook: Question from {user_id} in {channel_id}: {question}")
 
             # Process the question using our answer endpoint logic
             searcher = Search(VAULT_PATH)
-            search_result = searcher.search(question)
+            search_result = await executors.llm.run(searcher.search, question)
 
             if not search_result.get('success'):
                 error_msg = "Sorry, I'm having trouble searching my notes right now."
@@ -922,19 +1343,16 @@ async def handle_slack_webhook(request: Request):
 
             # Synthesize answer
             synthesizer = SlackAnswerSynthesizer()
-            answer = synthesizer.synthesize(
+            answer = await executors.llm.run(
+                synthesizer.synthesize,
                 question=question,
                 contexts=contexts,
                 slack_context=slack_context,
-                conversation_history=conversation_history
+                conversation_history=conversations.get(session_id)
             )
 
-            # Update conversation history
-            conversation_history.append({"role": "user", "content": question})
-            conversation_history.append({"role": "assistant", "content": answer})
-
-            if len(conversation_history) > MAX_CONVERSATION_HISTORY:
-                conversation_history = conversation_history[-MAX_CONVERSATION_HISTORY:]
+            # Update the thread's history
+            conversations.append(session_id, question, answer)
 
             logger.info(f"✅ Slack webhook answer generated: {answer[:100]}...")
 
@@ -961,56 +1379,131 @@ async def handle_slack_webhook(request: Request):
         )
 
 
+def _file_state(file_path: Path):
+    """(stat, citations) of a vault file - its validators (runs on the disk pool)."""
+    stat = file_path.stat()
+    citations = {}
+    if file_path.suffix == '.md':
+        citations = get_citation_store(VAULT_PATH).get(file_path) or {}
+    return stat, citations
+
+
+async def _iterate_on_disk_pool(chunks):
+    """Drive a blocking chunk iterator from the disk pool."""
+    while True:
+        chunk = await executors.disk.run(next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
 @app.get("/file/{filepath:path}")
-async def get_file(filepath: str):
+@route_limit('file', _saturated)
+async def get_file(
+    request: Request,
+    filepath: str,
+    lines: Optional[str] = None,
+    section: Optional[str] = None,
+    around_line: Optional[int] = None,
+    toc: Optional[str] = None,
+    format: str = 'json'
+):
     """
-    Fetch full file content from vault.
+    Fetch file content from vault.
     
     Allows AI apps to dive deeper after getting context chunks from search.
     
-    Example:
+    Responses carry ETag and Last-Modified; a matching If-None-Match or
+    If-Modified-Since gets 304. lines / section return just that part of
+    the note (with only the citations it references); around_line returns
+    the innermost section containing that line (e.g. a grep hit). toc=true
+    adds the note's table of contents, toc=only returns just the outline.
+    Notes larger than LOCALBRAIN_FILE_STREAM_BYTES are streamed;
+    format=raw streams the plain markdown.
+    
+    Examples:
         GET /file/career/Job%20Search.md
+        GET /file/career/Job%20Search.md?lines=200-400
+        GET /file/career/Job%20Search.md?section=Interview%20Prep
+        GET /file/career/Job%20Search.md?section=Interview%20Prep&lines=1-20
+        GET /file/career/Job%20Search.md?around_line=812&toc=true
+        GET /file/career/Job%20Search.md?toc=only
+        GET /file/career/Job%20Search.md?format=raw
     """
     try:
-        file_path = VAULT_PATH / filepath
+        file_path = (VAULT_PATH / filepath).resolve()
         
-        # Security: ensure file is within vault
-        if not file_path.is_relative_to(VAULT_PATH):
+        # Security: ensure file is within vault (after resolving .. and symlinks)
+        if not file_path.is_relative_to(VAULT_PATH.resolve()):
             return JSONResponse(
                 status_code=403,
                 content={'error': 'Access denied: file outside vault'}
             )
         
-        if not file_path.exists():
+        if not file_path.is_file():
             return JSONResponse(
                 status_code=404,
                 content={'error': f'File not found: {filepath}'}
             )
         
-        # Read file content
-        content = read_file(file_path)
+        stat, citations = await executors.disk.run(_file_state, file_path)
+        etag, last_modified = file_validators(stat, citations)
+        headers = {'ETag': etag, 'Last-Modified': last_modified, 'Cache-Control': 'no-cache'}
+        if not_modified(request.headers, etag, stat.st_mtime, citations):
+            return Response(status_code=304, headers=headers)
         
-        # Read citations if available
-        json_path = file_path.with_suffix('.json')
-        citations = {}
-        if json_path.exists():
-            import json
-            try:
-                citations = json.loads(read_file(json_path))
-            except:
-                pass
+        meta = {'path': filepath}
+        info = {'size': stat.st_size, 'last_modified': stat.st_mtime}
         
-        # Get file metadata
-        stat = file_path.stat()
+        toc = (toc or '').lower()
+        include_toc = toc in ('1', 'true', 'only')
+        if lines or section or around_line is not None or include_toc:
+            include_content = toc != 'only'
+            # Mostly outline parsing (the outline cache makes re-reads cheap)
+            window = await executors.cpu.run(
+                read_window, file_path, lines, section, around_line,
+                include_toc=include_toc,
+                include_content=include_content
+            )
+            return JSONResponse(content={
+                **meta,
+                **window,
+                'citations': referenced_citations(window['content'], citations) if include_content else {},
+                **info
+            }, headers=headers)
+        
+        if format == 'raw':
+            return StreamingResponse(
+                _iterate_on_disk_pool(iter_file_chunks(file_path)),
+                media_type='text/markdown; charset=utf-8',
+                headers=headers
+            )
         
+        if stat.st_size > FILE_STREAM_BYTES:
+            return StreamingResponse(
+                _iterate_on_disk_pool(iter_json_document(file_path, meta, {'citations': citations, **info})),
+                media_type='application/json',
+                headers=headers
+            )
+        
+        content = await executors.disk.run(read_file, file_path)
         return JSONResponse(content={
-            'path': filepath,
+            **meta,
             'content': content,
             'citations': citations,
-            'size': stat.st_size,
-            'last_modified': stat.st_mtime
-        })
+            **info
+        }, headers=headers)
         
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={'error': str(e)}
+        )
+    except LookupError as e:
+        return JSONResponse(
+            status_code=404,
+            content={'error': str(e)}
+        )
     except Exception as e:
         logger.exception("Error fetching file")
         return JSONResponse(
@@ -1019,6 +1512,101 @@ async def get_file(filepath: str):
         )
 
 
+@app.get("/citations")
+async def query_citations(
+    platform: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    range: Optional[str] = None,
+    file: Optional[str] = None,
+    limit: int = 100
+):
+    """
+    Query citations across the whole vault (newest first).
+    
+    since/until accept any timestamp format (ISO, RFC 2822, epoch); range
+    accepts expressions like "last week" or "before March 2024".
+    
+    Examples:
+        GET /citations?platform=Gmail&since=2024-10-01
+        GET /citations?platform=Gmail&range=last%20week
+        GET /citations?file=career/Job%20Search.md
+    """
+    try:
+        if range:
+            bounds = parse_time_range(range)
+            if bounds is None:
+                return JSONResponse(
+                    status_code=400,
+                    content={'error': f'Unrecognized time range: {range}'}
+                )
+            since, until = bounds
+        
+        results = await executors.disk.run(
+            get_citation_store(VAULT_PATH).query,
+            platform=platform,
+            since=since,
+            until=until,
+            file=file,
+            limit=min(max(limit, 1), 1000)
+        )
+        return JSONResponse(content={
+            'citations': results,
+            'total': len(results)
+        })
+        
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={'error': str(e)}
+        )
+    except Exception as e:
+        logger.exception("Error querying citations")
+        return JSONResponse(
+            status_code=500,
+            content={'error': str(e)}
+        )
+
+
+def _list_directory(full_path: Path) -> List[Dict]:
+    """Visible .md/.json files and subdirectories (runs on the disk pool)."""
+    # List directory contents
+    items = []
+    for item in sorted(full_path.iterdir()):
+        # Skip hidden files and system files
+        if item.name.startswith('.'):
+            continue
+        
+        stat = item.stat()
+        
+        if item.is_file():
+            # Only include markdown and json files
+            if item.suffix not in ['.md', '.json']:
+                continue
+            
+            items.append({
+                'name': item.name,
+                'type': 'file',
+                'size': stat.st_size,
+                'last_modified': stat.st_mtime
+            })
+        elif item.is_dir():
+            # Count items in directory
+            try:
+                item_count = len([f for f in item.iterdir() if not f.name.startswith('.')])
+            except:
+                item_count = 0
+            
+            items.append({
+                'name': item.name,
+                'type': 'directory',
+                'item_count': item_count,
+                'last_modified': stat.st_mtime
+            })
+    
+    return items
+
+
 @app.get("/list/{path:path}")
 @app.get("/list")
 async def list_files(path: str = ""):
@@ -1034,13 +1622,10 @@ async def list_files(path: str = ""):
     """
     try:
         # Build full path
-        if path:
-            full_path = VAULT_PATH / path
-        else:
-            full_path = VAULT_PATH
+        full_path = (VAULT_PATH / path).resolve()
         
-        # Security: ensure path is within vault
-        if not full_path.is_relative_to(VAULT_PATH):
+        # Security: ensure path is within vault (after resolving .. and symlinks)
+        if not full_path.is_relative_to(VAULT_PATH.resolve()):
             return JSONResponse(
                 status_code=403,
                 content={'error': 'Access denied: path outside vault'}
@@ -1058,39 +1643,7 @@ async def list_files(path: str = ""):
                 content={'error': f'Path is not a directory: {path}'}
             )
         
-        # List directory contents
-        items = []
-        for item in sorted(full_path.iterdir()):
-            # Skip hidden files and system files
-            if item.name.startswith('.'):
-                continue
-            
-            stat = item.stat()
-            
-            if item.is_file():
-                # Only include markdown and json files
-                if item.suffix not in ['.md', '.json']:
-                    continue
-                
-                items.append({
-                    'name': item.name,
-                    'type': 'file',
-                    'size': stat.st_size,
-                    'last_modified': stat.st_mtime
-                })
-            elif item.is_dir():
-                # Count items in directory
-                try:
-                    item_count = len([f for f in item.iterdir() if not f.name.startswith('.')])
-                except:
-                    item_count = 0
-                
-                items.append({
-                    'name': item.name,
-                    'type': 'directory',
-                    'item_count': item_count,
-                    'last_modified': stat.st_mtime
-                })
+        items = await executors.disk.run(_list_directory, full_path)
         
         return JSONResponse(content={
             'path': path if path else '/',
@@ -1106,6 +1659,243 @@ async def list_files(path: str = ""):
         )
 
 
+@app.get("/tree")
+@route_limit('file', _saturated)
+async def get_tree(
+    request: Request,
+    path: str = "",
+    depth: int = 2,
+    limit: int = 500,
+    cursor: Optional[str] = None
+):
+    """
+    Vault folder tree `depth` levels deep in one response.
+    
+    Same entries as /list (visible .md/.json files and folders), with
+    folders expanded into 'children' down to `depth`. Folders with more
+    than `limit` entries are truncated and carry a 'next_cursor'; fetch
+    the rest with /tree?path=<folder>&cursor=<next_cursor>. Responses
+    have an ETag; send it back as If-None-Match to get 304 when nothing
+    in the listed part of the tree changed.
+    
+    Examples:
+        GET /tree                        # root, two levels
+        GET /tree?path=career&depth=5
+        GET /tree?path=inbox&cursor=ZW1haWwtMTIzLm1k
+    """
+    try:
+        path = path.strip('/')
+        full_path = (VAULT_PATH / path).resolve()
+        
+        # Security: ensure path is within vault
+        if not full_path.is_relative_to(VAULT_PATH.resolve()):
+            return JSONResponse(
+                status_code=403,
+                content={'error': 'Access denied: path outside vault'}
+            )
+        
+        if not full_path.is_dir():
+            return JSONResponse(
+                status_code=404,
+                content={'error': f'Directory not found: {path}'}
+            )
+        
+        tree = await executors.disk.run(build_tree, VAULT_PATH, path, depth, limit, cursor)
+        etag = tree_etag(tree)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(content=tree, headers=headers)
+        
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={'error': str(e)}
+        )
+    except Exception as e:
+        logger.exception("Error building tree")
+        return JSONResponse(
+            status_code=500,
+            content={'error': str(e)}
+        )
+
+
+# Operations one /batch request may carry
+MAX_BATCH_OPERATIONS = 50
+BATCH_OPS = ('search', 'file', 'list', 'tree', 'citations')
+
+
+class _BatchRequest:
+    """Stand-in Request handed to a route handler for one /batch operation."""
+    
+    def __init__(self, parent: Request, body: Dict, headers: Optional[Dict] = None):
+        self._body = body
+        self.client = parent.client
+        self.method = 'POST'
+        self.headers = {k.lower(): str(v) for k, v in (headers or {}).items()}
+    
+    async def json(self) -> Dict:
+        return self._body
+
+
+async def _response_payload(response):
+    """(status, body, headers) of a handler's return value."""
+    if not isinstance(response, Response):
+        return 200, response, {}
+    
+    headers = {
+        name: response.headers[name]
+        for name in ('etag', 'last-modified')
+        if name in response.headers
+    }
+    if response.status_code == 304:
+        return 304, None, headers
+    
+    if isinstance(response, StreamingResponse):
+        chunks = [chunk async for chunk in response.body_iterator]
+        body = ''.join(c.decode() if isinstance(c, bytes) else c for c in chunks)
+    else:
+        body = response.body.decode()
+    
+    if 'json' in (response.media_type or ''):
+        body = json.loads(body) if body else None
+    return response.status_code, body, headers
+
+
+def _batch_int(operation: Dict, key: str, default: Optional[int]) -> Optional[int]:
+    """Integer argument of a /batch operation; ValueError if it isn't one."""
+    value = operation.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Invalid {key!r}: expected an integer, got {value!r}")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {key!r}: expected an integer, got {value!r}")
+
+
+def _batch_str(operation: Dict, key: str, default: Optional[str] = None) -> Optional[str]:
+    """String argument of a /batch operation; ValueError if it isn't one."""
+    value = operation.get(key, default)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"Invalid {key!r}: expected a string, got {value!r}")
+    return value
+
+
+async def _run_batch_operation(request: Request, operation: Dict):
+    """Dispatch one /batch operation to its route handler (route limits apply)."""
+    op = operation.get('op')
+    headers = operation.get('headers')
+    try:
+        # Same checks FastAPI's query parsing does for the standalone routes
+        path = _batch_str(operation, 'path', '')
+        if headers is not None and not isinstance(headers, dict):
+            raise ValueError(f"Invalid 'headers': expected an object, got {headers!r}")
+        if op == 'file':
+            args = {
+                'lines': _batch_str(operation, 'lines'),
+                'section': _batch_str(operation, 'section'),
+                'around_line': _batch_int(operation, 'around_line', None),
+                'toc': _batch_str(operation, 'toc'),
+                'format': _batch_str(operation, 'format', 'json')
+            }
+        elif op == 'tree':
+            args = {
+                'depth': _batch_int(operation, 'depth', 2),
+                'limit': _batch_int(operation, 'limit', 500),
+                'cursor': _batch_str(operation, 'cursor')
+            }
+        elif op == 'citations':
+            args = {
+                key: _batch_str(operation, key)
+                for key in ('platform', 'since', 'until', 'range', 'file')
+            }
+            args['limit'] = _batch_int(operation, 'limit', 100)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={'error': str(e)})
+    
+    sub = _BatchRequest(request, operation, headers)
+    
+    if op == 'search':
+        return await handle_search(sub)
+    if op == 'file':
+        return await get_file(sub, path, **args)
+    if op == 'list':
+        return await list_files(path)
+    if op == 'tree':
+        return await get_tree(sub, path, **args)
+    if op == 'citations':
+        return await query_citations(**args)
+    return JSONResponse(
+        status_code=400,
+        content={'error': f"Unknown operation: {op!r} (expected one of {', '.join(BATCH_OPS)})"}
+    )
+
+
+@app.post("/batch")
+async def handle_batch(request: Request):
+    """
+    Run several read operations in one request.
+    
+    Operations run concurrently, each under its own route's concurrency
+    limit and worker pool (as if sent separately); results come back in
+    request order with a per-operation status. A failing operation does
+    not fail the batch.
+    
+    Request body:
+        {"operations": [
+            {"id": "a", "op": "search", "q": "Meta offer"},
+            {"id": "b", "op": "file", "path": "career/Job Search.md", "section": "Offers",
+             "headers": {"If-None-Match": "W/\"...\""}},
+            {"id": "c", "op": "list", "path": "career"},
+            {"id": "d", "op": "tree", "path": "", "depth": 3},
+            {"id": "e", "op": "citations", "platform": "Gmail", "range": "last week"}
+        ]}
+    
+    Response:
+        {"results": [{"id": "a", "op": "search", "status": 200, "body": {...}, "headers": {...}}, ...]}
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        return JSONResponse(status_code=400, content={'error': 'Invalid JSON body'})
+    
+    operations = body.get('operations') if isinstance(body, dict) else body
+    if not isinstance(operations, list) or not all(isinstance(op, dict) for op in operations):
+        return JSONResponse(
+            status_code=400,
+            content={'error': 'Expected {"operations": [{"op": ...}, ...]}'}
+        )
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return JSONResponse(
+            status_code=413,
+            content={'error': f'Too many operations ({len(operations)} > {MAX_BATCH_OPERATIONS})'}
+        )
+    
+    async def run(index: int, operation: Dict) -> Dict:
+        op = operation.get('op')
+        with tracing.span(f'batch.{op}', index=index):
+            try:
+                status, payload, headers = await _response_payload(
+                    await _run_batch_operation(request, operation)
+                )
+            except Exception as e:
+                logger.exception(f"Batch operation {index} ({op}) failed")
+                status, payload, headers = 500, {'error': str(e)}, {}
+        BATCH_OPERATIONS.labels(op if op in BATCH_OPS else 'unknown', status).inc()
+        return {
+            'id': operation.get('id', index),
+            'op': op,
+            'status': status,
+            'body': payload,
+            'headers': headers
+        }
+    
+    results = await asyncio.gather(*(run(i, op) for i, op in enumerate(operations)))
+    return JSONResponse(content={'results': results})
+
+
 @app.get("/protocol/parse")
 async def parse_protocol_url(url: str):
     """
@@ -1155,6 +1945,7 @@ def main():
     logger.info("="*60)
     logger.info(f"Vault: {VAULT_PATH}")
     logger.info(f"Port: {PORT}")
+    logger.info(f"Workers: {WORKERS}")
     logger.info(f"Protocol: localbrain://")
     logger.info("")
     logger.info("Available endpoints:")
@@ -1165,6 +1956,9 @@ def main():
     logger.info("  POST /protocol/slack/webhook - Slack Events API webhook")
     logger.info("  GET  /file/<path>           - Get file contents")
     logger.info("  GET  /list/<path>           - List directory")
+    logger.info("  POST /batch                 - Several reads in one request")
+    logger.info("  GET  /executors             - Worker pool saturation")
+    logger.info("  GET  /metrics               - Prometheus metrics")
     logger.info("")
     logger.info("Gmail Connector:")
     logger.info("  POST /connectors/gmail/auth/start    - Start OAuth")
@@ -1187,13 +1981,29 @@ def main():
     logger.info("="*60)
     
     # Start FastAPI server
-    uvicorn.run(
-        app,
-        host="127.0.0.1",
-        port=PORT,
-        log_level="info",
-        access_log=True
-    )
+    if WORKERS > 1:
+        # Finish every worker's interrupted edit sets before any worker starts
+        recover_write_ahead_logs(VAULT_PATH)
+        os.environ['LOCALBRAIN_DAEMON_WORKER'] = '1'
+        # Each worker governs its share of the LLM limits (utils/llm_governor.py)
+        os.environ['LOCALBRAIN_LLM_PROCESSES'] = str(WORKERS)
+        uvicorn.run(
+            "daemon:app",
+            app_dir=str(Path(__file__).parent),
+            host="127.0.0.1",
+            port=PORT,
+            workers=WORKERS,
+            log_level="info",
+            access_log=True
+        )
+    else:
+        uvicorn.run(
+            app,
+            host="127.0.0.1",
+            port=PORT,
+            log_level="info",
+            access_log=True
+        )
 
 
 if __name__ == "__main__":
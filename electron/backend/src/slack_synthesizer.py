@@ -7,6 +7,8 @@ answering questions using the user's knowledge base with context-appropriate ton
 
 from typing import List, Dict, Optional
 from utils.llm_client import LLMClient
+from utils.llm_governor import INTERACTIVE
+from utils.tracing import traced
 
 
 class SlackAnswerSynthesizer:
@@ -17,8 +19,9 @@ class SlackAnswerSynthesizer:
 
     def __init__(self, model: str = "claude-haiku-4-5-20251001"):
         """Initialize synthesizer with LLM client."""
-        self.llm = LLMClient(model=model)
+        self.llm = LLMClient(model=model, priority=INTERACTIVE)
 
+    @traced('synthesize.slack')
     def synthesize(
         self,
         question: str,
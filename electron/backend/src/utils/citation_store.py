@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Citation Store - Vault-level SQLite index of all citations
+
+Citations used to live only in one `<note>.json` sidecar per markdown file,
+rewritten in full on every append with next numbers found by scanning all
+keys. The store keeps them in <vault>/.localbrain/citations.db instead:
+
+- one row per (file, citation id), indexed by platform and by timestamp
+  normalized to UTC epoch, so queries like "all Gmail citations last week"
+  are an index range scan instead of opening every sidecar
+- atomic next-id allocation per file (safe across threads and processes)
+- appends and edits touch only the changed rows
+
+Sidecars remain the compatibility format. Existing ones are imported on
+first use (and re-imported if edited by hand); changed files are marked
+dirty and exported in the sidecar format by export_sidecars(), which the
+pipelines call once per ingest / bulk chunk rather than on every append.
+Set LOCALBRAIN_CITATION_SIDECARS=0 to stop writing sidecars.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .file_ops import read_json_citations, write_json_citations
+from .timestamps import to_epoch
+
+
+DB_FILENAME = 'citations.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL DEFAULT 1,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    sidecar_mtime INTEGER
+);
+CREATE TABLE IF NOT EXISTS citations (
+    file TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    platform TEXT,
+    timestamp TEXT,
+    ts_epoch REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (file, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INDEXES = """
+DROP INDEX IF EXISTS citations_platform_time;
+DROP INDEX IF EXISTS citations_time;
+CREATE INDEX IF NOT EXISTS citations_platform_epoch ON citations (platform COLLATE NOCASE, ts_epoch);
+CREATE INDEX IF NOT EXISTS citations_epoch ON citations (ts_epoch);
+"""
+
+
+def _sidecar_mtime(sidecar: Path) -> Optional[int]:
+    try:
+        return sidecar.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class CitationStore:
+    """SQLite-backed citations of one vault, keyed by note path."""
+
+    def __init__(self, vault_path: Path, export_sidecars: Optional[bool] = None):
+        """
+        Args:
+            vault_path: Path to vault root
+            export_sidecars: Write <note>.json files on export_sidecars()
+                (default: LOCALBRAIN_CITATION_SIDECARS, on)
+        """
+        self.vault_path = Path(vault_path)
+        self.db_path = self.vault_path / '.localbrain' / DB_FILENAME
+        if export_sidecars is None:
+            export_sidecars = os.getenv('LOCALBRAIN_CITATION_SIDECARS', '1') != '0'
+        self.sidecars_enabled = export_sidecars
+
+        self._local = threading.local()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        conn.executescript(INDEXES)
+        imported = conn.execute("SELECT value FROM meta WHERE key = 'imported'").fetchone()
+        if not imported:
+            count = self.import_sidecars()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported', '1')")
+            if count:
+                print(f"📚 Imported {count} citation file(s) into {DB_FILENAME}")
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Add the epoch column to stores created before it existed."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(citations)")}
+        if 'ts_epoch' in columns:
+            return
+        with self._immediate(conn):
+            conn.execute("ALTER TABLE citations ADD COLUMN ts_epoch REAL")
+            rows = conn.execute("SELECT file, id, timestamp FROM citations").fetchall()
+            conn.executemany(
+                "UPDATE citations SET ts_epoch = ? WHERE file = ? AND id = ?",
+                [(to_epoch(timestamp), key, num) for key, num, timestamp in rows]
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def key(self, file_path) -> str:
+        """Store key of a note: its vault-relative posix path."""
+        path = Path(file_path)
+        if path.is_absolute():
+            try:
+                return path.relative_to(self.vault_path).as_posix()
+            except ValueError:
+                return str(path)
+        return path.as_posix()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, file_path) -> Optional[Dict[str, Dict]]:
+        """
+        Citations of a note in sidecar format {"1": {...}, ...}.
+
+        Returns:
+            None if the note has no citation record at all (no sidecar)
+        """
+        key = self.key(file_path)
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT dirty, sidecar_mtime FROM files WHERE file = ?", (key,)
+        ).fetchone()
+
+        sidecar = (self.vault_path / key).with_suffix('.json')
+        if row is None or (not row[0] and _sidecar_mtime(sidecar) != row[1]):
+            # Unknown, or sidecar edited outside the store
+            if not self._import_sidecar(key):
+                if row is None:
+                    return None
+
+        return {
+            str(num): json.loads(data)
+            for num, data in conn.execute(
+                "SELECT id, data FROM citations WHERE file = ? ORDER BY id", (key,)
+            )
+        }
+
+    def query(
+        self,
+        platform: Optional[str] = None,
+        since=None,
+        until=None,
+        file: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Dict]:
+        """
+        Citations across the vault, newest first.
+
+        Args:
+            platform: Exact platform name (case-insensitive)
+            since / until: Bounds (inclusive / exclusive) as epoch seconds or
+                any timestamp format utils.timestamps understands
+            file: Restrict to one note
+            limit: Maximum rows
+
+        Returns:
+            Citation dicts with 'file', 'id' and 'epoch' added
+        """
+        clauses = []
+        params: List = []
+        if platform:
+            clauses.append("platform = ? COLLATE NOCASE")
+            params.append(platform)
+        for bound, op in ((since, '>='), (until, '<')):
+            if bound is None or bound == '':
+                continue
+            epoch = to_epoch(bound)
+            if epoch is None:
+                raise ValueError(f"Unrecognized timestamp: {bound}")
+            clauses.append(f"ts_epoch {op} ?")
+            params.append(epoch)
+        if file:
+            clauses.append("file = ?")
+            params.append(self.key(file))
+
+        sql = "SELECT file, id, ts_epoch, data FROM citations"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts_epoch DESC LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for file_key, num, epoch, data in self._conn().execute(sql, params):
+            citation = json.loads(data)
+            citation['file'] = file_key
+            citation['id'] = num
+            citation['epoch'] = epoch
+            results.append(citation)
+        return results
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def allocate(self, file_path, count: int = 1) -> int:
+        """
+        Reserve `count` consecutive citation numbers for a note.
+
+        Numbers are never handed out twice, even if the caller abandons
+        them (leaving a gap).
+
+        Returns:
+            First reserved number
+        """
+        key = self.key(file_path)
+        conn = self._conn()
+        self.get(key)  # import the sidecar if not known yet
+        with self._immediate(conn):
+            conn.execute("INSERT OR IGNORE INTO files (file) VALUES (?)", (key,))
+            (first,) = conn.execute(
+                "UPDATE files SET next_id = next_id + ? WHERE file = ? RETURNING next_id - ?",
+                (count, key, count)
+            ).fetchone()
+        return first
+
+    def append(self, file_path, citation: Dict) -> int:
+        """Add one citation under a freshly allocated number and return it."""
+        key = self.key(file_path)
+        num = self.allocate(key)
+        conn = self._conn()
+        with self._immediate(conn):
+            self._upsert(conn, key, num, citation)
+            conn.execute("UPDATE files SET dirty = 1 WHERE file = ?", (key,))
+        return num
+
+    def apply(self, changes: Iterable[Tuple[object, Dict, Dict]]) -> None:
+        """
+        Write citation changes of several notes in one transaction.
+
+        Args:
+            changes: (file_path, citations before, citations after) per
+                note, both in sidecar format; only differing entries are
+                written
+        """
+        conn = self._conn()
+        with self._immediate(conn):
+            for file_path, before, after in changes:
+                key = self.key(file_path)
+                conn.execute("INSERT OR IGNORE INTO files (file) VALUES (?)", (key,))
+                for num, citation in after.items():
+                    if before.get(num) != citation:
+                        self._upsert(conn, key, int(num), citation)
+                for num in before.keys() - after.keys():
+                    conn.execute("DELETE FROM citations WHERE file = ? AND id = ?", (key, int(num)))
+
+                highest = max((int(num) for num in after), default=0)
+                conn.execute(
+                    "UPDATE files SET dirty = 1, next_id = MAX(next_id, ?) WHERE file = ?",
+                    (highest + 1, key)
+                )
+
+    def replace(self, file_path, citations: Dict) -> None:
+        """Make `citations` the full citation set of a note."""
+        self.apply([(file_path, self.get(file_path) or {}, citations)])
+
+    def _upsert(self, conn: sqlite3.Connection, key: str, num: int, citation: Dict) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO citations (file, id, platform, timestamp, ts_epoch, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, num, citation.get('platform'), citation.get('timestamp'),
+             to_epoch(citation.get('timestamp')), json.dumps(citation))
+        )
+
+    @staticmethod
+    def _immediate(conn: sqlite3.Connection):
+        """Write transaction that takes the database lock up front."""
+        return _Transaction(conn)
+
+    # ------------------------------------------------------------------
+    # Sidecar compatibility
+    # ------------------------------------------------------------------
+
+    def _import_sidecar(self, key: str) -> bool:
+        """Load <note>.json into the store, replacing what it had. False if absent."""
+        note = self.vault_path / key
+        sidecar = note.with_suffix('.json')
+        mtime = _sidecar_mtime(sidecar)
+        if mtime is None:
+            return False
+        try:
+            citations = read_json_citations(note)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️  Could not import {sidecar.name}: {e}")
+            return False
+
+        conn = self._conn()
+        with self._immediate(conn):
+            conn.execute("DELETE FROM citations WHERE file = ?", (key,))
+            highest = 0
+            for num, citation in citations.items():
+                if not str(num).isdigit() or not isinstance(citation, dict):
+                    continue
+                self._upsert(conn, key, int(num), citation)
+                highest = max(highest, int(num))
+            conn.execute(
+                "INSERT INTO files (file, next_id, dirty, sidecar_mtime) VALUES (?, ?, 0, ?) "
+                "ON CONFLICT (file) DO UPDATE SET next_id = MAX(next_id, excluded.next_id), "
+                "dirty = 0, sidecar_mtime = excluded.sidecar_mtime",
+                (key, highest + 1, mtime)
+            )
+        return True
+
+    def import_sidecars(self) -> int:
+        """Import every citation sidecar in the vault. Returns the file count."""
+        count = 0
+        for note in self.vault_path.rglob('*.md'):
+            if any(part.startswith('.') for part in note.relative_to(self.vault_path).parts):
+                continue
+            if self._import_sidecar(note.relative_to(self.vault_path).as_posix()):
+                count += 1
+        return count
+
+    def export_sidecars(self, file_paths: Optional[Iterable] = None) -> int:
+        """
+        Write <note>.json for notes changed since their last export.
+
+        Args:
+            file_paths: Only these notes (default: all dirty notes)
+
+        Returns:
+            Number of sidecars written
+        """
+        if not self.sidecars_enabled:
+            return 0
+
+        conn = self._conn()
+        written = 0
+        # Holding the write lock keeps concurrent appends from slipping in
+        # between reading a note's rows and clearing its dirty flag
+        with self._immediate(conn):
+            if file_paths is None:
+                keys = [row[0] for row in conn.execute("SELECT file FROM files WHERE dirty = 1")]
+            else:
+                keys = [self.key(path) for path in file_paths]
+
+            for key in keys:
+                citations = {
+                    str(num): json.loads(data)
+                    for num, data in conn.execute(
+                        "SELECT id, data FROM citations WHERE file = ? ORDER BY id", (key,)
+                    )
+                }
+                note = self.vault_path / key
+                write_json_citations(note, citations, atomic=True)
+                conn.execute(
+                    "UPDATE files SET dirty = 0, sidecar_mtime = ? WHERE file = ?",
+                    (_sidecar_mtime(note.with_suffix('.json')), key)
+                )
+                written += 1
+        return written
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK for an autocommit connection (re-entrant)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.outer = False
+
+    def __enter__(self):
+        if not self.conn.in_transaction:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.outer = True
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.outer:
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+_stores: Dict[str, CitationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_citation_store(vault_path: Path) -> CitationStore:
+    """Shared store for a vault, created (and sidecars imported) on first use."""
+    key = str(vault_path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = CitationStore(Path(vault_path))
+        return _stores[key]
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Conversation Store - Per-session chat history with bounded memory
+
+/protocol/ask and the Slack endpoints used to share one global list of the
+last 25 messages, so every UI user, Slack thread and MCP client talked over
+each other. Here each session (an explicit session_id, or one per Slack
+thread) has its own history:
+
+- trimmed per session to a message count and an approximate token budget
+  (oldest exchanges go first, the latest one is always kept)
+- at most max_sessions kept in memory, least recently used evicted first
+- with a spill file, evicted sessions are written to SQLite and loaded back
+  on their next message instead of being forgotten
+- shared=True (multi-worker daemon) skips the memory tier entirely so all
+  workers read and write the same SQLite rows
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_SESSION = 'default'
+
+PRUNE_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    session TEXT PRIMARY KEY,
+    messages TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversations_updated ON conversations (updated);
+"""
+
+
+def message_tokens(message: Dict) -> int:
+    """Rough token count of a message (~4 chars per token)."""
+    return len(message.get('content') or '') // 4 + 4
+
+
+class ConversationStore:
+    """Histories keyed by session id."""
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        max_tokens: int = 8000,
+        max_messages: int = 25,
+        spill_path: Optional[Path] = None,
+        max_spilled: int = 10000,
+        shared: bool = False
+    ):
+        """
+        Args:
+            max_sessions: Sessions kept in memory (LRU beyond that)
+            max_tokens: Approximate token budget of one session's history
+            max_messages: Message cap of one session's history
+            spill_path: SQLite file evicted sessions are written to
+                (None: evicted sessions are dropped)
+            max_spilled: Sessions kept in the spill file (oldest dropped)
+            shared: Keep every session in the spill file only (required
+                when several processes serve the same sessions)
+        """
+        if shared and spill_path is None:
+            raise ValueError("shared conversation store needs a spill_path")
+
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.max_spilled = max_spilled
+        self.shared = shared
+        self.spill_path = Path(spill_path) if spill_path else None
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._local = threading.local()
+        self._writes = 0
+        self.stats_counters = {'evicted': 0, 'spilled': 0, 'restored': 0, 'trimmed': 0}
+
+        if self.spill_path:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn().executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, session_id: str) -> List[Dict]:
+        """Copy of a session's history (empty for unknown sessions)."""
+        with self._lock:
+            if self.shared:
+                return self._load(session_id) or []
+            return list(self._touch(session_id) or [])
+
+    def append(self, session_id: str, question: str, answer: str) -> int:
+        """
+        Record one exchange and trim the session.
+
+        Returns:
+            The session's message count afterwards
+        """
+        exchange = [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer}
+        ]
+        with self._lock:
+            if self.shared:
+                conn = self._conn()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    history = self._trim((self._load(session_id) or []) + exchange)
+                    self._save(conn, session_id, history)
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                conn.execute('COMMIT')
+                # Pruning scans the table - do it every PRUNE_EVERY writes
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune_spilled()
+                return len(history)
+
+            history = self._trim((self._touch(session_id) or []) + exchange)
+            self._sessions[session_id] = history
+            self._sessions.move_to_end(session_id)
+            self._evict()
+            return len(history)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self.spill_path:
+                self._conn().execute("DELETE FROM conversations WHERE session = ?", (session_id,))
+
+    def flush(self) -> None:
+        """Write every in-memory session to the spill file (e.g. on shutdown)."""
+        if not self.spill_path or self.shared:
+            return
+        with self._lock:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            for session_id, history in self._sessions.items():
+                self._save(conn, session_id, history)
+            conn.execute('COMMIT')
+            self._sessions.clear()
+            self._prune_spilled()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            spilled = 0
+            if self.spill_path:
+                (spilled,) = self._conn().execute("SELECT COUNT(*) FROM conversations").fetchone()
+            return {
+                'sessions_in_memory': len(self._sessions),
+                'sessions_spilled': spilled,
+                'max_sessions': self.max_sessions,
+                **self.stats_counters
+            }
+
+    # ------------------------------------------------------------------
+    # Memory tier (lock held)
+    # ------------------------------------------------------------------
+
+    def _touch(self, session_id: str) -> Optional[List[Dict]]:
+        """History from memory (marked recently used) or the spill file."""
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+            return self._sessions[session_id]
+
+        history = self._load(session_id) if self.spill_path else None
+        if history is not None:
+            # Back in memory - the spilled copy is now stale
+            self._conn().execute("DELETE FROM conversations WHERE session = ?", (session_id,))
+            self._sessions[session_id] = history
+            self.stats_counters['restored'] += 1
+            self._evict()
+        return history
+
+    def _evict(self) -> None:
+        spilled = False
+        while len(self._sessions) > self.max_sessions:
+            session_id, history = self._sessions.popitem(last=False)
+            self.stats_counters['evicted'] += 1
+            if self.spill_path:
+                self._save(self._conn(), session_id, history)
+                self.stats_counters['spilled'] += 1
+                spilled = True
+        if spilled:
+            self._prune_spilled()
+
+    def _trim(self, history: List[Dict]) -> List[Dict]:
+        """Drop the oldest exchanges beyond the message and token budgets."""
+        trimmed = len(history)
+        history = history[-self.max_messages:]
+        tokens = sum(message_tokens(m) for m in history)
+        while len(history) > 2 and tokens > self.max_tokens:
+            tokens -= sum(message_tokens(m) for m in history[:2])
+            history = history[2:]
+        if len(history) < trimmed:
+            self.stats_counters['trimmed'] += 1
+        return history
+
+    # ------------------------------------------------------------------
+    # Spill file
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.spill_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _load(self, session_id: str) -> Optional[List[Dict]]:
+        row = self._conn().execute(
+            "SELECT messages FROM conversations WHERE session = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, conn: sqlite3.Connection, session_id: str, history: List[Dict]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO conversations (session, messages, updated) VALUES (?, ?, ?)",
+            (session_id, json.dumps(history), time.time())
+        )
+
+    def _prune_spilled(self) -> None:
+        self._conn().execute(
+            "DELETE FROM conversations WHERE session IN ("
+            " SELECT session FROM conversations ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+            (self.max_spilled,)
+        )
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Executors - Bounded thread pools that keep blocking work off the event loop
+
+The daemon's handlers are `async def`, but search, ingestion and synthesis
+are synchronous (Anthropic SDK calls, ripgrep, file I/O). Running them
+inline freezes every other request. Instead handlers hand the work to one
+of three pools, each sized for its kind of work:
+
+    llm   - calls that mostly wait on the Anthropic API (search, ingest, answers)
+    disk  - vault reads and directory listings
+    cpu   - markdown parsing (note outlines, section windows) that holds
+            the GIL in short bursts
+
+Per-route limits cap how many requests of one route run at once, so a burst
+of bulk ingests can't occupy every LLM worker while /protocol/ask waits.
+A request that can't get a slot within the queue timeout gets a 503.
+
+Sizes come from the environment:
+    LOCALBRAIN_LLM_WORKERS     (default 16)
+    LOCALBRAIN_DISK_WORKERS    (default 8)
+    LOCALBRAIN_CPU_WORKERS     (default: CPU count)
+    LOCALBRAIN_ROUTE_LIMITS    e.g. "ingest=4,search=8" (overrides defaults)
+    LOCALBRAIN_ROUTE_QUEUE_TIMEOUT  seconds to wait for a route slot (default 30)
+"""
+
+import os
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from .profiler import CURRENT_REQUEST, THREAD_REQUESTS
+
+
+DEFAULT_ROUTE_LIMITS = {
+    'ingest': 4,
+    'bulk_ingest': 1,
+    'browser_ingest': 2,
+    'search': 8,
+    'ask': 8,
+    'slack': 8,
+    'file': 32,
+}
+
+
+class RouteSaturated(Exception):
+    """No route slot became free within the queue timeout."""
+
+    def __init__(self, route: str, timeout: float):
+        super().__init__(f"Too many concurrent '{route}' requests (waited {timeout:.0f}s)")
+        self.route = route
+        self.timeout = timeout
+
+
+class BoundedPool:
+    """ThreadPoolExecutor that tracks how busy it is."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"localbrain-{name}"
+        )
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self.stats_counters = {
+            'completed': 0,
+            'failed': 0,
+            'peak_queued': 0,
+            'wait_seconds': 0.0,
+            'run_seconds': 0.0
+        }
+
+    def _call(self, context: contextvars.Context, fn: Callable, submitted: float, args, kwargs):
+        started = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self.stats_counters['wait_seconds'] += started - submitted
+        # Let the profiler attribute this thread's samples to the request
+        ident = threading.get_ident()
+        request = context.get(CURRENT_REQUEST)
+        if request is not None:
+            THREAD_REQUESTS[ident] = request
+        failed = False
+        try:
+            return context.run(fn, *args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            THREAD_REQUESTS.pop(ident, None)
+            with self._lock:
+                self._active -= 1
+                self.stats_counters['failed' if failed else 'completed'] += 1
+                self.stats_counters['run_seconds'] += time.monotonic() - started
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on this pool (in the caller's context) and await its result."""
+        with self._lock:
+            self._queued += 1
+            self.stats_counters['peak_queued'] = max(self.stats_counters['peak_queued'], self._queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._call, contextvars.copy_context(), fn, time.monotonic(), args, kwargs
+        )
+
+    def stats(self) -> Dict:
+        """Current saturation and lifetime counters."""
+        with self._lock:
+            finished = self.stats_counters['completed'] + self.stats_counters['failed']
+            return {
+                'max_workers': self.max_workers,
+                'active': self._active,
+                'queued': self._queued,
+                'saturation': round(self._active / self.max_workers, 3),
+                'avg_wait_ms': round(1000 * self.stats_counters['wait_seconds'] / finished, 1) if finished else 0.0,
+                'avg_run_ms': round(1000 * self.stats_counters['run_seconds'] / finished, 1) if finished else 0.0,
+                **self.stats_counters
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _acquire_within(semaphore: asyncio.Semaphore, timeout: float) -> None:
+    """
+    semaphore.acquire() with a timeout that never leaks a slot.
+
+    wait_for() can lose an acquire that completes just as the timeout
+    cancels it (Python < 3.12); here a slot acquired after we gave up -
+    on timeout or cancellation - is handed straight back.
+    """
+    task = asyncio.ensure_future(semaphore.acquire())
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except BaseException:
+        task.add_done_callback(
+            lambda t: t.cancelled() or t.exception() is not None or semaphore.release()
+        )
+        task.cancel()
+        raise
+
+
+class RouteLimiter:
+    """Per-route concurrency caps (event-loop side, no threads)."""
+
+    def __init__(self, limits: Dict[str, int], queue_timeout: float = 30.0):
+        self.limits = dict(limits)
+        self.queue_timeout = queue_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+
+    def _semaphore(self, route: str) -> Optional[asyncio.Semaphore]:
+        limit = self.limits.get(route)
+        if not limit:
+            return None
+        if route not in self._semaphores:
+            self._semaphores[route] = asyncio.Semaphore(limit)
+        return self._semaphores[route]
+
+    async def acquire(self, route: str) -> None:
+        semaphore = self._semaphore(route)
+        if semaphore is None:
+            return
+        self._waiting[route] = self._waiting.get(route, 0) + 1
+        try:
+            await _acquire_within(semaphore, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected[route] = self._rejected.get(route, 0) + 1
+            raise RouteSaturated(route, self.queue_timeout)
+        finally:
+            self._waiting[route] -= 1
+        self._in_flight[route] = self._in_flight.get(route, 0) + 1
+
+    def release(self, route: str) -> None:
+        semaphore = self._semaphore(route)
+        if semaphore is None:
+            return
+        self._in_flight[route] -= 1
+        semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            route: {
+                'limit': limit,
+                'in_flight': self._in_flight.get(route, 0),
+                'waiting': self._waiting.get(route, 0),
+                'rejected': self._rejected.get(route, 0)
+            }
+            for route, limit in self.limits.items()
+        }
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """'ingest=4,search=8' -> {'ingest': 4, 'search': 8} (bad entries ignored)."""
+    limits = {}
+    for entry in spec.split(','):
+        name, _, value = entry.partition('=')
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class Executors:
+    """The daemon's pools and route limits."""
+
+    def __init__(
+        self,
+        llm_workers: int = 16,
+        disk_workers: int = 8,
+        cpu_workers: Optional[int] = None,
+        route_limits: Optional[Dict[str, int]] = None,
+        queue_timeout: float = 30.0
+    ):
+        self.llm = BoundedPool('llm', llm_workers)
+        self.disk = BoundedPool('disk', disk_workers)
+        self.cpu = BoundedPool('cpu', cpu_workers or os.cpu_count() or 4)
+        self.routes = RouteLimiter(
+            {**DEFAULT_ROUTE_LIMITS, **(route_limits or {})}, queue_timeout
+        )
+
+    @classmethod
+    def from_env(cls) -> "Executors":
+        return cls(
+            llm_workers=int(os.getenv("LOCALBRAIN_LLM_WORKERS", 16)),
+            disk_workers=int(os.getenv("LOCALBRAIN_DISK_WORKERS", 8)),
+            cpu_workers=int(os.getenv("LOCALBRAIN_CPU_WORKERS", 0)) or None,
+            route_limits=_parse_limits(os.getenv("LOCALBRAIN_ROUTE_LIMITS", "")),
+            queue_timeout=float(os.getenv("LOCALBRAIN_ROUTE_QUEUE_TIMEOUT", 30))
+        )
+
+    def pools(self) -> Dict[str, BoundedPool]:
+        return {'llm': self.llm, 'disk': self.disk, 'cpu': self.cpu}
+
+    def stats(self) -> Dict:
+        return {
+            'pools': {name: pool.stats() for name, pool in self.pools().items()},
+            'routes': self.routes.stats()
+        }
+
+    def shutdown(self) -> None:
+        for pool in self.pools().values():
+            pool.shutdown()
+
+
+_lock = threading.Lock()
+_executors: Optional[Executors] = None
+
+
+def get_executors() -> Executors:
+    """Process-wide executors configured from the environment."""
+    global _executors
+    with _lock:
+        if _executors is None:
+            _executors = Executors.from_env()
+        return _executors
+
+
+def route_limit(route: str, on_saturated: Callable):
+    """
+    Decorator capping concurrent calls of an async handler.
+
+    Args:
+        route: Name of the limit in the route table
+        on_saturated: fn(RouteSaturated) returning the response to send when
+            no slot frees up in time
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            routes = get_executors().routes
+            try:
+                await routes.acquire(route)
+            except RouteSaturated as e:
+                return on_saturated(e)
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                routes.release(route)
+        return wrapper
+    return decorator
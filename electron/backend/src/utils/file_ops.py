@@ -3,11 +3,39 @@
 File Operations - Helper functions for reading/writing vault files
 """
 
+import os
 import json
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional
 
 
+_io = threading.local()
+
+
+def io_counters() -> Dict[str, int]:
+    """
+    Per-thread counts of file reads/writes done through this module.
+    
+    Callers snapshot before and after a unit of work to measure its I/O.
+    """
+    if not hasattr(_io, 'counters'):
+        _io.counters = {'reads': 0, 'bytes_read': 0, 'writes': 0, 'bytes_written': 0}
+    return _io.counters
+
+
+def _count_read(text: str) -> None:
+    counters = io_counters()
+    counters['reads'] += 1
+    counters['bytes_read'] += len(text.encode('utf-8'))
+
+
+def _count_write(text: str) -> None:
+    counters = io_counters()
+    counters['writes'] += 1
+    counters['bytes_written'] += len(text.encode('utf-8'))
+
+
 def list_vault_files(vault_path: Path, include_about: bool = False) -> List[Dict[str, str]]:
     """
     List all markdown files in vault with metadata.
@@ -54,14 +82,38 @@ def list_vault_files(vault_path: Path, include_about: bool = False) -> List[Dict
 def read_file(file_path: Path) -> str:
     """Read file contents."""
     with open(file_path, 'r') as f:
-        return f.read()
+        content = f.read()
+    _count_read(content)
+    return content
+
+
+def read_file_range(file_path: Path, start: int, end: int) -> str:
+    """Read UTF-8 bytes [start, end) of a file (offsets from a MarkdownOutline)."""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        content = f.read(max(end - start, 0)).decode('utf-8', errors='replace')
+    _count_read(content)
+    return content
+
+
+def _write_text(path: Path, text: str, atomic: bool) -> None:
+    """Write text, optionally via a temp file + rename so readers never see a partial file."""
+    if not atomic:
+        with open(path, 'w') as f:
+            f.write(text)
+        return
+    
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
 
 
-def write_file(file_path: Path, content: str) -> None:
-    """Write content to file."""
+def write_file(file_path: Path, content: str, atomic: bool = False) -> None:
+    """Write content to file (atomically if requested)."""
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(file_path, 'w') as f:
-        f.write(content)
+    _write_text(file_path, content, atomic)
+    _count_write(content)
 
 
 def read_json_citations(file_path: Path) -> Dict:
@@ -76,16 +128,19 @@ def read_json_citations(file_path: Path) -> Dict:
         return {}
     
     with open(json_path, 'r') as f:
-        return json.load(f)
+        data = f.read()
+    _count_read(data)
+    return json.loads(data)
 
 
-def write_json_citations(file_path: Path, citations: Dict) -> None:
-    """Write JSON citation file."""
+def write_json_citations(file_path: Path, citations: Dict, atomic: bool = False) -> None:
+    """Write JSON citation file (atomically if requested)."""
     json_path = file_path.with_suffix('.json')
     json_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(json_path, 'w') as f:
-        json.dump(citations, f, indent=2)
+    data = json.dumps(citations, indent=2)
+    _write_text(json_path, data, atomic)
+    _count_write(data)
 
 
 def get_next_citation_number(file_path: Path) -> int:
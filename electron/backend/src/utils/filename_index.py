@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Filename Index - Trigram index for resolving LLM-suggested note names
+
+The LLM often refers to notes by slightly wrong names ("job-search.md" for
+"Job Search.md"). Instead of computing edit distance against every file in
+the vault, we keep a character-trigram index of normalized file stems:
+a lookup retrieves a short candidate list by trigram overlap and runs a
+bounded edit distance on those only.
+
+The index is built once per vault and kept up to date incrementally:
+created files are added explicitly, and folders (at any depth) whose mtime
+changed since the last lookup (files added or removed outside the pipeline)
+are rescanned. Unchanged folders cost one stat per lookup.
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .fuzzy_matcher import bounded_levenshtein, max_distance_for
+
+
+MAX_CANDIDATES = 16
+
+
+def normalize_stem(name: str) -> str:
+    """'personal/Job_Search.md' -> 'job search' (case, spacing and punctuation folded)."""
+    return ' '.join(re.sub(r'[\W_]+', ' ', Path(name).stem.lower()).split())
+
+
+def _folder(name: str) -> str:
+    """Case-folded parent folder of a relative path."""
+    return Path(name).parent.as_posix().lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of `text`, padded so short names still get some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FilenameIndex:
+    """Trigram index over the markdown notes of one vault."""
+
+    def __init__(self, vault_path: Path):
+        self.vault_path = Path(vault_path)
+        self._lock = threading.Lock()
+
+        self._paths: List[Optional[str]] = []      # id -> relative path (None if removed)
+        self._stems: List[str] = []                # id -> normalized stem
+        self._ids: Dict[str, int] = {}             # relative path -> id
+        self._by_stem: Dict[str, List[int]] = {}   # normalized stem -> ids
+        self._postings: Dict[str, Set[int]] = {}   # trigram -> ids
+        self._folders: Dict[str, Tuple[int, List[str]]] = {}  # relative folder -> (mtime_ns, subfolders)
+
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, relative_path: str) -> None:
+        """Index a note (no-op if already indexed)."""
+        with self._lock:
+            self._add(relative_path)
+
+    def remove(self, relative_path: str) -> None:
+        """Drop a note from the index."""
+        with self._lock:
+            self._remove(relative_path)
+
+    def _add(self, relative_path: str) -> None:
+        if relative_path in self._ids:
+            return
+
+        stem = normalize_stem(relative_path)
+        idx = len(self._paths)
+        self._paths.append(relative_path)
+        self._stems.append(stem)
+        self._ids[relative_path] = idx
+        self._by_stem.setdefault(stem, []).append(idx)
+        for gram in trigrams(stem):
+            self._postings.setdefault(gram, set()).add(idx)
+
+    def _remove(self, relative_path: str) -> None:
+        idx = self._ids.pop(relative_path, None)
+        if idx is None:
+            return
+
+        stem = self._stems[idx]
+        self._paths[idx] = None
+        self._by_stem[stem].remove(idx)
+        if not self._by_stem[stem]:
+            del self._by_stem[stem]
+        for gram in trigrams(stem):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(idx)
+                if not postings:
+                    del self._postings[gram]
+
+    def _refresh(self) -> None:
+        """Rescan folders (nested ones too) whose mtime changed since the last scan."""
+        try:
+            top = [
+                entry.name for entry in os.scandir(self.vault_path)
+                if entry.is_dir() and not entry.name.startswith('.')
+            ]
+        except OSError:
+            return
+
+        with self._lock:
+            seen = set()
+            pending = list(top)
+            while pending:
+                folder = pending.pop()
+                try:
+                    mtime = (self.vault_path / folder).stat().st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(folder)
+
+                cached = self._folders.get(folder)
+                if cached is None or cached[0] != mtime:
+                    cached = self._scan_folder(folder, mtime)
+                pending.extend(f"{folder}/{name}" for name in cached[1])
+
+            # Folders that were deleted
+            for folder in [f for f in self._folders if f not in seen]:
+                del self._folders[folder]
+                for relative_path in self._indexed_in(folder):
+                    self._remove(relative_path)
+
+    def _indexed_in(self, folder: str) -> Set[str]:
+        """Indexed notes directly inside `folder` (also ones added via add())."""
+        return {p for p in self._ids if p.rpartition('/')[0] == folder}
+
+    def _scan_folder(self, folder: str, mtime: int) -> Tuple[int, List[str]]:
+        """List one folder, sync its notes into the index and cache the result."""
+        subfolders = []
+        notes = set()
+        try:
+            entries = list(os.scandir(self.vault_path / folder))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.name)
+            elif entry.name.endswith('.md') and entry.name.lower() != 'about.md':
+                notes.add(f"{folder}/{entry.name}")
+
+        for relative_path in self._indexed_in(folder) - notes:
+            self._remove(relative_path)
+        for relative_path in notes:
+            self._add(relative_path)
+
+        self._folders[folder] = (mtime, subfolders)
+        return self._folders[folder]
+
+    def resolve(self, target: str, threshold: float = 0.7, same_folder: bool = False) -> Optional[str]:
+        """
+        Find the indexed note whose name best matches `target`.
+
+        Args:
+            target: File name or path suggested by the LLM
+            threshold: Minimum similarity score (0.0-1.0; 1.0 = only the
+                same normalized name). Fuzzy matches must contain the same
+                numbers as `target`
+            same_folder: Only consider notes in the folder of `target`
+
+        Returns:
+            Relative path of the best match, or None
+        """
+        self._refresh()
+
+        target_stem = normalize_stem(target)
+        if not target_stem:
+            return None
+
+        folder = _folder(target)
+
+        with self._lock:
+            # Exact normalized name
+            exact = [
+                self._paths[idx] for idx in self._by_stem.get(target_stem, ())
+                if not same_folder or _folder(self._paths[idx]) == folder
+            ]
+            if exact:
+                return exact[0]
+            if threshold >= 1.0:
+                return None
+
+            # Candidates ranked by shared trigrams (out-of-folder notes are
+            # dropped first so they can't crowd the folder's notes out)
+            overlap = Counter(chain.from_iterable(
+                self._postings.get(gram, ()) for gram in trigrams(target_stem)
+            ))
+            if same_folder:
+                overlap = Counter({
+                    idx: shared for idx, shared in overlap.items()
+                    if _folder(self._paths[idx]) == folder
+                })
+            scored = [
+                (self._stems[idx], self._paths[idx], shared)
+                for idx, shared in overlap.most_common(MAX_CANDIDATES)
+            ]
+
+        target_grams = len(trigrams(target_stem))
+        target_numbers = re.findall(r'\d+', target_stem)
+        best_match = None
+        best_similarity = 0.0
+        for stem, relative_path, shared in scored:
+            # "notes 2023" is a different note from "notes 2024", not a typo
+            if re.findall(r'\d+', stem) != target_numbers:
+                continue
+
+            max_len = max(len(target_stem), len(stem))
+            bound = max_distance_for(max(threshold, best_similarity), max_len)
+
+            # One edit changes at most 3 trigrams, so missing trigrams give
+            # a lower bound on the distance without computing it
+            if (target_grams - shared + 2) // 3 > bound:
+                continue
+
+            distance = bounded_levenshtein(target_stem, stem, bound)
+            if distance > bound:
+                continue
+
+            similarity = 1 - distance / max_len
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_match = relative_path
+
+        return best_match
+
+
+_indexes: Dict[str, FilenameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_filename_index(vault_path: Path) -> FilenameIndex:
+    """Shared index for a vault, built on first use."""
+    key = str(vault_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = FilenameIndex(Path(vault_path))
+        return _indexes[key]
@@ -8,36 +8,81 @@ Levenshtein distance and similarity thresholds.
 
 from typing import Optional
 
+from .markdown_outline import get_outline
+
 
 def levenshtein(a: str, b: str) -> int:
     """
     Calculate Levenshtein distance between two strings.
     
-    Port from OpenCode's edit.ts implementation.
+    Port from OpenCode's edit.ts implementation (two rows instead of a
+    full matrix).
     """
     if not a or not b:
         return max(len(a), len(b))
     
-    # Create matrix
-    matrix = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        ca = a[i - 1]
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,                          # Deletion
+                current[j - 1] + 1,                       # Insertion
+                previous[j - 1] + (ca != b[j - 1])        # Substitution
+            )
+        previous = current
+    
+    return previous[len(b)]
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Levenshtein distance, giving up once it must exceed `max_distance`.
+    
+    Only the diagonal band of width 2*max_distance+1 is computed and the
+    scan stops as soon as a whole row is over the bound, so clearly
+    different strings cost O(max_distance) per row instead of O(len(b)).
+    
+    Returns:
+        The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if not a or not b:
+        return max(len(a), len(b))
     
-    # Initialize first row and column
-    for i in range(len(a) + 1):
-        matrix[i][0] = i
-    for j in range(len(b) + 1):
-        matrix[0][j] = j
+    over = max_distance + 1
+    previous = [j if j <= max_distance else over for j in range(len(b) + 1)]
     
-    # Fill matrix
     for i in range(1, len(a) + 1):
-        for j in range(1, len(b) + 1):
-            cost = 0 if a[i - 1] == b[j - 1] else 1
-            matrix[i][j] = min(
-                matrix[i - 1][j] + 1,      # Deletion
-                matrix[i][j - 1] + 1,      # Insertion
-                matrix[i - 1][j - 1] + cost  # Substitution
+        lo = max(1, i - max_distance)
+        hi = min(len(b), i + max_distance)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= max_distance else over
+        ca = a[i - 1]
+        row_min = current[0]
+        
+        for j in range(lo, hi + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != b[j - 1])
             )
+            current[j] = value if value <= max_distance else over
+            if value < row_min:
+                row_min = value
+        
+        if row_min > max_distance:
+            return over
+        previous = current
     
-    return matrix[len(a)][len(b)]
+    return min(previous[len(b)], over)
+
+
+def max_distance_for(threshold: float, max_len: int) -> int:
+    """Largest edit distance whose similarity still meets `threshold`."""
+    return int((1 - threshold) * max_len + 1e-9)
 
 
 def find_best_section_match(
@@ -64,31 +109,33 @@ def find_best_section_match(
         >>> find_best_section_match(content, "Interviews")
         "Interview Prep"
     """
-    lines = content.split('\n')
-    sections = [line for line in lines if line.startswith('##')]
+    sections = [heading.title for heading in get_outline(content).sections()]
     
     if not sections:
         return None
     
     # Try exact substring match first (case-insensitive)
     target_lower = target_section.lower()
-    for section in sections:
-        section_text = section.replace('##', '').strip()
+    for section_text in sections:
         if target_lower in section_text.lower() or section_text.lower() in target_lower:
             return section_text
     
-    # Fuzzy match using Levenshtein distance
+    # Fuzzy match using bounded Levenshtein distance
     best_match = None
     best_similarity = 0.0
     
-    for section in sections:
-        section_name = section.replace('##', '').strip()
-        
-        # Calculate similarity
-        distance = levenshtein(target_section.lower(), section_name.lower())
+    for section_name in sections:
         max_len = max(len(target_section), len(section_name))
-        similarity = 1 - (distance / max_len) if max_len > 0 else 0
+        if max_len == 0:
+            continue
         
+        # Skip as soon as the distance can't reach the threshold
+        bound = max_distance_for(threshold, max_len)
+        distance = bounded_levenshtein(target_lower, section_name.lower(), bound)
+        if distance > bound:
+            continue
+        
+        similarity = 1 - (distance / max_len)
         if similarity > best_similarity:
             best_similarity = similarity
             best_match = section_name
@@ -102,42 +149,25 @@ def find_best_section_match(
 def find_similar_filename(
     vault_path,
     target_filename: str,
-    threshold: float = 0.7
+    threshold: float = 0.7,
+    same_folder: bool = False
 ) -> Optional[str]:
     """
     Find similar filename in vault using fuzzy matching.
     
     Helps when LLM references "job-search" but file is "job_search.md"
-    or "Job Search.md".
-    """
-    from pathlib import Path
-    from .file_ops import list_vault_files
-    
-    existing_files = list_vault_files(vault_path, include_about=False)
-    
-    if not existing_files:
-        return None
+    or "Job Search.md". Uses the vault's shared trigram index, so only a
+    handful of candidates are scored instead of every note.
     
-    # Normalize target
-    target_normalized = target_filename.lower().replace('_', ' ').replace('-', ' ')
-    
-    best_match = None
-    best_similarity = 0.0
-    
-    for file_info in existing_files:
-        file_stem = Path(file_info['relative_path']).stem
-        file_normalized = file_stem.lower().replace('_', ' ').replace('-', ' ')
-        
-        # Calculate similarity
-        distance = levenshtein(target_normalized, file_normalized)
-        max_len = max(len(target_normalized), len(file_normalized))
-        similarity = 1 - (distance / max_len) if max_len > 0 else 0
-        
-        if similarity > best_similarity:
-            best_similarity = similarity
-            best_match = file_info['relative_path']
+    Args:
+        vault_path: Path to vault root
+        target_filename: File name or path suggested by the LLM
+        threshold: Minimum similarity (1.0 = same normalized name only)
+        same_folder: Only match notes in the folder of target_filename
     
-    if best_similarity >= threshold:
-        return best_match
+    Returns:
+        Relative path of the best match, or None
+    """
+    from .filename_index import get_filename_index
     
-    return None
+    return get_filename_index(vault_path).resolve(target_filename, threshold, same_folder)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache - Content-addressed disk cache for deterministic Claude calls
+
+Retries and benchmark reruns resend identical prompts at temperature 0.0.
+Responses are stored under ~/.localbrain/cache/llm/ keyed by a hash of
+(model, system, prompt, max_tokens, temperature), with least-recently-used
+eviction once the cache grows past its size limit.
+
+Enable for every LLMClient with LOCALBRAIN_LLM_CACHE=1 (size limit in MB via
+LOCALBRAIN_LLM_CACHE_MB, default 256).
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".localbrain" / "cache" / "llm"
+DEFAULT_MAX_MB = 256
+
+
+class LLMResponseCache:
+    """On-disk response cache with size-based LRU eviction and hit-rate stats."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory holding one JSON file per cached response
+            max_bytes: Total size limit before oldest entries are evicted
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+        # key -> size in bytes, insertion order = least recently used first
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        """Rebuild size accounting from disk, oldest access first."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system: Optional[str],
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> str:
+        """Content address for a request."""
+        payload = json.dumps(
+            [model, system or "", prompt, max_tokens, temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response text, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                text = json.load(f)['text']
+        except (OSError, json.JSONDecodeError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch for LRU ordering
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+            if key in self._sizes:
+                self._sizes[key] = self._sizes.pop(key)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store a response and evict old entries if over the size limit."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = json.dumps({'text': text}, ensure_ascii=False).encode('utf-8')
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove a single cached response."""
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def record_bypass(self) -> None:
+        """Count a call that skipped the cache."""
+        with self._lock:
+            self.bypassed += 1
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under max_bytes (lock held)."""
+        while self._total_bytes > self.max_bytes and self._sizes:
+            key = next(iter(self._sizes))
+            self._total_bytes -= self._sizes.pop(key)
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            for key in list(self._sizes):
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit-rate and size statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._sizes),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """
+    Shared process-wide cache, or None unless LOCALBRAIN_LLM_CACHE is set.
+    """
+    global _default_cache
+
+    if os.getenv("LOCALBRAIN_LLM_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            max_mb = int(os.getenv("LOCALBRAIN_LLM_CACHE_MB", DEFAULT_MAX_MB))
+            _default_cache = LLMResponseCache(max_bytes=max_mb * 1024 * 1024)
+        return _default_cache
@@ -3,10 +3,15 @@
 LLM Client - Claude API wrapper for LocalBrain ingestion
 """
 
-import os
-from anthropic import Anthropic
+import threading
+from typing import Optional
 from dotenv import load_dotenv
 
+from .llm_cache import LLMResponseCache, get_default_cache
+from .llm_governor import (
+    BACKGROUND, create_message, acreate_message, get_anthropic_client
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -14,16 +19,39 @@ load_dotenv()
 class LLMClient:
     """Wrapper for Claude API calls."""
     
-    def __init__(self, model: str = "claude-haiku-4-5-20251001"):
-        """Initialize Claude client."""
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment")
+    def __init__(
+        self,
+        model: str = "claude-haiku-4-5-20251001",
+        cache: Optional[LLMResponseCache] = None,
+        priority: int = BACKGROUND
+    ):
+        """
+        Initialize Claude client.
         
-        self.client = Anthropic(api_key=api_key)
+        Args:
+            model: Claude model name
+            cache: Response cache for deterministic calls (defaults to the
+                shared cache when LOCALBRAIN_LLM_CACHE is set, else disabled)
+            priority: Governor lane (INTERACTIVE or BACKGROUND) for every call
+        """
+        # Shared, governed client (raises if ANTHROPIC_API_KEY is missing)
+        self.client = get_anthropic_client()
         self.model = model
+        self.priority = priority
+        
+        # Cumulative API usage (cache hits cost nothing and aren't counted)
+        self.usage = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+        self._usage_lock = threading.Lock()
+        self.cache = cache if cache is not None else get_default_cache()
     
-    def call(self, prompt: str, system: str = None, max_tokens: int = 2048, temperature: float = 0.0) -> str:
+    def call(
+        self,
+        prompt: str,
+        system: str = None,
+        max_tokens: int = 2048,
+        temperature: float = 0.0,
+        use_cache: bool = True
+    ) -> str:
         """
         Make a Claude API call.
         
@@ -32,26 +60,105 @@ class LLMClient:
             system: System prompt (optional)
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature (0.0 = deterministic)
+            use_cache: Read/write the response cache (only temperature 0.0
+                calls are ever cached)
             
         Returns:
             Response text from Claude
         """
-        messages = [{"role": "user", "content": prompt}]
+        cache_key, cached = self._cache_lookup(prompt, system, max_tokens, temperature, use_cache)
+        if cached is not None:
+            return cached
+        
+        response = create_message(
+            priority=self.priority,
+            **self._build_kwargs(prompt, system, max_tokens, temperature)
+        )
+        text = response.content[0].text
+        self._record_usage(response)
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
+        
+        return text
+    
+    async def acall(
+        self,
+        prompt: str,
+        system: str = None,
+        max_tokens: int = 2048,
+        temperature: float = 0.0,
+        use_cache: bool = True
+    ) -> str:
+        """Async version of call() (same arguments, same cache)."""
+        cache_key, cached = self._cache_lookup(prompt, system, max_tokens, temperature, use_cache)
+        if cached is not None:
+            return cached
+        
+        response = await acreate_message(
+            priority=self.priority,
+            **self._build_kwargs(prompt, system, max_tokens, temperature)
+        )
+        text = response.content[0].text
+        self._record_usage(response)
         
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
+        
+        return text
+    
+    def _record_usage(self, response) -> None:
+        """Accumulate token counts from the API `usage` field (thread-safe)."""
+        usage = getattr(response, 'usage', None)
+        with self._usage_lock:
+            self.usage['calls'] += 1
+            if usage is not None:
+                self.usage['input_tokens'] += usage.input_tokens or 0
+                self.usage['output_tokens'] += usage.output_tokens or 0
+    
+    def _build_kwargs(self, prompt: str, system: Optional[str], max_tokens: int, temperature: float) -> dict:
+        """Build messages.create arguments for a single-turn prompt."""
         kwargs = {
             "model": self.model,
             "max_tokens": max_tokens,
             "temperature": temperature,
-            "messages": messages
+            "messages": [{"role": "user", "content": prompt}]
         }
         
         if system:
             kwargs["system"] = system
         
-        response = self.client.messages.create(**kwargs)
-        return response.content[0].text
+        return kwargs
+    
+    def _cache_lookup(
+        self,
+        prompt: str,
+        system: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool
+    ) -> tuple:
+        """
+        Returns:
+            (cache_key, cached_text) - key is None if this call is not cacheable
+        """
+        if self.cache is None:
+            return None, None
+        
+        if not use_cache or temperature != 0.0:
+            self.cache.record_bypass()
+            return None, None
+        
+        cache_key = self.cache.make_key(self.model, system, prompt, max_tokens, temperature)
+        return cache_key, self.cache.get(cache_key)
     
-    def call_json(self, prompt: str, system: str = None, max_tokens: int = 2048) -> dict:
+    def call_json(
+        self,
+        prompt: str,
+        system: str = None,
+        max_tokens: int = 2048,
+        use_cache: bool = True
+    ) -> dict:
         """
         Make a Claude API call expecting JSON response.
         
@@ -63,7 +170,7 @@ class LLMClient:
         # Add JSON instruction to prompt
         json_prompt = f"{prompt}\n\nReturn ONLY valid JSON, no other text."
         
-        response_text = self.call(json_prompt, system, max_tokens, temperature=0.0)
+        response_text = self.call(json_prompt, system, max_tokens, temperature=0.0, use_cache=use_cache)
         
         # Extract JSON from response (handle markdown code blocks)
         response_text = response_text.strip()
@@ -74,4 +181,16 @@ class LLMClient:
         if response_text.endswith("```"):
             response_text = response_text[:-3]
         
-        return json.loads(response_text.strip())
+        try:
+            return json.loads(response_text.strip())
+        except json.JSONDecodeError:
+            # Don't replay an unparseable response on retry
+            if self.cache is not None:
+                self.cache.delete(
+                    self.cache.make_key(self.model, system, json_prompt, max_tokens, 0.0)
+                )
+            raise
+    
+    def cache_stats(self) -> Optional[dict]:
+        """Response cache hit rates, or None if caching is disabled."""
+        return self.cache.stats() if self.cache is not None else None
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+LLM Governor - Shared Anthropic clients behind a process-wide concurrency limit
+
+Every Claude call in the backend (ingestion, search, synthesis, bulk ingest)
+goes through create_message / acreate_message so that:
+- At most N requests are in flight at once (semaphore)
+- Requests/min and tokens/min stay under the API tier (token buckets)
+- 429 / 529 / 5xx responses are retried with jittered exponential backoff
+- Interactive work (search, answers) is admitted ahead of background work
+  (connector and bulk ingestion)
+
+Attempt latency, outcomes, token usage and admission wait are exported as
+localbrain_llm_* metrics (see utils/metrics.py), and each attempt is an
+llm.messages span of the current trace (see utils/tracing.py).
+
+Limits come from the environment:
+    LOCALBRAIN_LLM_MAX_CONCURRENCY  (default 8)
+    LOCALBRAIN_LLM_RPM              requests/min (default 50)
+    LOCALBRAIN_LLM_TPM              input+output tokens/min (default 100000)
+
+They are account-wide budgets. A multi-worker daemon sets
+LOCALBRAIN_LLM_PROCESSES to its worker count and each worker's governor
+enforces an equal share, so N workers together stay within the limits
+(a single busy worker can't borrow an idle worker's share). Other
+processes (e.g. a bulk_ingest.py run next to the daemon) are not counted.
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+from typing import Dict, Optional
+
+import anthropic
+from anthropic import Anthropic, AsyncAnthropic
+
+from .metrics import REGISTRY
+from .tracing import record_span
+
+
+# Priority lanes (lower is admitted first)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 529}
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# Upper bound on how long a waiter sleeps before re-checking admission
+_POLL_INTERVAL = 0.05
+
+_PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+LLM_REQUESTS = REGISTRY.counter(
+    'localbrain_llm_requests_total', 'Anthropic API attempts by outcome (ok, retried, error)', ('model', 'outcome')
+)
+LLM_LATENCY = REGISTRY.histogram(
+    'localbrain_llm_request_duration_seconds', 'Latency of one Anthropic API attempt', ('model',)
+)
+LLM_TOKENS = REGISTRY.counter(
+    'localbrain_llm_tokens_total', 'Tokens used by Anthropic API calls', ('model', 'kind')
+)
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    'localbrain_llm_queue_wait_seconds', 'Time waiting for admission by the governor', ('priority',)
+)
+
+
+class TokenBucket:
+    """Refills `capacity` units per minute; may go into debt on reconciliation."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.available -= amount
+
+
+class ConcurrencyGovernor:
+    """
+    Process-wide admission control for LLM requests.
+
+    Thread-safe, and usable from both threads (acquire) and asyncio code
+    (acquire_async). Waiters are admitted strictly in (priority, arrival)
+    order, so a background ingest queued first never starves a search.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: float = 50,
+        tokens_per_minute: float = 100000
+    ):
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = []
+        self._seq = itertools.count()
+
+        self.stats_counters = {
+            'admitted': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'tokens_used': 0,
+            'wait_seconds': 0.0
+        }
+
+    def _try_admit(self, ticket: tuple, tokens: int) -> float:
+        """Admit ticket if it is first in line and limits allow (lock held).
+
+        Returns 0.0 if admitted, otherwise seconds to wait before retrying.
+        """
+        if self._waiting[0] != ticket or self._in_flight >= self.max_concurrency:
+            return _POLL_INTERVAL
+
+        wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+
+        self._requests.consume(1)
+        self._tokens.consume(tokens)
+        heapq.heappop(self._waiting)
+        self._in_flight += 1
+        self.stats_counters['admitted'] += 1
+        self._cond.notify_all()
+        return 0.0
+
+    def _enqueue(self, priority: int) -> tuple:
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _abandon(self, ticket: tuple) -> None:
+        """Remove a waiter that gave up (e.g. cancelled task) (lock held)."""
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+            self._cond.notify_all()
+
+    def acquire(self, priority: int = BACKGROUND, tokens: int = 0) -> None:
+        """Block the calling thread until the request may be sent."""
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._try_admit(ticket, tokens)
+                    if wait == 0.0:
+                        break
+                    self._cond.wait(timeout=wait)
+            except BaseException:
+                self._abandon(ticket)
+                raise
+            self.stats_counters['wait_seconds'] += time.monotonic() - started
+
+    async def acquire_async(self, priority: int = BACKGROUND, tokens: int = 0) -> None:
+        """Wait (without blocking the event loop) until the request may be sent."""
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_admit(ticket, tokens)
+                if wait == 0.0:
+                    break
+                await asyncio.sleep(min(wait, _POLL_INTERVAL))
+        except BaseException:
+            with self._cond:
+                self._abandon(ticket)
+            raise
+        with self._cond:
+            self.stats_counters['wait_seconds'] += time.monotonic() - started
+
+    def release(self, estimated_tokens: int = 0, actual_tokens: Optional[int] = None) -> None:
+        """Free a slot and charge the difference between actual and estimated tokens."""
+        with self._cond:
+            self._in_flight -= 1
+            if actual_tokens is not None:
+                self._tokens.consume(actual_tokens - estimated_tokens)
+                self.stats_counters['tokens_used'] += actual_tokens
+            self._cond.notify_all()
+
+    def record_retry(self, status_code: Optional[int]) -> None:
+        with self._cond:
+            self.stats_counters['retries'] += 1
+            if status_code == 429:
+                self.stats_counters['rate_limited'] += 1
+
+    def stats(self) -> Dict:
+        """Current saturation and lifetime counters."""
+        with self._cond:
+            return {
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiting),
+                'max_concurrency': self.max_concurrency,
+                **self.stats_counters
+            }
+
+
+# ============================================================================
+# Shared clients
+# ============================================================================
+
+_lock = threading.Lock()
+_governor: Optional[ConcurrencyGovernor] = None
+_client: Optional[Anthropic] = None
+_async_clients: Dict[int, AsyncAnthropic] = {}
+
+
+def get_governor() -> ConcurrencyGovernor:
+    """Process-wide governor with this process's share of the configured limits."""
+    global _governor
+    with _lock:
+        if _governor is None:
+            processes = max(1, int(os.getenv("LOCALBRAIN_LLM_PROCESSES", 1)))
+            _governor = ConcurrencyGovernor(
+                max_concurrency=max(1, int(os.getenv("LOCALBRAIN_LLM_MAX_CONCURRENCY", 8)) // processes),
+                requests_per_minute=float(os.getenv("LOCALBRAIN_LLM_RPM", 50)) / processes,
+                tokens_per_minute=float(os.getenv("LOCALBRAIN_LLM_TPM", 100000)) / processes
+            )
+        return _governor
+
+
+def _api_key() -> str:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment")
+    return api_key
+
+
+def get_anthropic_client() -> Anthropic:
+    """Shared synchronous client (SDK retries disabled, we retry ourselves)."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = Anthropic(api_key=_api_key(), max_retries=0)
+        return _client
+
+
+def get_async_anthropic_client() -> AsyncAnthropic:
+    """Shared async client for the running event loop."""
+    loop_id = id(asyncio.get_running_loop())
+    with _lock:
+        if loop_id not in _async_clients:
+            _async_clients[loop_id] = AsyncAnthropic(api_key=_api_key(), max_retries=0)
+        return _async_clients[loop_id]
+
+
+# ============================================================================
+# Governed calls
+# ============================================================================
+
+def estimate_tokens(kwargs: Dict) -> int:
+    """Rough input token estimate (~4 chars/token) used for admission."""
+    size = len(json.dumps(kwargs.get('messages', []), default=str))
+    size += len(str(kwargs.get('system', '')))
+    size += len(json.dumps(kwargs.get('tools', []), default=str))
+    return size // 4
+
+
+def _usage_tokens(response) -> Optional[int]:
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None
+    return (usage.input_tokens or 0) + (usage.output_tokens or 0)
+
+
+def _record_call(kwargs: Dict, outcome: str, seconds: float, response, queued: float = 0.0) -> None:
+    model = kwargs.get('model', 'unknown')
+    LLM_REQUESTS.labels(model, outcome).inc()
+    LLM_LATENCY.labels(model).observe(seconds)
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        LLM_TOKENS.labels(model, 'input').inc(usage.input_tokens or 0)
+        LLM_TOKENS.labels(model, 'output').inc(usage.output_tokens or 0)
+    record_span(
+        'llm.messages', seconds,
+        model=model,
+        outcome=outcome,
+        queue_ms=round(queued * 1000, 1),
+        input_tokens=getattr(usage, 'input_tokens', None),
+        output_tokens=getattr(usage, 'output_tokens', None),
+        stop_reason=getattr(response, 'stop_reason', None)
+    )
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Backoff for retryable errors, or None if the error is not retryable."""
+    if not isinstance(error, anthropic.APIConnectionError) and not (
+        isinstance(error, anthropic.APIStatusError) and error.status_code in RETRY_STATUS_CODES
+    ):
+        return None
+
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def create_message(priority: int = BACKGROUND, **kwargs):
+    """
+    Governed, retried equivalent of Anthropic().messages.create(**kwargs).
+
+    Args:
+        priority: INTERACTIVE or BACKGROUND lane
+        **kwargs: Passed through to messages.create
+    """
+    governor = get_governor()
+    client = get_anthropic_client()
+    estimated = estimate_tokens(kwargs)
+
+    for attempt in range(MAX_RETRIES + 1):
+        waited = time.perf_counter()
+        governor.acquire(priority, estimated)
+        started = time.perf_counter()
+        LLM_QUEUE_WAIT.labels(_PRIORITY_NAMES.get(priority, priority)).observe(started - waited)
+        response = None
+        outcome = 'error'
+        try:
+            response = client.messages.create(**kwargs)
+            outcome = 'ok'
+            return response
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == MAX_RETRIES:
+                raise
+            governor.record_retry(getattr(e, 'status_code', None))
+            outcome = 'retried'
+        finally:
+            governor.release(estimated, _usage_tokens(response) if response is not None else None)
+            _record_call(kwargs, outcome, time.perf_counter() - started, response, started - waited)
+
+        print(f"   ⏳ LLM overloaded/rate limited, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+        time.sleep(delay)
+
+
+async def acreate_message(priority: int = BACKGROUND, **kwargs):
+    """Async version of create_message using the shared AsyncAnthropic client."""
+    governor = get_governor()
+    client = get_async_anthropic_client()
+    estimated = estimate_tokens(kwargs)
+
+    for attempt in range(MAX_RETRIES + 1):
+        waited = time.perf_counter()
+        await governor.acquire_async(priority, estimated)
+        started = time.perf_counter()
+        LLM_QUEUE_WAIT.labels(_PRIORITY_NAMES.get(priority, priority)).observe(started - waited)
+        response = None
+        outcome = 'error'
+        try:
+            response = await client.messages.create(**kwargs)
+            outcome = 'ok'
+            return response
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == MAX_RETRIES:
+                raise
+            governor.record_retry(getattr(e, 'status_code', None))
+            outcome = 'retried'
+        finally:
+            governor.release(estimated, _usage_tokens(response) if response is not None else None)
+            _record_call(kwargs, outcome, time.perf_counter() - started, response, started - waited)
+
+        print(f"   ⏳ LLM overloaded/rate limited, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+        await asyncio.sleep(delay)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Markdown Outline - Cached heading index for vault notes
+
+Parses a note once into its headings (level, title, line number, character
+and byte offsets) plus a table of line start offsets. Section lookups and
+line -> offset conversions are then binary searches instead of re-splitting
+and rescanning the whole file for every edit.
+
+Outlines are cached by content hash, and by (mtime, size) for files read
+from disk, so repeated operations on the same note parse it only once.
+"""
+
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+MAX_CACHED_OUTLINES = 256
+
+
+class Heading:
+    """One markdown heading."""
+
+    __slots__ = ('level', 'title', 'line', 'offset', 'byte_offset')
+
+    def __init__(self, level: int, title: str, line: int, offset: int, byte_offset: int):
+        self.level = level
+        self.title = title
+        self.line = line                # 0-indexed line number
+        self.offset = offset            # character offset of the heading line
+        self.byte_offset = byte_offset  # UTF-8 byte offset of the heading line
+
+    def __repr__(self) -> str:
+        return f"Heading({'#' * self.level} {self.title!r}, line={self.line + 1})"
+
+
+class MarkdownOutline:
+    """Headings and line offsets of one markdown document."""
+
+    def __init__(self, content: str):
+        self.length = len(content)
+        self.byte_length = 0
+        self.line_offsets: List[int] = []
+        self.line_byte_offsets: List[int] = []
+        self.headings: List[Heading] = []
+
+        offset = 0
+        byte_offset = 0
+        in_fence = False
+
+        for i, line in enumerate(content.split('\n')):
+            self.line_offsets.append(offset)
+            self.line_byte_offsets.append(byte_offset)
+
+            stripped = line.lstrip()
+            if stripped.startswith('```') or stripped.startswith('~~~'):
+                in_fence = not in_fence
+            elif not in_fence and line.startswith('#'):
+                level = len(line) - len(line.lstrip('#'))
+                if level <= 6:
+                    self.headings.append(
+                        Heading(level, line[level:].strip(), i, offset, byte_offset)
+                    )
+
+            offset += len(line) + 1
+            byte_offset += len(line.encode('utf-8')) + 1
+
+        self.byte_length = max(byte_offset - 1, 0)
+        self._heading_lines = [h.line for h in self.headings]
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets)
+
+    def sections(self, min_level: int = 2) -> List[Heading]:
+        """Headings at `min_level` or deeper (default: ## and below)."""
+        return [h for h in self.headings if h.level >= min_level]
+
+    def find_section(self, name: str, min_level: int = 2) -> Optional[Heading]:
+        """First heading whose title contains `name` (case-insensitive)."""
+        name_lower = name.lower()
+        for heading in self.headings:
+            if heading.level >= min_level and name_lower in heading.title.lower():
+                return heading
+        return None
+
+    def next_heading(self, heading: Heading, min_level: int = 2) -> Optional[Heading]:
+        """First heading after `heading` at `min_level` or deeper."""
+        i = bisect_right(self._heading_lines, heading.line)
+        for candidate in self.headings[i:]:
+            if candidate.level >= min_level:
+                return candidate
+        return None
+
+    def section_end(self, heading: Heading) -> Optional[Heading]:
+        """Heading that closes `heading`'s section (same level or higher), if any."""
+        i = bisect_right(self._heading_lines, heading.line)
+        for candidate in self.headings[i:]:
+            if candidate.level <= heading.level:
+                return candidate
+        return None
+
+    def heading_at_line(self, line: int) -> Optional[Heading]:
+        """Innermost heading whose section contains the 0-indexed `line`."""
+        i = bisect_right(self._heading_lines, line)
+        return self.headings[i - 1] if i else None
+
+    def line_at_offset(self, offset: int) -> int:
+        """0-indexed line containing the character `offset`."""
+        return bisect_right(self.line_offsets, offset) - 1
+
+    def section_span(self, heading: Heading) -> Tuple[int, int]:
+        """Character (start, end) of `heading`'s section including subsections."""
+        end = self.section_end(heading)
+        return heading.offset, end.offset if end else self.length
+
+    def section_byte_span(self, heading: Heading) -> Tuple[int, int]:
+        """UTF-8 byte (start, end) of `heading`'s section including subsections."""
+        end = self.section_end(heading)
+        return heading.byte_offset, end.byte_offset if end else self.byte_length
+
+
+class OutlineCache:
+    """Thread-safe LRU of parsed outlines."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_OUTLINES):
+        self.max_entries = max_entries
+        self._by_hash: "OrderedDict[bytes, MarkdownOutline]" = OrderedDict()
+        self._by_path: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(content: str) -> bytes:
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+    def for_content(self, content: str, key: Optional[bytes] = None) -> MarkdownOutline:
+        """Outline for in-memory content (cached by content hash)."""
+        if key is None:
+            key = self._hash(content)
+        with self._lock:
+            outline = self._by_hash.get(key)
+            if outline is not None:
+                self._by_hash.move_to_end(key)
+                return outline
+
+        outline = MarkdownOutline(content)
+        with self._lock:
+            self._by_hash[key] = outline
+            while len(self._by_hash) > self.max_entries:
+                self._by_hash.popitem(last=False)
+        return outline
+
+    def for_file(self, file_path: Path) -> Tuple[MarkdownOutline, Optional[str]]:
+        """
+        Outline for a file on disk.
+
+        The file is only read when its (mtime, size) changed since the last
+        call.
+
+        Returns:
+            (outline, content) - content is None when served from cache
+        """
+        stat = file_path.stat()
+        path_key = str(file_path)
+
+        with self._lock:
+            cached = self._by_path.get(path_key)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                outline = self._by_hash.get(cached[2])
+                if outline is not None:
+                    self._by_path.move_to_end(path_key)
+                    self._by_hash.move_to_end(cached[2])
+                    return outline, None
+
+        with open(file_path, 'r') as f:
+            content = f.read()
+        key = self._hash(content)
+        outline = self.for_content(content, key)
+
+        with self._lock:
+            self._by_path[path_key] = (stat.st_mtime_ns, stat.st_size, key)
+            while len(self._by_path) > self.max_entries:
+                self._by_path.popitem(last=False)
+        return outline, content
+
+
+_default_cache = OutlineCache()
+
+
+def get_outline(content: str) -> MarkdownOutline:
+    """Cached outline for markdown content."""
+    return _default_cache.for_content(content)
+
+
+def get_file_outline(file_path: Path) -> Tuple[MarkdownOutline, Optional[str]]:
+    """Cached outline for a markdown file (see OutlineCache.for_file)."""
+    return _default_cache.for_file(Path(file_path))
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Metrics - Process-wide counters, gauges and histograms in Prometheus format
+
+Instrumented code declares its metrics once at import time and records
+observations through pre-bound label children, so one observation is a
+dict lookup (first time only), a bisect and an add under a per-child lock:
+
+    REQUESTS = REGISTRY.counter('localbrain_http_requests_total', 'HTTP requests', ('route', 'status'))
+    LATENCY = REGISTRY.histogram('localbrain_http_request_duration_seconds', 'HTTP latency', ('route',))
+
+    REQUESTS.labels('/protocol/ask', '200').inc()
+    LATENCY.labels('/protocol/ask').observe(1.7)
+
+Values that already live elsewhere (pool queue depths, cache sizes) are
+read at scrape time by collectors instead of being mirrored on every
+change. render() produces the Prometheus text exposition format (0.0.4).
+
+Metrics are per process. Worker processes of one daemon export their
+families to a shared directory (write_snapshot) and whichever worker is
+scraped merges them, each sample labelled with its worker's pid
+(merge_snapshots).
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from time import perf_counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Seconds; covers fast disk reads up to multi-minute bulk ingests
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# (name, type, help, [(labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Child:
+    """Value of one label combination."""
+
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    type = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return _Child()
+
+    def labels(self, *values, **kwargs):
+        """Child for one label combination (cache it on hot paths)."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def collect(self) -> List[Family]:
+        samples = [
+            (dict(zip(self.labelnames, key)), child.value)
+            for key, child in self._items()
+        ]
+        return [(self.name, self.type, self.help, samples)]
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(b for b in buckets if b != math.inf))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def collect(self) -> List[Family]:
+        samples = []
+        for key, child in self._items():
+            labels = dict(zip(self.labelnames, key))
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                samples.append(({**labels, 'le': _format_value(float(bound))}, cumulative, '_bucket'))
+            samples.append((labels, total, '_sum'))
+            samples.append((labels, count, '_count'))
+        return [(self.name, self.type, self.help, samples)]
+
+
+class MetricsRegistry:
+    """All metrics of the process plus scrape-time collectors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _register(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """
+        Add a scrape-time source of gauge families.
+
+        Args:
+            collector: fn() returning (name, type, help, [(labels, value)])
+                tuples; exceptions skip the collector for that scrape
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def families(self) -> List[Family]:
+        """Current samples of every metric and collector."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families: List[Family] = []
+        for metric in metrics:
+            families.extend(metric.collect())
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                continue
+        return families
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format."""
+        return render_families(self.families())
+
+
+def render_families(families: Iterable[Family]) -> str:
+    """Prometheus text format of (name, type, help, samples) families."""
+    lines = []
+    for name, kind, help, samples in families:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            labels, value = sample[0], sample[1]
+            suffix = sample[2] if len(sample) > 2 else ''
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_snapshot(directory: Path, worker: str, families: List[Family]) -> None:
+    """Atomically publish one worker's families as <directory>/<worker>.json."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{worker}.json"
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(families, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def merge_snapshots(directory: Path, worker: str, families: List[Family], max_age: float) -> List[Family]:
+    """
+    This worker's live families plus the other workers' snapshots, every
+    sample labelled worker=<name>. Snapshots older than max_age seconds
+    (workers that exited) are ignored.
+    """
+    sources = [(worker, families)]
+    now = time.time()
+    for path in sorted(directory.glob('*.json')) if directory.exists() else []:
+        if path.stem == worker:
+            continue
+        try:
+            if now - path.stat().st_mtime > max_age:
+                continue
+            with open(path) as f:
+                sources.append((path.stem, json.load(f)))
+        except (OSError, ValueError):
+            continue
+
+    merged: Dict[str, Family] = {}
+    for name, source in sources:
+        for family_name, kind, help, samples in source:
+            family = merged.setdefault(family_name, (family_name, kind, help, []))
+            family[3].extend(
+                ({**sample[0], 'worker': name}, *sample[1:]) for sample in samples
+            )
+    return list(merged.values())
+
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
+
+
+def gauge_family(name: str, help: str, samples: List[Tuple[Dict[str, str], float]]) -> Family:
+    """Gauge family for collectors."""
+    return name, 'gauge', help, samples
+
+
+class timer:
+    """
+    Context manager observing elapsed seconds into a histogram child.
+
+    Usage:
+        with timer(LATENCY.labels('grep_vault')):
+            ...
+    """
+
+    __slots__ = ('child', 'start', 'elapsed')
+
+    def __init__(self, child):
+        self.child = child
+        self.elapsed: Optional[float] = None
+
+    def __enter__(self) -> "timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = perf_counter() - self.start
+        self.child.observe(self.elapsed)
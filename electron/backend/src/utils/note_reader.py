@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Note Reader - Conditional and partial reads of vault notes
+
+/file used to read a whole note and its citations on every request. This
+module supplies the pieces for cheaper reads:
+
+- validators: an ETag from the note's (mtime, size) and its citations, and
+  a Last-Modified date, so an unchanged note costs a 304
+- windows: a line range ("200-400"), a section ("Interview Prep") or the
+  section around a line (e.g. a grep hit) cut from the cached
+  heading/offset index (utils/markdown_outline.py) and read with one
+  seek, without loading the rest of the note
+- a table of contents, so agents can see a note's structure and drill
+  into one section instead of pulling the whole file into context
+- chunked reads for streaming large notes as raw markdown or as the usual
+  JSON document
+"""
+
+import hashlib
+import json
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .file_ops import read_file, read_file_range
+from .markdown_outline import MarkdownOutline, get_file_outline
+from .vault_tree import etag_matches
+
+
+# Characters per streamed chunk
+CHUNK_CHARS = 64 * 1024
+
+# around_line: sections longer than this are cut to AROUND_CONTEXT lines
+# on either side of the line
+MAX_AROUND_LINES = 200
+AROUND_CONTEXT = 40
+
+_LINE_RANGE = re.compile(r'^\s*(\d+)\s*(?:(-)\s*(\d*)\s*)?$')
+_CITATION_REF = re.compile(r'\[\^?(\d+)\]')
+
+
+def parse_line_range(spec: str) -> Tuple[int, Optional[int]]:
+    """
+    Parse "200-400", "200-" or "200" (1-indexed, inclusive).
+
+    Returns:
+        (first, last) - last is None for an open range
+
+    Raises:
+        ValueError: Malformed range
+    """
+    match = _LINE_RANGE.match(spec or '')
+    if not match:
+        raise ValueError(f"Invalid line range: {spec!r} (expected e.g. 200-400)")
+    first = int(match.group(1))
+    if match.group(2) is None:
+        last = first
+    else:
+        last = int(match.group(3)) if match.group(3) else None
+    if first < 1 or (last is not None and last < first):
+        raise ValueError(f"Invalid line range: {spec!r}")
+    return first, last
+
+
+def file_validators(stat: os.stat_result, citations: Optional[Dict] = None) -> Tuple[str, str]:
+    """
+    (ETag, Last-Modified) of a note and its citations.
+
+    The ETag changes when the note's mtime or size changes, or when its
+    citations change.
+    """
+    tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    if citations:
+        digest = hashlib.blake2b(json.dumps(citations, sort_keys=True).encode(), digest_size=6).hexdigest()
+        tag += f"-{digest}"
+    return f'W/"{tag}"', formatdate(stat.st_mtime, usegmt=True)
+
+
+def not_modified(
+    headers: Mapping[str, str],
+    etag: str,
+    mtime: float,
+    citations: Optional[Dict] = None
+) -> bool:
+    """
+    True if the request's If-None-Match / If-Modified-Since still match.
+
+    If-Modified-Since only sees the note's mtime, and a citation-only
+    update doesn't touch the note, so it is ignored for notes with
+    citations; those revalidate by ETag.
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since and not citations:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _slice(file_path: Path, outline: MarkdownOutline, content: Optional[str], start: int, end: int) -> str:
+    """Lines [start, end) (0-indexed) of a note."""
+    if start >= end:
+        return ''
+    last = end < outline.line_count
+    if content is not None:
+        stop = outline.line_offsets[end] - 1 if last else outline.length
+        return content[outline.line_offsets[start]:stop]
+    if outline.byte_length == file_path.stat().st_size:
+        stop = outline.line_byte_offsets[end] - 1 if last else outline.byte_length
+        return read_file_range(file_path, outline.line_byte_offsets[start], stop)
+    # Offsets don't map onto the bytes on disk (e.g. CRLF line endings)
+    return '\n'.join(read_file(file_path).split('\n')[start:end])
+
+
+def table_of_contents(outline: MarkdownOutline) -> List[Dict]:
+    """Headings with their 1-indexed line spans (end includes subsections)."""
+    toc = []
+    for heading in outline.headings:
+        closing = outline.section_end(heading)
+        toc.append({
+            'level': heading.level,
+            'title': heading.title,
+            'line': heading.line + 1,
+            'end_line': closing.line if closing else outline.line_count
+        })
+    return toc
+
+
+def read_window(
+    file_path: Path,
+    lines: Optional[str] = None,
+    section: Optional[str] = None,
+    around_line: Optional[int] = None,
+    include_toc: bool = False,
+    include_content: bool = True
+) -> Dict:
+    """
+    Part of a note: a line range, a section (with its subsections), the
+    innermost section containing `around_line`, or a line range within a
+    section (line numbers relative to the section).
+
+    Returns:
+        {'content', 'start_line', 'end_line', 'total_lines', 'section'}
+        with 1-indexed inclusive line numbers, plus 'toc' if requested
+
+    Raises:
+        ValueError: Malformed line range
+        LookupError: No section matching `section`
+    """
+    outline, content = get_file_outline(file_path)
+    start, end = 0, outline.line_count
+    heading = None
+
+    if section:
+        heading = outline.find_section(section, min_level=1)
+        if heading is None:
+            raise LookupError(f"Section not found: {section}")
+    elif around_line is not None:
+        line = min(max(around_line, 1), outline.line_count) - 1
+        heading = outline.heading_at_line(line)
+
+    if heading is not None:
+        closing = outline.section_end(heading)
+        start, end = heading.line, closing.line if closing else outline.line_count
+
+    if around_line is not None and not section and end - start > MAX_AROUND_LINES:
+        # No heading close enough: a fixed window around the line
+        line = min(max(around_line, 1), outline.line_count) - 1
+        start = max(line - AROUND_CONTEXT, start)
+        end = min(line + AROUND_CONTEXT + 1, end)
+
+    if lines:
+        first, last = parse_line_range(lines)
+        base = start
+        start = min(base + first - 1, end)
+        end = end if last is None else min(base + last, end)
+
+    window = {
+        'content': _slice(file_path, outline, content, start, end) if include_content else None,
+        'start_line': start + 1,
+        'end_line': end,
+        'total_lines': outline.line_count,
+        'section': heading.title if heading else None
+    }
+    if include_toc:
+        window['toc'] = table_of_contents(outline)
+    return window
+
+
+def format_toc(toc: List[Dict]) -> str:
+    """Indented outline, one heading per line with its line span."""
+    return '\n'.join(
+        f"{'  ' * (entry['level'] - 1)}- {entry['title']} (lines {entry['line']}-{entry['end_line']})"
+        for entry in toc
+    )
+
+
+def referenced_citations(text: str, citations: Dict) -> Dict:
+    """The citations a piece of a note actually references ([n] markers)."""
+    ids = set(_CITATION_REF.findall(text))
+    return {key: value for key, value in citations.items() if key in ids}
+
+
+def iter_file_chunks(file_path: Path, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """A note's text in chunks."""
+    with open(file_path, 'r') as f:
+        while True:
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_json_document(file_path: Path, head: Dict, tail: Dict, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """
+    A JSON object {**head, "content": <note text>, **tail} produced in
+    chunks, so a large note is never held in memory as one string.
+    """
+    prefix = json.dumps(head)[:-1]
+    yield (prefix + ', ' if head else '{') + '"content": "'
+    for chunk in iter_file_chunks(file_path, chunk_chars):
+        yield json.dumps(chunk)[1:-1]
+    yield '"' + (', ' + json.dumps(tail)[1:] if tail else '}')
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Process Lock - Advisory file locks shared by threads and daemon workers
+
+A ProcessLock is an flock() on a lock file. Each acquisition opens the file
+anew, so the lock excludes other threads of the same process as well as
+other processes (e.g. the workers of a multi-worker daemon). The OS drops
+the lock when its holder exits, so a crashed leader never wedges the rest.
+
+On platforms without fcntl the lock falls back to a per-process
+threading.Lock (multi-worker mode is not offered there).
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+class ProcessLock:
+    """Exclusive lock on `path` (created if missing)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._held = False
+        with _thread_locks_guard:
+            self._fallback = _thread_locks.setdefault(str(self.path), threading.Lock())
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Take the lock.
+
+        Args:
+            blocking: Wait for the lock (False: return immediately)
+
+        Returns:
+            True if the lock is now held
+        """
+        if fcntl is None:
+            self._held = self._fallback.acquire(blocking)
+            return self._held
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        except BaseException:
+            os.close(fd)
+            raise
+
+        # Record the holder for anyone inspecting the file
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        self._held = True
+        return True
+
+    def release(self) -> None:
+        if not self._held:
+            return
+        self._held = False
+        if fcntl is None:
+            self._fallback.release()
+            return
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    @property
+    def held(self) -> bool:
+        return self._held
+
+    def __enter__(self) -> "ProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
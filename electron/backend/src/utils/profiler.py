@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Profiler - On-demand sampling profiler for a live daemon
+
+A background thread snapshots the Python stack of every other thread
+(sys._current_frames) at a fixed interval, so the event loop and all
+executor threads are covered without tracing hooks or restarting the
+process. Cost is one stack walk per thread per sample (~5ms interval by
+default) and only while a profile is being captured.
+
+Output is either collapsed stacks ("thread;outer;...;leaf count", the
+input of flamegraph.pl / speedscope / inferno) or a speedscope JSON file
+with one sampled profile per thread.
+
+Samples taken on executor threads are attributed to the request they
+work for: the daemon tags each request in a context variable, and
+BoundedPool publishes it per thread while running a task. With
+min_request_ms set, only samples of requests that took at least that
+long are kept - the rest are dropped when the request finishes.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+
+# (request id, "METHOD /path") of the request being handled
+CURRENT_REQUEST: ContextVar[Optional[Tuple[int, str]]] = ContextVar('localbrain_request', default=None)
+
+# thread ident -> request it is currently working for
+THREAD_REQUESTS: Dict[int, Tuple[int, str]] = {}
+
+MAX_DEPTH = 128
+MAX_SECONDS = 120
+
+# Leaf frames of threads that are just waiting for work
+IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('queue.py', 'get'),
+    ('selectors.py', 'select'),
+    ('thread.py', '_worker'),
+    ('base_events.py', '_run_once'),
+}
+
+_request_ids = itertools.count(1)
+
+Frame = Tuple[str, str, int]     # (function, file, first line)
+Stack = Tuple[Frame, ...]        # root -> leaf
+
+
+def begin_request(label: str):
+    """Tag the current context with a new request; returns a reset token."""
+    return CURRENT_REQUEST.set((next(_request_ids), label))
+
+
+def end_request(token, seconds: float) -> None:
+    """Untag the context and let an active profiler keep or drop the request's samples."""
+    request = CURRENT_REQUEST.get()
+    CURRENT_REQUEST.reset(token)
+    profiler = _active
+    if profiler is not None and request is not None:
+        profiler.request_finished(request, seconds)
+
+
+class SamplingProfiler:
+    """Samples all threads of the process until stopped."""
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        min_request_ms: Optional[float] = None,
+        include_idle: bool = False
+    ):
+        """
+        Args:
+            interval: Seconds between samples
+            min_request_ms: Keep only samples of requests at least this slow
+            include_idle: Keep samples of threads waiting for work
+        """
+        self.interval = interval
+        self.min_request_ms = min_request_ms
+        self.include_idle = include_idle
+
+        self.counts: Counter = Counter()                   # (thread, stack) -> samples
+        self._pending: Dict[int, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._caller: Optional[int] = None
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        # The caller only sleeps until stop() - keep it out of the profile
+        self._caller = threading.get_ident()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='localbrain-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.monotonic() - self.started_at
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.is_set():
+            frames = sys._current_frames()
+            if not names.keys() >= frames.keys():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own or ident == self._caller:
+                    continue
+                stack = _stack(frame)
+                if not stack or (not self.include_idle and _is_idle(stack)):
+                    continue
+                self._record(names.get(ident, str(ident)), stack, THREAD_REQUESTS.get(ident))
+            self.samples += 1
+            self._stop.wait(self.interval)
+
+    def _record(self, thread: str, stack: Stack, request: Optional[Tuple[int, str]]) -> None:
+        with self._lock:
+            if self.min_request_ms is None:
+                self.counts[(_group(thread, request), stack)] += 1
+            elif request is not None:
+                self._pending[request[0]][(_group(thread, request), stack)] += 1
+
+    def request_finished(self, request: Tuple[int, str], seconds: float) -> None:
+        if self.min_request_ms is None:
+            return
+        with self._lock:
+            samples = self._pending.pop(request[0], None)
+            if samples and seconds * 1000 >= self.min_request_ms:
+                self.counts.update(samples)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def collapsed(self) -> str:
+        """One "group;frame;...;frame count" line per distinct stack."""
+        lines = []
+        for (group, stack), count in self.counts.most_common():
+            frames = ';'.join(_frame_name(frame) for frame in stack)
+            lines.append(f"{group};{frames} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self) -> Dict:
+        """speedscope file-format JSON, one sampled profile per thread/request group."""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict] = []
+        profiles: Dict[str, Dict] = {}
+
+        for (group, stack), count in self.counts.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+                indices.append(frame_index[frame])
+            profile = profiles.setdefault(group, {
+                'type': 'sampled',
+                'name': group,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': 0,
+                'samples': [],
+                'weights': []
+            })
+            profile['samples'].append(indices)
+            profile['weights'].append(round(count * self.interval, 6))
+            profile['endValue'] = round(profile['endValue'] + count * self.interval, 6)
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': f"localbrain-daemon pid {os.getpid()} ({self.duration:.1f}s)",
+            'exporter': 'localbrain',
+            'shared': {'frames': frames},
+            'profiles': list(profiles.values())
+        }
+
+
+def _stack(frame) -> Stack:
+    stack = []
+    while frame is not None and len(stack) < MAX_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _is_idle(stack: Stack) -> bool:
+    name, filename, _ = stack[-1]
+    return (os.path.basename(filename), name) in IDLE_LEAVES
+
+
+def _group(thread: str, request: Optional[Tuple[int, str]]) -> str:
+    return f"{request[1]} [{thread}]" if request else thread
+
+
+def _frame_name(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+_active: Optional[SamplingProfiler] = None
+_active_lock = threading.Lock()
+
+
+def profile(seconds: float, **kwargs) -> SamplingProfiler:
+    """
+    Capture a profile of the whole process (blocks for `seconds`).
+
+    Raises:
+        RuntimeError: Another profile is already being captured
+    """
+    global _active
+    seconds = min(max(seconds, 0.1), MAX_SECONDS)
+    profiler = SamplingProfiler(**kwargs)
+    with _active_lock:
+        if _active is not None:
+            raise RuntimeError("A profile is already being captured")
+        _active = profiler
+    try:
+        profiler.start()
+        time.sleep(seconds)
+        profiler.stop()
+    finally:
+        with _active_lock:
+            _active = None
+    return profiler
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Shared State - Small SQLite key/value store shared by daemon workers
+
+State the daemon used to keep in module globals (conversation history,
+the MCP server pid) lives here instead, so any number of worker processes
+see the same values. Values are JSON; update() is a read-modify-write in
+one BEGIN IMMEDIATE transaction, so concurrent workers never lose writes.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SharedState:
+    """JSON values by key in one SQLite file."""
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections aren't shareable)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._conn().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def update(self, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        Atomically replace a value with fn(current value).
+
+        Returns:
+            The new value
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+            value = fn(json.loads(row[0]) if row else default)
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value))
+            )
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return value
+
+
+_states: Dict[str, SharedState] = {}
+_states_lock = threading.Lock()
+
+
+def get_shared_state(db_path: Path) -> SharedState:
+    """Shared instance per database file."""
+    key = str(db_path)
+    with _states_lock:
+        if key not in _states:
+            _states[key] = SharedState(Path(db_path))
+        return _states[key]
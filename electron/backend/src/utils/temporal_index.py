@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Temporal Index - Time-scoped lookup of vault facts
+
+Every citation carries its source timestamp, normalized to UTC epoch in
+the citation store and indexed there. A time range therefore maps to the
+citations in it with one index range scan, and each citation maps to the
+chunks (lines) of its note that carry its [n] marker. That answers "what
+happened last month" without grepping the vault for date strings.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .citation_store import get_citation_store
+from .file_ops import read_file
+from .markdown_outline import get_outline
+from .timestamps import to_iso_utc
+
+
+_MARKER = re.compile(r'\[(\d+)\]')
+
+
+class TemporalIndex:
+    """(timestamp -> file, citation, chunk) lookups over one vault."""
+
+    def __init__(self, vault_path: Path, store=None):
+        """
+        Args:
+            vault_path: Path to vault root
+            store: CitationStore to scan (default: the vault's shared store)
+        """
+        self.vault_path = Path(vault_path)
+        self.store = store or get_citation_store(self.vault_path)
+
+    def facts(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        platform: Optional[str] = None,
+        pattern: Optional[str] = None,
+        limit: int = 40
+    ) -> List[Dict]:
+        """
+        Facts sourced within [start, end), oldest first.
+
+        Args:
+            start / end: Epoch bounds (None = open-ended)
+            platform: Only citations from this platform
+            pattern: Optional case-insensitive regex the fact line must match
+            limit: Maximum facts (the most recent ones are kept)
+
+        Returns:
+            Dicts {timestamp, file, citation, section, line, text, platform, quote}
+        """
+        regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+        # Citations whose markers were edited away yield no chunk, and the
+        # pattern drops more - scan a few times the limit
+        citations = self.store.query(
+            platform=platform, since=start, until=end, limit=limit * 4 if regex else limit * 2
+        )
+
+        by_file: Dict[str, List[Dict]] = {}
+        for citation in citations:
+            by_file.setdefault(citation['file'], []).append(citation)
+
+        facts = []
+        for relative_path, file_citations in by_file.items():
+            path = self.vault_path / relative_path
+            if not path.exists():
+                continue
+            content = read_file(path)
+            lines = content.split('\n')
+            outline = get_outline(content)
+
+            # citation number -> lines carrying its marker
+            marker_lines: Dict[int, List[int]] = {}
+            for i, line in enumerate(lines):
+                for num in set(_MARKER.findall(line)):
+                    marker_lines.setdefault(int(num), []).append(i)
+
+            for citation in file_citations:
+                for i in marker_lines.get(citation['id'], []):
+                    line = lines[i]
+                    if regex and not regex.search(line):
+                        continue
+                    heading = outline.heading_at_line(i)
+                    facts.append({
+                        'timestamp': to_iso_utc(citation['epoch']) or citation.get('timestamp'),
+                        'epoch': citation['epoch'],
+                        'file': relative_path,
+                        'citation': citation['id'],
+                        'section': heading.title if heading else None,
+                        'line': i + 1,
+                        'text': line.strip(),
+                        'platform': citation.get('platform'),
+                        'quote': citation.get('quote'),
+                    })
+
+        facts.sort(key=lambda fact: (fact['epoch'] or 0, fact['file'], fact['line']))
+        return facts[-limit:]
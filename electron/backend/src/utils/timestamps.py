@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Timestamps - Normalize mixed-format source timestamps and parse time ranges
+
+Sources hand us timestamps as ISO strings ('2024-10-01T12:00:00-07:00'),
+raw RFC 2822 email Date headers ('Tue, 1 Oct 2024 12:00:00 -0700'), plain
+dates or Unix epochs. Everything is normalized to UTC epoch seconds so
+timestamps compare correctly regardless of format or offset.
+
+parse_time_range() turns expressions like "last month", "before March",
+"in 2023" or "past 3 weeks" into [start, end) epoch bounds, and
+find_time_range() finds such an expression inside a question.
+"""
+
+import calendar
+import re
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple, Union
+
+
+TimeRange = Tuple[Optional[float], Optional[float]]
+
+MONTHS = {
+    name.lower(): i
+    for i in range(1, 13)
+    for name in (calendar.month_name[i], calendar.month_abbr[i])
+}
+MONTHS['sept'] = 9
+
+_MONTH = r'(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)'
+_UNIT = r'(day|week|month|year)s?'
+
+_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%B %Y',
+    '%b %Y',
+)
+
+
+def to_epoch(value: Union[str, int, float, datetime, None]) -> Optional[float]:
+    """
+    UTC epoch seconds for a timestamp in any supported format.
+
+    Naive values are taken as UTC. Numbers above 1e11 are read as
+    milliseconds. Digit strings are years ('2024'), compact dates
+    ('20240301') or, from 9 digits on, epochs; other lengths are rejected.
+
+    Returns:
+        Epoch seconds, or None if the value can't be parsed
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    elif isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    else:
+        text = str(value).strip()
+        dt = _parse_string(text)
+        if dt is None:
+            return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _parse_string(text: str) -> Optional[datetime]:
+    m = re.fullmatch(r'(\d+)(\.\d+)?', text)
+    if m:
+        digits = len(m.group(1))
+        if digits == 4 and not m.group(2):
+            return datetime(int(text), 1, 1)
+        if digits == 8 and not m.group(2):
+            try:
+                return datetime.strptime(text, '%Y%m%d')
+            except ValueError:
+                return None
+        if digits < 9:
+            return None
+        number = float(text)
+        number = number / 1000.0 if number > 1e11 else number
+        return datetime.fromtimestamp(number, tz=timezone.utc)
+
+    # ISO 8601 ('Z' suffix isn't accepted by fromisoformat before 3.11)
+    try:
+        return datetime.fromisoformat(re.sub(r'Z$', '+00:00', text))
+    except ValueError:
+        pass
+
+    # RFC 2822 email dates
+    try:
+        return parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        pass
+
+    for fmt in _FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def to_iso_utc(epoch: Optional[float]) -> Optional[str]:
+    """'2024-10-01T19:00:00Z' for an epoch (None stays None)."""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def normalize_timestamp(value) -> Optional[str]:
+    """ISO UTC form of a timestamp; unparseable values are returned unchanged."""
+    epoch = to_epoch(value)
+    return to_iso_utc(epoch) if epoch is not None else value
+
+
+# ----------------------------------------------------------------------
+# Time ranges
+# ----------------------------------------------------------------------
+
+def _utc(year: int, month: int = 1, day: int = 1) -> datetime:
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    index = dt.year * 12 + dt.month - 1 + months
+    return _utc(index // 12, index % 12 + 1)
+
+
+def _period(start: datetime, end: datetime) -> TimeRange:
+    return start.timestamp(), end.timestamp()
+
+
+def _point_range(text: str, now: datetime) -> Optional[Tuple[datetime, datetime]]:
+    """[start, end) of a single point in time: a day, month, quarter or year."""
+    text = text.strip().lower().rstrip('.,?!')
+    today = _utc(now.year, now.month, now.day)
+
+    if text == 'today':
+        return today, today + timedelta(days=1)
+    if text == 'yesterday':
+        return today - timedelta(days=1), today
+
+    m = re.fullmatch(r'q([1-4])\s+(\d{4})', text)
+    if m:
+        start = _utc(int(m.group(2)), 3 * int(m.group(1)) - 2)
+        return start, _add_months(start, 3)
+
+    m = re.fullmatch(r'(\d{4})', text)
+    if m:
+        year = int(m.group(1))
+        return _utc(year), _utc(year + 1)
+
+    m = re.fullmatch(_MONTH + r'(?:\s+(\d{4}))?', text)
+    if m:
+        month = MONTHS[m.group(1)[:3] if m.group(1) not in MONTHS else m.group(1)]
+        if m.group(2):
+            year = int(m.group(2))
+        else:
+            # Bare month: its most recent occurrence
+            year = now.year if month <= now.month else now.year - 1
+        start = _utc(year, month)
+        return start, _add_months(start, 1)
+
+    epoch = to_epoch(text)
+    if epoch is not None:
+        start = datetime.fromtimestamp(epoch, tz=timezone.utc)
+        start = _utc(start.year, start.month, start.day)
+        return start, start + timedelta(days=1)
+    return None
+
+
+def parse_time_range(expression: str, now: Optional[datetime] = None) -> Optional[TimeRange]:
+    """
+    [start, end) epoch bounds for a time expression.
+
+    Supports: today, yesterday; this/last week|month|year; past/last N
+    days|weeks|months|years; N days ago; before/after/since/until X;
+    between X and Y; and bare points X (2023, March, March 2024, Q1 2024,
+    2024-03-05). Weeks start on Monday; all calendar math is in UTC.
+
+    Returns:
+        (start, end) - either side None if open-ended - or None
+    """
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    text = ' '.join(expression.strip().lower().rstrip('.,?!').split())
+    today = _utc(now.year, now.month, now.day)
+
+    m = re.fullmatch(r'(this|last|previous) (week|month|year)', text)
+    if m:
+        back = 0 if m.group(1) == 'this' else 1
+        unit = m.group(2)
+        if unit == 'week':
+            start = today - timedelta(days=today.weekday() + 7 * back)
+            return _period(start, start + timedelta(days=7))
+        if unit == 'month':
+            start = _add_months(_utc(now.year, now.month), -back)
+            return _period(start, _add_months(start, 1))
+        start = _utc(now.year - back)
+        return _period(start, _utc(now.year - back + 1))
+
+    m = re.fullmatch(r'(?:past|last|previous) (\d+) ' + _UNIT, text)
+    if m:
+        count, unit = int(m.group(1)), m.group(2)
+        if unit in ('day', 'week'):
+            start = now - timedelta(days=count * (7 if unit == 'week' else 1))
+        else:
+            start = _add_months(now, -count * (12 if unit == 'year' else 1))
+            start = start.replace(day=min(now.day, calendar.monthrange(start.year, start.month)[1]),
+                                  hour=now.hour, minute=now.minute, second=now.second)
+        return start.timestamp(), None
+
+    m = re.fullmatch(r'(\d+) ' + _UNIT + r' ago', text)
+    if m:
+        count, unit = int(m.group(1)), m.group(2)
+        days = {'day': 1, 'week': 7}.get(unit)
+        if days:
+            start = today - timedelta(days=count * days)
+            return _period(start, start + timedelta(days=days))
+        start = _add_months(_utc(now.year, now.month), -count * (12 if unit == 'year' else 1))
+        length = 12 if unit == 'year' else 1
+        if unit == 'year':
+            start = _utc(start.year)
+        return _period(start, _add_months(start, length))
+
+    m = re.fullmatch(r'between (.+) and (.+)', text)
+    if m:
+        first, second = _point_range(m.group(1), now), _point_range(m.group(2), now)
+        if first and second:
+            return _period(min(first[0], second[0]), max(first[1], second[1]))
+        return None
+
+    m = re.fullmatch(r'(before|until|till|after|since|in|during|on|from) (.+)', text)
+    if m:
+        point = _point_range(m.group(2), now)
+        if point is None:
+            return None
+        keyword = m.group(1)
+        if keyword == 'before':
+            return None, point[0].timestamp()
+        if keyword in ('until', 'till'):
+            return None, point[1].timestamp()
+        if keyword == 'after':
+            return point[1].timestamp(), None
+        if keyword in ('since', 'from'):
+            return point[0].timestamp(), None
+        return _period(*point)
+
+    point = _point_range(text, now)
+    return _period(*point) if point else None
+
+
+_RANGE_PATTERNS = [
+    r'\bbetween\s+.+?\s+and\s+(?:' + _MONTH + r'(?:\s+\d{4})?|\d{4}(?:-\d\d-\d\d)?)',
+    r'\b(?:this|last|previous)\s+(?:week|month|year)\b',
+    r'\b(?:past|last|previous)\s+\d+\s+' + _UNIT + r'\b',
+    r'\b\d+\s+' + _UNIT + r'\s+ago\b',
+    r'\b(?:before|until|till|after|since|in|during|on|from)\s+(?:q[1-4]\s+\d{4}|'
+    + _MONTH + r'(?:\s+\d{1,2},)?(?:\s+\d{4})?|\d{4}-\d\d-\d\d|(?:19|20)\d\d)\b',
+    r'\b(?:today|yesterday)\b',
+]
+
+
+def find_time_range(question: str, now: Optional[datetime] = None) -> Optional[Tuple[str, TimeRange]]:
+    """
+    Find a time expression in a natural-language question.
+
+    Returns:
+        (matched expression, (start, end)) or None
+    """
+    lowered = question.lower()
+    for pattern in _RANGE_PATTERNS:
+        for match in re.finditer(pattern, lowered):
+            expression = match.group(0)
+            bounds = parse_time_range(expression, now)
+            if bounds:
+                return expression, bounds
+    return None
+
+
+def describe_range(bounds: TimeRange) -> str:
+    """Human-readable form of (start, end), e.g. '2024-03-01 → 2024-04-01'."""
+    start, end = bounds
+
+    def fmt(epoch):
+        return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d')
+
+    if start is not None and end is not None:
+        return f"{fmt(start)} → {fmt(end)}"
+    if start is not None:
+        return f"since {fmt(start)}"
+    if end is not None:
+        return f"before {fmt(end)}"
+    return "any time"
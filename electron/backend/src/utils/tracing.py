@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Tracing - Lightweight spans with a context-propagated trace id
+
+A trace id is set once per request (taken from the X-Trace-Id header when
+a caller - the MCP server, the stdio bridge - already has one) and flows
+through context variables: into coroutines, into executor threads
+(BoundedPool runs tasks in the caller's context) and into nested spans.
+
+    with span('search', query=query):
+        ...
+    iteration = start_span('search.iteration', n=3)
+    ...
+    iteration.end()
+
+Finished spans are appended to a JSONL file, one Chrome trace event per
+line ("ph": "X", microsecond ts/dur, trace/span/parent ids in args).
+chrome_trace() turns the lines of one trace into a file Perfetto
+(ui.perfetto.dev) or chrome://tracing opens directly.
+
+Outside a trace (CLI use, tests) span() does nothing and costs one
+context variable lookup.
+"""
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+TRACE_HEADER = 'X-Trace-Id'
+
+# Rotate the trace file (to <name>.1) beyond this size
+MAX_TRACE_BYTES = 50 * 1024 * 1024
+
+# Write buffered spans at least this often (root spans flush immediately)
+FLUSH_EVERY = 100
+
+_VALID_TRACE_ID = re.compile(r'^[0-9A-Za-z._-]{8,64}$')
+
+_trace_id: ContextVar[Optional[str]] = ContextVar('localbrain_trace_id', default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar('localbrain_span', default=None)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def start_trace(trace_id: Optional[str] = None):
+    """
+    Make `trace_id` (or a new id when missing/invalid) the current trace.
+
+    Returns:
+        Token for end_trace()
+    """
+    if not trace_id or not _VALID_TRACE_ID.match(trace_id):
+        trace_id = new_trace_id()
+    return _trace_id.set(trace_id)
+
+
+def end_trace(token) -> None:
+    _trace_id.reset(token)
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def trace_headers() -> Dict[str, str]:
+    """Headers that continue the current trace in another process."""
+    trace_id = _trace_id.get()
+    return {TRACE_HEADER: trace_id} if trace_id else {}
+
+
+class Span:
+    """One timed operation; ended by end() or by leaving its with block."""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'attrs', 'start', '_started', '_token')
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"], attrs: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self._token is None:
+            return
+        duration = time.perf_counter() - self._started
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Ended in another context (e.g. a different thread) - leave it alone
+            pass
+        self._token = None
+        if error is not None:
+            self.attrs['error'] = f"{type(error).__name__}: {error}"
+        _export(self, duration)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end(exc)
+
+
+class _NoopSpan:
+    """Stand-in outside a trace."""
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def start_span(name: str, **attrs):
+    """Start a child of the current span (a no-op span outside a trace)."""
+    trace_id = _trace_id.get()
+    if trace_id is None or _exporter is None:
+        return _NOOP
+    return Span(name, trace_id, _current_span.get(), attrs)
+
+
+# Context-manager spelling: `with span('name'):`
+span = start_span
+
+
+def record_span(name: str, seconds: float, **attrs) -> None:
+    """Export an already-finished operation that took `seconds` until now."""
+    trace_id = _trace_id.get()
+    if trace_id is None or _exporter is None:
+        return
+    parent = _current_span.get()
+    event = _event(
+        name, trace_id, uuid.uuid4().hex[:16], parent.span_id if parent else None,
+        time.time() - seconds, seconds, attrs
+    )
+    _exporter.write(event, flush=False)
+
+
+def traced(name: str):
+    """Decorator running a function inside a span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with start_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def _event(name: str, trace_id: str, span_id: str, parent_id: Optional[str],
+           start: float, seconds: float, attrs: Dict) -> Dict:
+    return {
+        'name': name,
+        'cat': name.split('.', 1)[0],
+        'ph': 'X',
+        'ts': int(start * 1_000_000),
+        'dur': int(seconds * 1_000_000),
+        'pid': os.getpid(),
+        'tid': threading.get_native_id(),
+        'args': {'trace_id': trace_id, 'span_id': span_id, 'parent_id': parent_id, **attrs}
+    }
+
+
+def _export(span: Span, seconds: float) -> None:
+    exporter = _exporter
+    if exporter is None:
+        return
+    event = _event(span.name, span.trace_id, span.span_id, span.parent_id, span.start, seconds, span.attrs)
+    exporter.write(event, flush=span.parent_id is None)
+
+
+class JsonlExporter:
+    """Appends span events to a JSONL file (shared by daemon workers and the MCP server)."""
+
+    def __init__(self, path: Path, max_bytes: int = MAX_TRACE_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, event: Dict, flush: bool = False) -> None:
+        line = json.dumps(event, default=str) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            if flush or len(self._buffer) >= FLUSH_EVERY:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer).encode()
+        self._buffer.clear()
+        try:
+            if self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + '.1'))
+            # One O_APPEND write per batch keeps lines from interleaving across processes
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Tracing must never fail a request
+            pass
+
+    def read(self, trace_id: str) -> List[Dict]:
+        """Events of one trace, from the current and the rotated file."""
+        self.flush()
+        needle = f'"trace_id": "{trace_id}"'
+        events = []
+        for path in (self.path.with_name(self.path.name + '.1'), self.path):
+            if not path.exists():
+                continue
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    if needle in line:
+                        try:
+                            events.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        return sorted(events, key=lambda e: e['ts'])
+
+
+_exporter: Optional[JsonlExporter] = None
+
+
+def configure_tracing(path: Optional[Path]) -> Optional[JsonlExporter]:
+    """Export spans to `path` (None disables tracing)."""
+    global _exporter
+    if _exporter is not None:
+        _exporter.flush()
+    _exporter = JsonlExporter(path) if path else None
+    return _exporter
+
+
+def get_exporter() -> Optional[JsonlExporter]:
+    return _exporter
+
+
+def chrome_trace(events: List[Dict]) -> Dict:
+    """Trace Event Format document for Perfetto / chrome://tracing."""
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def summarize(events: List[Dict]) -> Iterator[str]:
+    """Indented "name  duration" lines of one trace, children under parents."""
+    children: Dict[Optional[str], List[Dict]] = {}
+    ids = {e['args'].get('span_id') for e in events}
+    for event in events:
+        parent = event['args'].get('parent_id')
+        children.setdefault(parent if parent in ids else None, []).append(event)
+
+    def walk(parent: Optional[str], depth: int) -> Iterator[str]:
+        for event in children.get(parent, []):
+            yield f"{'  ' * depth}{event['name']}  {event['dur'] / 1000:.1f}ms"
+            yield from walk(event['args'].get('span_id'), depth + 1)
+
+    yield from walk(None, 0)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Vault Tree - Recursive vault listing from os.scandir
+
+/list/{path} answers one folder per request and stats every entry twice
+plus a full iterdir() of each subfolder just to count it. build_tree()
+walks a folder to a given depth in one pass of os.scandir (entry types
+come from the directory read; only listed files and folders are stat'ed)
+and caps each folder at `limit` entries, handing out a cursor for the rest.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+LISTED_SUFFIXES = ('.md', '.json')
+
+MAX_DEPTH = 32
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+
+def encode_cursor(after: str) -> str:
+    return base64.urlsafe_b64encode(after.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Raises:
+        ValueError: Malformed cursor
+    """
+    try:
+        return base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _visible(entry: os.DirEntry) -> Optional[str]:
+    """'file' / 'directory' for entries the vault listing shows, else None."""
+    if entry.name.startswith('.'):
+        return None
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            return 'directory'
+        if entry.is_file() and entry.name.endswith(LISTED_SUFFIXES):
+            return 'file'
+    except OSError:
+        pass
+    return None
+
+
+def _scan(path: str) -> List[Tuple[os.DirEntry, str]]:
+    """Visible entries of one folder, sorted by name."""
+    try:
+        with os.scandir(path) as it:
+            entries = [(entry, kind) for entry in it for kind in (_visible(entry),) if kind]
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return []
+    entries.sort(key=lambda pair: pair[0].name)
+    return entries
+
+
+def build_tree(
+    vault_path: Path,
+    rel_path: str = '',
+    depth: int = 1,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None
+) -> Dict:
+    """
+    Folder listing `depth` levels deep.
+
+    Args:
+        vault_path: Vault root
+        rel_path: Folder relative to the vault ('' for the root)
+        depth: Levels to expand (1 = just this folder)
+        limit: Entries per folder; larger folders get a next_cursor
+        cursor: Resume this folder after a previous page (applies to the
+            top folder only - deeper folders are paged with their own
+            /tree?path=... requests)
+
+    Returns:
+        {'path', 'items', 'item_count', 'next_cursor', 'files', 'directories'}
+        where directory items carry 'item_count', 'children' (when
+        expanded) and 'next_cursor' (when truncated)
+    """
+    depth = min(max(depth, 1), MAX_DEPTH)
+    limit = min(max(limit, 1), MAX_LIMIT)
+    after = decode_cursor(cursor) if cursor else None
+    totals = {'files': 0, 'directories': 0}
+
+    def walk(abs_path: str, rel: str, level: int, after: Optional[str]) -> Tuple[List[Dict], int, Optional[str]]:
+        entries = _scan(abs_path)
+        count = len(entries)
+        if after is not None:
+            entries = [pair for pair in entries if pair[0].name > after]
+        next_cursor = encode_cursor(entries[limit - 1][0].name) if len(entries) > limit else None
+
+        items = []
+        for entry, kind in entries[:limit]:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            item_path = f"{rel}/{entry.name}" if rel else entry.name
+            item = {
+                'name': entry.name,
+                'path': item_path,
+                'type': kind,
+                'last_modified': stat.st_mtime
+            }
+            if kind == 'file':
+                item['size'] = stat.st_size
+                totals['files'] += 1
+            else:
+                totals['directories'] += 1
+                if level < depth:
+                    children, child_count, child_cursor = walk(entry.path, item_path, level + 1, None)
+                    item['item_count'] = child_count
+                    item['children'] = children
+                    if child_cursor:
+                        item['next_cursor'] = child_cursor
+                else:
+                    item['item_count'] = len(_scan(entry.path))
+            items.append(item)
+        return items, count, next_cursor
+
+    root = os.path.join(vault_path, rel_path) if rel_path else str(vault_path)
+    items, count, next_cursor = walk(root, rel_path.strip('/'), 1, after)
+    return {
+        'path': rel_path or '/',
+        'depth': depth,
+        'items': items,
+        'item_count': count,
+        'next_cursor': next_cursor,
+        **totals
+    }
+
+
+def tree_etag(tree: Dict) -> str:
+    """Weak ETag over everything a client would render."""
+    digest = hashlib.sha1(json.dumps(tree, sort_keys=True).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, '*' and lists allowed)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
@@ -0,0 +1,101 @@
+"""BulkIngestionPipeline.bulk_ingest_jsonl: per-batch checkpoints and retries."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('dotenv')
+pytest.importorskip('anthropic')
+
+from bulk_ingest import BulkIngestionPipeline
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-chunk (not caught as a batch error)."""
+
+
+def _pipeline(fail=(), crash=()):
+    """Pipeline whose batches record their item texts instead of calling the LLM."""
+    pipeline = BulkIngestionPipeline.__new__(BulkIngestionPipeline)
+    pipeline.condenser = SimpleNamespace(llm=SimpleNamespace(usage={'input_tokens': 0, 'output_tokens': 0}))
+    pipeline.citation_store = SimpleNamespace(export_sidecars=lambda: None)
+    pipeline.written = []
+
+    def process_batch(batch, source, condense_long_items=True):
+        texts = [item['text'] for item in batch]
+        if set(texts) & set(crash):
+            raise Crash()
+        if set(texts) & set(fail):
+            return {'success': False, 'error': 'rate limited'}
+        pipeline.written.extend(texts)
+        return {'success': True, 'files_created': [], 'files_updated': []}
+
+    pipeline._process_batch = process_batch
+    return pipeline
+
+
+def _write_items(path, count):
+    with open(path, 'w') as f:
+        for n in range(count):
+            f.write(json.dumps({'text': f'item {n}', 'metadata': {'platform': 'test'}}) + '\n')
+
+
+def _ingest(pipeline, path, state_path):
+    return pipeline.bulk_ingest_jsonl(
+        path, state_path, chunk_items=10, batch_size=2, max_workers=1, batching='source'
+    )
+
+
+def test_resume_skips_batches_written_before_a_crash(tmp_path):
+    items = tmp_path / 'items.jsonl'
+    state_path = tmp_path / 'items.state.json'
+    _write_items(items, 10)
+
+    first = _pipeline(crash=['item 4'])
+    with pytest.raises(Crash):
+        _ingest(first, items, state_path)
+    assert first.written[:4] == ['item 0', 'item 1', 'item 2', 'item 3']
+
+    # No chunk finished, but the first two batches were checkpointed
+    assert json.loads(state_path.read_text())['offset'] == 0
+
+    second = _pipeline()
+    result = _ingest(second, items, state_path)
+
+    assert second.written == [f'item {n}' for n in range(4, 10)]
+    assert result['stats']['successful'] == 10
+    assert result['stats']['items_done'] == 10
+    assert result['stats']['failed'] == 0
+
+
+def test_failed_batches_are_retried_on_the_next_run(tmp_path):
+    items = tmp_path / 'items.jsonl'
+    state_path = tmp_path / 'items.state.json'
+    _write_items(items, 6)
+
+    first = _pipeline(fail=['item 2'])
+    result = _ingest(first, items, state_path)
+    assert result['stats']['failed'] == 2
+    assert len(result['stats']['retry_offsets']) == 2
+
+    second = _pipeline()
+    result = _ingest(second, items, state_path)
+
+    assert second.written == ['item 2', 'item 3']
+    assert result['stats']['successful'] == 6
+    assert result['stats']['failed'] == 0
+    assert result['stats']['retry_offsets'] == []
+
+
+def test_fresh_run_ignores_an_earlier_runs_log(tmp_path):
+    items = tmp_path / 'items.jsonl'
+    state_path = tmp_path / 'items.state.json'
+    _write_items(items, 4)
+
+    _ingest(_pipeline(), items, state_path)
+    state_path.unlink()
+
+    again = _pipeline()
+    _ingest(again, items, state_path)
+    assert again.written == [f'item {n}' for n in range(4)]
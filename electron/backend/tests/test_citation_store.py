@@ -0,0 +1,111 @@
+"""CitationStore: sidecar import, id allocation, hand edits and diff writes."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.citation_store import CitationStore
+
+
+GMAIL = {'platform': 'Gmail', 'timestamp': '2024-10-01T19:00:00Z', 'quote': 'Offer attached'}
+SLACK = {'platform': 'Slack', 'timestamp': '2024-10-08T12:00:00Z', 'quote': 'Start date moved'}
+
+
+def _vault(tmp_path, citations=None):
+    note = tmp_path / 'career' / 'Meta.md'
+    note.parent.mkdir(parents=True)
+    note.write_text('# Meta\n\nOffer [1]\n')
+    if citations is not None:
+        note.with_suffix('.json').write_text(json.dumps(citations))
+    return note
+
+
+def test_existing_sidecars_are_imported(tmp_path):
+    _vault(tmp_path, {'1': GMAIL, '2': SLACK, 'notes': 'ignored'})
+
+    store = CitationStore(tmp_path)
+
+    assert store.get('career/Meta.md') == {'1': GMAIL, '2': SLACK}
+    assert [c['id'] for c in store.query(platform='gmail')] == [1]
+    assert [c['id'] for c in store.query(since='2024-10-05')] == [2]
+    assert store.get('career/Missing.md') is None
+
+
+def test_allocation_continues_after_imported_ids(tmp_path):
+    _vault(tmp_path, {'1': GMAIL, '7': SLACK})
+    store = CitationStore(tmp_path)
+    assert store.allocate('career/Meta.md') == 8
+    assert store.allocate('career/Meta.md', count=3) == 9
+    assert store.allocate('career/Meta.md') == 12
+
+
+def test_allocated_ids_are_unique_across_threads_and_stores(tmp_path):
+    _vault(tmp_path)
+    stores = [CitationStore(tmp_path), CitationStore(tmp_path)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda n: stores[n % 2].append('career/Meta.md', {'n': n}), range(40)))
+
+    assert sorted(ids) == list(range(1, 41))
+    assert len(stores[0].get('career/Meta.md')) == 40
+
+
+def test_hand_edited_sidecar_is_reimported(tmp_path):
+    note = _vault(tmp_path, {'1': GMAIL})
+    store = CitationStore(tmp_path)
+    assert store.get(note) == {'1': GMAIL}
+
+    sidecar = note.with_suffix('.json')
+    sidecar.write_text(json.dumps({'1': SLACK, '5': GMAIL}))
+    stat = sidecar.stat()
+    os.utime(sidecar, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert store.get(note) == {'1': SLACK, '5': GMAIL}
+    assert store.allocate(note) == 6
+
+
+def test_export_writes_only_dirty_notes(tmp_path):
+    note = _vault(tmp_path, {'1': GMAIL})
+    store = CitationStore(tmp_path)
+
+    assert store.export_sidecars() == 0
+    store.append(note, SLACK)
+    assert store.export_sidecars() == 1
+    assert json.loads(note.with_suffix('.json').read_text()) == {'1': GMAIL, '2': SLACK}
+
+    # Our own export is not mistaken for a hand edit
+    assert store.get(note) == {'1': GMAIL, '2': SLACK}
+    assert store.export_sidecars() == 0
+
+
+def test_apply_writes_differences(tmp_path):
+    note = _vault(tmp_path, {'1': GMAIL, '2': SLACK})
+    other = note.with_name('Google.md')
+    other.write_text('# Google\n')
+    store = CitationStore(tmp_path)
+
+    edited = dict(GMAIL, quote='Offer attached (revised)')
+    store.apply([
+        (note, {'1': GMAIL, '2': SLACK}, {'1': edited, '4': SLACK}),
+        (other, {}, {'1': GMAIL}),
+    ])
+
+    assert store.get(note) == {'1': edited, '4': SLACK}
+    assert store.get(other) == {'1': GMAIL}
+    assert store.allocate(note) == 5
+    assert store.export_sidecars() == 2
+
+
+def test_apply_rolls_back_as_a_whole(tmp_path):
+    note = _vault(tmp_path, {'1': GMAIL})
+    store = CitationStore(tmp_path)
+
+    with pytest.raises(ValueError):
+        store.apply([
+            (note, {'1': GMAIL}, {}),
+            (note, {}, {'bad': GMAIL}),
+        ])
+
+    assert store.get(note) == {'1': GMAIL}
@@ -0,0 +1,67 @@
+"""EditTransaction: baseline errors vs errors introduced by an ingest."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from core.ingestion.edit_transaction import EditTransaction
+
+
+def _missing_related(path, content, citations):
+    return [] if '## Related' in content else ["Missing '## Related' section"]
+
+
+def test_introduced_errors_ignores_baseline(tmp_path):
+    note = tmp_path / 'note.md'
+    note.write_text('# Note\n\nBroken since before the ingest.\n')
+
+    txn = EditTransaction(_missing_related)
+    buf = txn.open(note)
+    buf.content += '\nA clean append.\n'
+
+    file_errors = txn.validate()
+    assert file_errors == {note: ["Missing '## Related' section"]}
+    assert txn.introduced_errors(file_errors) == {}
+    assert txn.new_errors(file_errors) == []
+
+
+def test_introduced_errors_keeps_new_errors(tmp_path):
+    note = tmp_path / 'note.md'
+    note.write_text('# Note\n\n## Related\n')
+
+    txn = EditTransaction(_missing_related)
+    buf = txn.open(note)
+    buf.content = '# Note\n\nRelated section removed.\n'
+
+    assert txn.introduced_errors(txn.validate()) == {note: ["Missing '## Related' section"]}
+
+
+def test_baseline_invalid_note_is_not_repaired(tmp_path):
+    pytest.importorskip('dotenv')
+    pytest.importorskip('anthropic')
+    from agentic_ingest import AgenticIngestionPipeline, MarkdownValidator
+    from core.ingestion.ingest_metrics import IngestMetrics
+
+    note = tmp_path / 'note.md'
+    note.write_text('# Note\n\nNo related section here.\n')
+
+    repairs = []
+    pipeline = AgenticIngestionPipeline.__new__(AgenticIngestionPipeline)
+    pipeline.modifier = SimpleNamespace(
+        determine_repairs=lambda *args, **kwargs: repairs.append(args) or [],
+        apply_repairs=lambda content, operations: content
+    )
+    llm = SimpleNamespace(usage={'calls': 0, 'input_tokens': 0, 'output_tokens': 0})
+
+    txn = EditTransaction(MarkdownValidator.validate_content)
+    buf = txn.open(note)
+    buf.content += '\nA clean append.\n'
+
+    result = pipeline._validate_and_repair(
+        {'success': True, 'errors': [], 'files_modified': [str(note)], 'files_created': []},
+        txn, 1, 3, IngestMetrics(llm, 'test')
+    )
+
+    assert repairs == []
+    assert result['errors'] == []
+    assert result['invalid_files'] == []
@@ -0,0 +1,73 @@
+"""FilenameIndex lookups and the edit distances behind them."""
+
+import random
+
+from utils.filename_index import FilenameIndex, MAX_CANDIDATES
+from utils.fuzzy_matcher import bounded_levenshtein, levenshtein
+
+
+def _note(vault, relative_path):
+    path = vault / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('# Note\n')
+
+
+def test_bounded_levenshtein_matches_levenshtein():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = ''.join(rng.choice('abc ') for _ in range(rng.randint(0, 12)))
+        b = ''.join(rng.choice('abc ') for _ in range(rng.randint(0, 12)))
+        bound = rng.randint(0, 6)
+
+        distance = levenshtein(a, b)
+        expected = distance if distance <= bound else bound + 1
+        assert bounded_levenshtein(a, b, bound) == expected, (a, b, bound)
+
+
+def test_levenshtein_known_values():
+    assert levenshtein('kitten', 'sitting') == 3
+    assert levenshtein('', 'abc') == 3
+    assert bounded_levenshtein('kitten', 'sitting', 2) == 3
+    assert bounded_levenshtein('job search', 'job seach', 1) == 1
+
+
+def test_nested_folders_are_indexed(tmp_path):
+    _note(tmp_path, 'career/Job Search.md')
+    _note(tmp_path, 'career/offers/Meta Offer.md')
+    index = FilenameIndex(tmp_path)
+
+    assert index.resolve('career/offers/meta-offer.md', 1.0, same_folder=True) == 'career/offers/Meta Offer.md'
+
+    # Notes added to a nested folder later are picked up on the next lookup
+    _note(tmp_path, 'career/offers/deep/Google Offer.md')
+    assert index.resolve('google_offer.md', 1.0) == 'career/offers/deep/Google Offer.md'
+
+
+def test_deleted_nested_folder_is_dropped(tmp_path):
+    _note(tmp_path, 'career/offers/Meta Offer.md')
+    index = FilenameIndex(tmp_path)
+    assert len(index) == 1
+
+    (tmp_path / 'career/offers/Meta Offer.md').unlink()
+    (tmp_path / 'career/offers').rmdir()
+    assert index.resolve('Meta Offer.md', 1.0) is None
+    assert len(index) == 0
+
+
+def test_same_folder_filter_applies_before_ranking(tmp_path):
+    # More same-named-ish notes elsewhere than there are candidate slots
+    for n in range(MAX_CANDIDATES + 4):
+        _note(tmp_path, f'archive/job search log {chr(97 + n)}.md')
+    _note(tmp_path, 'career/Job Seerch.md')
+    index = FilenameIndex(tmp_path)
+
+    assert index.resolve('career/job search log.md', 0.5, same_folder=True) == 'career/Job Seerch.md'
+
+
+def test_fuzzy_match_requires_same_numbers(tmp_path):
+    _note(tmp_path, 'journal/Notes 2023.md')
+    _note(tmp_path, 'career/Job Search.md')
+    index = FilenameIndex(tmp_path)
+
+    assert index.resolve('career/Job Seach.md', 0.85, same_folder=True) == 'career/Job Search.md'
+    assert index.resolve('journal/Notes 2024.md', 0.85, same_folder=True) is None
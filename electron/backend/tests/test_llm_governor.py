@@ -0,0 +1,102 @@
+"""LLM governor: retry accounting and per-worker limit shares."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+anthropic = pytest.importorskip('anthropic')
+
+from utils import llm_governor
+from utils.llm_governor import MAX_RETRIES
+
+
+class Overloaded(anthropic.APIStatusError):
+    """529 without going through the SDK's response plumbing."""
+
+    def __init__(self):
+        Exception.__init__(self, 'overloaded')
+        self.status_code = 529
+        self.response = None
+
+
+class BadRequest(anthropic.APIStatusError):
+    def __init__(self):
+        Exception.__init__(self, 'bad request')
+        self.status_code = 400
+        self.response = None
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    monkeypatch.setattr(llm_governor, '_governor', None)
+    monkeypatch.setattr(llm_governor.time, 'sleep', lambda seconds: None)
+    return llm_governor.get_governor()
+
+
+def _client(errors):
+    """Client whose create() raises the given errors in turn, then succeeds."""
+    errors = list(errors)
+
+    def create(**kwargs):
+        if errors:
+            raise errors.pop(0)
+        return SimpleNamespace(usage=None, stop_reason='end_turn')
+
+    return SimpleNamespace(messages=SimpleNamespace(create=create))
+
+
+def test_retries_counted_only_when_retrying(governor, monkeypatch):
+    monkeypatch.setattr(llm_governor, 'get_anthropic_client', lambda: _client([Overloaded()] * 10))
+
+    with pytest.raises(Overloaded):
+        llm_governor.create_message(model='test', messages=[])
+
+    # The last failure is raised, not retried
+    assert governor.stats()['retries'] == MAX_RETRIES
+
+
+def test_non_retryable_error_is_not_counted(governor, monkeypatch):
+    monkeypatch.setattr(llm_governor, 'get_anthropic_client', lambda: _client([BadRequest()]))
+
+    with pytest.raises(BadRequest):
+        llm_governor.create_message(model='test', messages=[])
+    assert governor.stats()['retries'] == 0
+
+
+def test_async_retries_counted_only_when_retrying(governor, monkeypatch):
+    errors = [Overloaded()] * 10
+
+    async def create(**kwargs):
+        raise errors.pop(0)
+
+    async def no_sleep(seconds):
+        return None
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(llm_governor, 'get_async_anthropic_client', lambda: client)
+    monkeypatch.setattr(llm_governor.asyncio, 'sleep', no_sleep)
+
+    with pytest.raises(Overloaded):
+        asyncio.run(llm_governor.acreate_message(model='test', messages=[]))
+    assert governor.stats()['retries'] == MAX_RETRIES
+
+
+def test_recovered_call_counts_its_retries(governor, monkeypatch):
+    monkeypatch.setattr(llm_governor, 'get_anthropic_client', lambda: _client([Overloaded()] * 2))
+
+    llm_governor.create_message(model='test', messages=[])
+    assert governor.stats()['retries'] == 2
+
+
+def test_limits_are_split_across_worker_processes(monkeypatch):
+    monkeypatch.setattr(llm_governor, '_governor', None)
+    monkeypatch.setenv('LOCALBRAIN_LLM_MAX_CONCURRENCY', '8')
+    monkeypatch.setenv('LOCALBRAIN_LLM_RPM', '60')
+    monkeypatch.setenv('LOCALBRAIN_LLM_TPM', '120000')
+    monkeypatch.setenv('LOCALBRAIN_LLM_PROCESSES', '4')
+
+    governor = llm_governor.get_governor()
+    assert governor.max_concurrency == 2
+    assert governor._requests.capacity == 15
+    assert governor._tokens.capacity == 30000
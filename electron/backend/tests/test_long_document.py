@@ -0,0 +1,64 @@
+"""LongDocumentCondenser: digests keep every fact and tolerate odd LLM output."""
+
+import pytest
+
+pytest.importorskip('dotenv')
+pytest.importorskip('anthropic')
+
+from core.ingestion.long_document import LongDocumentCondenser, split_document
+
+
+class FakeLLM:
+    """Extraction returns one fact per paragraph; merging changes nothing."""
+
+    def __init__(self, extract=None):
+        self.extract = extract
+
+    def call_json(self, prompt, system=None, max_tokens=None):
+        if prompt.startswith('FACTS:'):
+            return {'facts': [line[2:] for line in prompt.splitlines()[1:]]}
+        if self.extract is not None:
+            return self.extract
+        chunk = prompt.split('\n\n', 1)[1].rsplit('\n\nExtract', 1)[0]
+        return {'title': 'Part', 'facts': [p for p in chunk.split('\n\n') if p.strip()]}
+
+
+def _document(paragraphs):
+    return '\n\n'.join(f'Fact number {n} about the quarterly plan.' for n in range(paragraphs))
+
+
+def test_split_document_respects_chunk_size():
+    chunks = split_document(_document(200), 500)
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert sum(chunk.count('Fact number') for chunk in chunks) == 200
+
+
+def test_overflowing_facts_go_into_further_digests():
+    condenser = LongDocumentCondenser(FakeLLM(), max_chunk_chars=800, max_merge_chars=1000, max_reduce_rounds=1)
+
+    digests = condenser.condense(_document(120))
+
+    assert len(digests) > 1
+    assert all(len(digest) <= 1000 for digest in digests)
+    text = '\n'.join(digests)
+    assert all(f'Fact number {n} ' in text for n in range(120))
+
+
+def test_short_fact_list_is_one_digest():
+    condenser = LongDocumentCondenser(FakeLLM(), max_chunk_chars=800, max_merge_chars=8000)
+    digests = condenser.condense(_document(10))
+    assert len(digests) == 1
+    assert 'Fact number 9 ' in digests[0]
+
+
+@pytest.mark.parametrize('extract', [
+    {'facts': None},
+    {'facts': 'A single fact as a string.'},
+    {'facts': {'unexpected': 'object'}},
+    {'facts': ['Valid fact.', None, {'nested': 1}], 'title': ['not', 'a', 'string']},
+])
+def test_malformed_extraction_is_tolerated(extract):
+    condenser = LongDocumentCondenser(FakeLLM(extract), max_chunk_chars=800)
+    digests = condenser.condense(_document(40))
+    assert len(digests) == 1
+    assert 'None' not in digests[0]
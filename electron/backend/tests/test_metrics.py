@@ -0,0 +1,53 @@
+"""Metrics registry rendering and the multi-worker snapshot merge."""
+
+import os
+import time
+
+from utils.metrics import MetricsRegistry, merge_snapshots, render_families, write_snapshot
+
+
+def _registry(requests):
+    registry = MetricsRegistry()
+    counter = registry.counter('localbrain_requests_total', 'Requests', ('route',))
+    for _ in range(requests):
+        counter.labels('/search').inc()
+    return registry
+
+
+def test_render_matches_families():
+    registry = _registry(2)
+    text = registry.render()
+    assert text == render_families(registry.families())
+    assert '# TYPE localbrain_requests_total counter' in text
+    assert 'localbrain_requests_total{route="/search"} 2' in text
+
+
+def test_merge_labels_every_worker(tmp_path):
+    write_snapshot(tmp_path, '101', _registry(3).families())
+    write_snapshot(tmp_path, '102', _registry(5).families())
+
+    text = render_families(merge_snapshots(tmp_path, '102', _registry(7).families(), max_age=60))
+
+    # HELP/TYPE once per family; the serving worker's live values win over its snapshot
+    assert text.count('# TYPE localbrain_requests_total counter') == 1
+    assert 'localbrain_requests_total{route="/search",worker="101"} 3' in text
+    assert 'localbrain_requests_total{route="/search",worker="102"} 7' in text
+    assert 'worker="102"} 5' not in text
+
+
+def test_merge_skips_stale_and_broken_snapshots(tmp_path):
+    write_snapshot(tmp_path, '101', _registry(3).families())
+    stale = time.time() - 600
+    os.utime(tmp_path / '101.json', (stale, stale))
+    (tmp_path / '103.json').write_text('{"truncated":')
+
+    families = merge_snapshots(tmp_path, '102', _registry(1).families(), max_age=60)
+
+    text = render_families(families)
+    assert 'worker="101"' not in text
+    assert 'localbrain_requests_total{route="/search",worker="102"} 1' in text
+
+
+def test_merge_without_directory(tmp_path):
+    families = merge_snapshots(tmp_path / 'missing', '102', _registry(1).families(), max_age=60)
+    assert 'worker="102"} 1' in render_families(families)
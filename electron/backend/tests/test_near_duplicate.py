@@ -0,0 +1,81 @@
+"""NearDuplicateIndex persistence: append-only log, merging and compaction."""
+
+import json
+
+from core.ingestion import near_duplicate
+from core.ingestion.near_duplicate import NearDuplicateIndex, simhash
+
+
+TEXT = "Your interview with Meta is confirmed for Tuesday at 10am with the infra team"
+
+
+def _fingerprint(n):
+    return simhash(f"{TEXT} and note number {n} of the series about onboarding")
+
+
+def test_save_appends_only_new_entries(tmp_path):
+    index = NearDuplicateIndex(tmp_path)
+    index.add(_fingerprint(1), {'career/Meta.md': 1})
+    index.save()
+    index.add(_fingerprint(2), {'career/Meta.md': 2})
+    index.save()
+    index.save()
+
+    lines = index.log_path.read_text().splitlines()
+    assert len(lines) == 2
+    assert not index.index_path.exists()
+
+    reloaded = NearDuplicateIndex(tmp_path)
+    score, entry = reloaded.query(_fingerprint(2))
+    assert score == 1.0
+    assert entry['files'] == {'career/Meta.md': 2}
+
+
+def test_concurrent_instances_merge(tmp_path):
+    first = NearDuplicateIndex(tmp_path)
+    second = NearDuplicateIndex(tmp_path)
+
+    first.add(_fingerprint(1), {'a.md': 1})
+    first.save()
+    second.add(_fingerprint(2), {'b.md': 1})
+    second.save()
+
+    # second picked up first's entry while saving; first sees second's on its next save
+    assert second.query(_fingerprint(1))[0] == 1.0
+    first.save()
+    assert first.query(_fingerprint(2))[0] == 1.0
+    assert len(NearDuplicateIndex(tmp_path).entries) == 2
+
+
+def test_compaction_folds_log_into_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(near_duplicate, 'COMPACT_ENTRIES', 3)
+    index = NearDuplicateIndex(tmp_path)
+    other = NearDuplicateIndex(tmp_path)
+
+    for n in range(4):
+        index.add(_fingerprint(n), {f'{n}.md': 1})
+        index.save()
+
+    snapshot = json.loads(index.index_path.read_text())
+    assert len(snapshot['entries']) == 3
+    assert len(index.log_path.read_text().splitlines()) == 1
+
+    # An instance that loaded before the compaction rereads the snapshot
+    other.save()
+    assert len(other.entries) == 4
+    assert all(other.query(_fingerprint(n))[0] == 1.0 for n in range(4))
+
+
+def test_torn_record_is_skipped(tmp_path):
+    index = NearDuplicateIndex(tmp_path)
+    index.add(_fingerprint(1), {'a.md': 1})
+    index.save()
+    with open(index.log_path, 'a') as f:
+        f.write('["00ff", "2024-')  # crash mid-append
+
+    index.add(_fingerprint(2), {'b.md': 1})
+    index.save()
+
+    reloaded = NearDuplicateIndex(tmp_path)
+    assert len(reloaded.entries) == 2
+    assert reloaded.query(_fingerprint(2))[1]['files'] == {'b.md': 1}
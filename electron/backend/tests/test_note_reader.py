@@ -0,0 +1,46 @@
+"""Conditional /file reads: validators and 304 decisions."""
+
+from email.utils import formatdate
+
+from utils.note_reader import file_validators, not_modified
+
+
+def _stat(tmp_path):
+    note = tmp_path / 'note.md'
+    note.write_text('# Note\n\nFact [1]\n')
+    return note.stat()
+
+
+def test_etag_changes_with_citations(tmp_path):
+    stat = _stat(tmp_path)
+    plain, _ = file_validators(stat)
+    cited, _ = file_validators(stat, {'1': {'platform': 'Gmail'}})
+    recited, _ = file_validators(stat, {'1': {'platform': 'Gmail'}, '2': {'platform': 'Slack'}})
+    assert len({plain, cited, recited}) == 3
+
+
+def test_if_none_match(tmp_path):
+    stat = _stat(tmp_path)
+    etag, _ = file_validators(stat)
+    assert not_modified({'if-none-match': etag}, etag, stat.st_mtime)
+    assert not not_modified({'if-none-match': 'W/"other"'}, etag, stat.st_mtime)
+
+
+def test_if_modified_since_without_citations(tmp_path):
+    stat = _stat(tmp_path)
+    etag, last_modified = file_validators(stat)
+    assert not_modified({'if-modified-since': last_modified}, etag, stat.st_mtime)
+
+    earlier = formatdate(stat.st_mtime - 3600, usegmt=True)
+    assert not not_modified({'if-modified-since': earlier}, etag, stat.st_mtime)
+    assert not not_modified({'if-modified-since': 'garbage'}, etag, stat.st_mtime)
+
+
+def test_if_modified_since_ignored_for_cited_notes(tmp_path):
+    stat = _stat(tmp_path)
+    citations = {'1': {'platform': 'Gmail'}}
+    etag, last_modified = file_validators(stat, citations)
+
+    # A citation-only update leaves the note's mtime alone
+    assert not not_modified({'if-modified-since': last_modified}, etag, stat.st_mtime, citations)
+    assert not_modified({'if-none-match': etag}, etag, stat.st_mtime, citations)
@@ -0,0 +1,83 @@
+"""Timestamp normalization and time-range parsing."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from utils.timestamps import find_time_range, normalize_timestamp, parse_time_range, to_epoch
+
+
+NOW = datetime(2024, 10, 16, 15, 30, tzinfo=timezone.utc)  # a Wednesday
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-10-01T12:00:00-07:00', _utc(2024, 10, 1, 19)),
+    ('2024-10-01T19:00:00Z', _utc(2024, 10, 1, 19)),
+    ('Tue, 1 Oct 2024 12:00:00 -0700', _utc(2024, 10, 1, 19)),
+    ('2024-10-01', _utc(2024, 10, 1)),
+    ('October 1, 2024', _utc(2024, 10, 1)),
+    ('March 2024', _utc(2024, 3, 1)),
+    ('2024', _utc(2024, 1, 1)),
+    ('20240301', _utc(2024, 3, 1)),
+    ('1727809200', _utc(2024, 10, 1, 19)),
+    ('1727809200000', _utc(2024, 10, 1, 19)),
+    (1727809200, _utc(2024, 10, 1, 19)),
+    (1727809200000, _utc(2024, 10, 1, 19)),
+    (datetime(2024, 10, 1, 19), _utc(2024, 10, 1, 19)),
+    (date(2024, 10, 1), _utc(2024, 10, 1)),
+])
+def test_to_epoch_formats(value, expected):
+    assert to_epoch(value) == expected
+
+
+@pytest.mark.parametrize('value', [None, '', 'not a date', '123', '99999999', '2024-13-45'])
+def test_to_epoch_rejects(value):
+    assert to_epoch(value) is None
+
+
+def test_normalize_timestamp_keeps_years_as_years():
+    assert normalize_timestamp('2024') == '2024-01-01T00:00:00Z'
+    assert normalize_timestamp('garbage') == 'garbage'
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('today', (_utc(2024, 10, 16), _utc(2024, 10, 17))),
+    ('yesterday', (_utc(2024, 10, 15), _utc(2024, 10, 16))),
+    ('this week', (_utc(2024, 10, 14), _utc(2024, 10, 21))),
+    ('last week', (_utc(2024, 10, 7), _utc(2024, 10, 14))),
+    ('last month', (_utc(2024, 9, 1), _utc(2024, 10, 1))),
+    ('last year', (_utc(2023, 1, 1), _utc(2024, 1, 1))),
+    ('past 3 days', (_utc(2024, 10, 13, 15, 30), None)),
+    ('2 weeks ago', (_utc(2024, 10, 2), _utc(2024, 10, 9))),
+    ('in 2023', (_utc(2023, 1, 1), _utc(2024, 1, 1))),
+    ('2023', (_utc(2023, 1, 1), _utc(2024, 1, 1))),
+    ('before March 2024', (None, _utc(2024, 3, 1))),
+    ('after March 2024', (_utc(2024, 4, 1), None)),
+    ('since Q2 2024', (_utc(2024, 4, 1), None)),
+    ('between January and March 2024', (_utc(2024, 1, 1), _utc(2024, 4, 1))),
+    ('on 2024-03-05', (_utc(2024, 3, 5), _utc(2024, 3, 6))),
+    ('November', (_utc(2023, 11, 1), _utc(2023, 12, 1))),
+])
+def test_parse_time_range(expression, expected):
+    assert parse_time_range(expression, NOW) == expected
+
+
+def test_parse_time_range_unknown():
+    assert parse_time_range('whenever', NOW) is None
+    assert parse_time_range('before the meeting', NOW) is None
+
+
+def test_find_time_range_in_question():
+    expression, bounds = find_time_range('What did Sarah email me about last week?', NOW)
+    assert expression == 'last week'
+    assert bounds == (_utc(2024, 10, 7), _utc(2024, 10, 14))
+
+    expression, bounds = find_time_range('Which offers did I get in 2023?', NOW)
+    assert expression == 'in 2023'
+    assert bounds == (_utc(2023, 1, 1), _utc(2024, 1, 1))
+
+    assert find_time_range('What is my Meta offer?', NOW) is None
@@ -0,0 +1,107 @@
+"""Write-ahead log: replaying interrupted edit sets and recovering dead processes' logs."""
+
+import json
+
+import pytest
+
+from core.ingestion.write_ahead_log import LogInUse, WriteAheadLog, recover_write_ahead_logs
+
+
+def _note(vault, text):
+    path = vault / 'career' / 'Meta.md'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _crash_after_begin(vault, path, content, citations=None, log_name='ingest-test.wal'):
+    """Log an edit set and 'die' before applying it."""
+    wal = WriteAheadLog(vault, log_name=log_name)
+    wal.begin([{
+        'path': path,
+        'content': content,
+        'citations': citations,
+        'original': path.read_text() if path.exists() else None,
+        'original_citations': None,
+    }])
+    wal.close()
+    return wal.log_path
+
+
+def test_crash_between_begin_and_commit_is_replayed(tmp_path):
+    path = _note(tmp_path, '# Meta\n')
+    _crash_after_begin(tmp_path, path, '# Meta\n\nOffer received [1]\n', {'1': {'platform': 'Gmail'}})
+
+    wal = WriteAheadLog(tmp_path, log_name='ingest-test.wal')
+    summary = wal.recover()
+
+    assert summary == {'replayed': 2, 'conflicts': 0, 'discarded': 0}
+    assert path.read_text() == '# Meta\n\nOffer received [1]\n'
+    assert json.loads(path.with_suffix('.json').read_text()) == {'1': {'platform': 'Gmail'}}
+    assert wal.log_path.stat().st_size == 0
+    wal.close()
+
+
+def test_committed_edit_set_is_not_replayed(tmp_path):
+    path = _note(tmp_path, '# Meta\n')
+    wal = WriteAheadLog(tmp_path, log_name='ingest-test.wal')
+    txn = wal.begin([{'path': path, 'content': '# Meta\n\nLogged\n', 'original': '# Meta\n'}])
+    path.write_text('# Meta\n\nLogged\n')
+    wal.commit(txn)
+    path.write_text('# Meta\n\nEdited later\n')
+    wal.close()
+
+    summary = WriteAheadLog(tmp_path, log_name='ingest-test.wal').recover()
+    assert summary == {'replayed': 0, 'conflicts': 0, 'discarded': 0}
+    assert path.read_text() == '# Meta\n\nEdited later\n'
+
+
+def test_torn_record_is_discarded(tmp_path):
+    path = _note(tmp_path, '# Meta\n')
+    log_path = _crash_after_begin(tmp_path, path, '# Meta\n\nNever written\n')
+
+    # Crash while the begin record was being written
+    data = log_path.read_bytes()
+    log_path.write_bytes(data[:len(data) // 2])
+
+    summary = WriteAheadLog(tmp_path, log_name='ingest-test.wal').recover()
+    assert summary == {'replayed': 0, 'conflicts': 0, 'discarded': 1}
+    assert path.read_text() == '# Meta\n'
+
+
+def test_file_changed_since_is_not_replayed(tmp_path):
+    path = _note(tmp_path, '# Meta\n')
+    _crash_after_begin(tmp_path, path, '# Meta\n\nFrom the log\n')
+    path.write_text('# Meta\n\nEdited by hand\n')
+
+    summary = WriteAheadLog(tmp_path, log_name='ingest-test.wal').recover()
+    assert summary == {'replayed': 0, 'conflicts': 1, 'discarded': 0}
+    assert path.read_text() == '# Meta\n\nEdited by hand\n'
+
+
+def test_log_of_live_process_is_locked(tmp_path):
+    wal = WriteAheadLog(tmp_path, log_name='ingest-test.wal')
+    with pytest.raises(LogInUse):
+        WriteAheadLog(tmp_path, log_name='ingest-test.wal')
+    wal.close()
+
+
+def test_recover_dead_process_logs(tmp_path):
+    path = _note(tmp_path, '# Meta\n')
+    dead_log = _crash_after_begin(tmp_path, path, '# Meta\n\nFrom a dead worker\n', log_name='ingest-4242.wal')
+
+    other = path.with_name('Other.md')
+    other.write_text('# Other\n')
+    live = WriteAheadLog(tmp_path, log_name='ingest-4343.wal')
+    live.begin([{'path': other, 'content': '# Other\n\nIn flight\n', 'original': '# Other\n'}])
+
+    summary = recover_write_ahead_logs(tmp_path)
+
+    assert summary == {'replayed': 1, 'conflicts': 0, 'discarded': 0}
+    assert path.read_text() == '# Meta\n\nFrom a dead worker\n'
+    assert not dead_log.exists()
+
+    # The live process's open edit set is left alone
+    assert live.log_path.exists()
+    assert other.read_text() == '# Other\n'
+    live.close()
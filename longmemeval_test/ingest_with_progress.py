@@ -1,80 +1,52 @@
 #!/usr/bin/env python3
 """
 Ingest LongMemEval with real-time progress tracking.
+
+Sessions are converted once into a JSONL file of {text, metadata} items and
+streamed into the vault with BulkIngestionPipeline.bulk_ingest_jsonl, which
+checkpoints every written batch: re-running after a crash or Ctrl-C resumes
+where it stopped and retries failed batches first.
+
+LongMemEval ships as a single JSON array, so the conversion step still has
+to parse the whole file once; the ingestion itself only holds one chunk of
+items in memory.
 """
 
 import json
-import requests
+import sys
 import time
 from pathlib import Path
-from datetime import datetime
 
-def ingest_with_progress(data_file, chunk_size=10, batch_size=10):
-    """Ingest data in chunks with progress tracking."""
-    
-    # Setup logging to file
-    import sys
-    log_file = open('longmemeval_test/progress.log', 'w', buffering=1)
-    
-    def log(msg):
-        """Print to both stdout and file."""
-        print(msg)
-        print(msg, file=log_file)
-        log_file.flush()
-    
-    # Load data
-    log(f"\n📂 Loading {data_file}")
+sys.path.insert(0, str(Path(__file__).parent.parent / "electron" / "backend" / "src"))
+
+from bulk_ingest import BulkIngestionPipeline
+
+
+def convert_to_jsonl(data_file, items_file, log):
+    """Write one {text, metadata} line per haystack session. Returns (questions, sessions)."""
+    log(f"\n📂 Converting {data_file} -> {items_file}")
     with open(data_file) as f:
         data = json.load(f)
-    
-    # Calculate totals
-    total_questions = len(data)
-    total_sessions = sum(len(item['haystack_sessions']) for item in data)
-    total_chunks = (total_questions + chunk_size - 1) // chunk_size
-    
-    log(f"\n{'='*70}")
-    log(f"LONGMEMEVAL BULK INGESTION")
-    log(f"{'='*70}")
-    log(f"Total questions: {total_questions}")
-    log(f"Total sessions: {total_sessions}")
-    log(f"Chunk size: {chunk_size} questions")
-    log(f"Total chunks: {total_chunks}")
-    log(f"Batch size: {batch_size} items per batch")
-    log(f"{'='*70}\n")
-    
-    # Track stats
-    total_success = 0
-    total_failed = 0
-    start_time = time.time()
-    
-    # Process in chunks
-    for chunk_num in range(total_chunks):
-        chunk_start = chunk_num * chunk_size
-        chunk_end = min(chunk_start + chunk_size, total_questions)
-        chunk = data[chunk_start:chunk_end]
-        
-        log(f"\n{'─'*70}")
-        log(f"CHUNK {chunk_num + 1}/{total_chunks} | Questions {chunk_start+1}-{chunk_end}")
-        log(f"{'─'*70}")
-        
-        # Convert to items
-        items = []
-        for idx, item in enumerate(chunk, 1):
+
+    total_sessions = 0
+    tmp_file = items_file.with_suffix('.tmp')
+    with open(tmp_file, 'w') as out:
+        for idx, item in enumerate(data, 1):
             qid = item['question_id']
             qtype = item['question_type']
             sessions = item['haystack_sessions']
             session_ids = item['haystack_session_ids']
             session_dates = item['haystack_dates']
-            
-            log(f"  [{chunk_start + idx}] {qid} ({qtype}) - {len(sessions)} sessions")
-            
+
+            log(f"  [{idx}] {qid} ({qtype}) - {len(sessions)} sessions")
+
             for sess, sid, sdate in zip(sessions, session_ids, session_dates):
                 text_lines = [f"Chat Session {sid}", f"Date: {sdate}", ""]
                 for turn in sess:
                     text_lines.append(f"{turn['role'].capitalize()}: {turn['content']}")
                     text_lines.append("")
-                
-                items.append({
+
+                out.write(json.dumps({
                     'text': '\n'.join(text_lines),
                     'metadata': {
                         'platform': 'LongMemEval',
@@ -82,101 +54,95 @@ def ingest_with_progress(data_file, chunk_size=10, batch_size=10):
                         'url': f'longmemeval://{qid}/{sid}',
                         'note': f'Session {sid} for {qtype} question'
                     }
-                })
-        
-        log(f"\nTotal items in chunk: {len(items)}")
-        log(f"Sending to bulk endpoint...")
-        
-        # Send request
-        try:
-            chunk_start_time = time.time()
-            
-            response = requests.post(
-                'http://localhost:8765/protocol/bulk-ingest',
-                json={'items': items, 'batch_size': batch_size},
-                timeout=1200
-            )
-            
-            chunk_elapsed = time.time() - chunk_start_time
-            
-            if response.status_code == 200:
-                result = response.json()
-                chunk_success = result.get('successful', 0)
-                chunk_failed = result.get('failed', 0)
-                
-                total_success += chunk_success
-                total_failed += chunk_failed
-                
-                log(f"✅ SUCCESS ({chunk_elapsed:.1f}s)")
-                log(f"   Successful: {chunk_success}/{len(items)}")
-                log(f"   Files created: {result.get('files_created', 0)}")
-                log(f"   Files updated: {result.get('files_updated', 0)}")
-            else:
-                log(f"❌ HTTP {response.status_code}")
-                total_failed += len(items)
-        
-        except Exception as e:
-            log(f"❌ Error: {e}")
-            total_failed += len(items)
-        
-        # Progress summary
-        elapsed = time.time() - start_time
-        progress = ((chunk_num + 1) / total_chunks) * 100
-        sessions_done = total_success + total_failed
-        sessions_left = total_sessions - sessions_done
-        
-        # Time estimates
-        if sessions_done > 0:
-            avg_time_per_session = elapsed / sessions_done
-            eta_seconds = avg_time_per_session * sessions_left
-            eta_mins = eta_seconds / 60
-        else:
-            eta_mins = 0
-        
-        log(f"\n📊 PROGRESS: {progress:.1f}% complete")
-        log(f"   Sessions: {sessions_done}/{total_sessions}")
-        log(f"   Elapsed: {elapsed/60:.1f} mins")
-        log(f"   ETA: {eta_mins:.1f} mins")
-        log(f"   Success rate: {total_success/(total_success+total_failed)*100:.1f}%")
-        
-        time.sleep(1)  # Brief pause
-    
+                }) + '\n')
+                total_sessions += 1
+
+    # Only a complete conversion is picked up by later runs
+    tmp_file.replace(items_file)
+    return len(data), total_sessions
+
+
+def ingest_with_progress(data_file, vault, chunk_items=200, batch_size=10, max_workers=4):
+    """Stream LongMemEval sessions into the vault with resumable progress."""
+
+    # Setup logging to file
+    log_file = open('longmemeval_test/progress.log', 'a', buffering=1)
+
+    def log(msg):
+        """Print to both stdout and file."""
+        print(msg)
+        print(msg, file=log_file)
+        log_file.flush()
+
+    data_file = Path(data_file)
+    items_file = data_file.with_name(data_file.stem + '.items.jsonl')
+    if items_file.exists():
+        log(f"\n📂 Reusing converted items {items_file}")
+    else:
+        total_questions, total_sessions = convert_to_jsonl(data_file, items_file, log)
+        log(f"\nTotal questions: {total_questions}")
+        log(f"Total sessions: {total_sessions}")
+
+    log(f"\n{'='*70}")
+    log(f"LONGMEMEVAL BULK INGESTION")
+    log(f"{'='*70}")
+    log(f"Vault: {vault}")
+    log(f"Chunk size: {chunk_items} items")
+    log(f"Batch size: {batch_size} items per batch")
+    log(f"{'='*70}\n")
+
+    start_time = time.time()
+    pipeline = BulkIngestionPipeline(Path(vault))
+    result = pipeline.bulk_ingest_jsonl(
+        items_file,
+        chunk_items=chunk_items,
+        batch_size=batch_size,
+        max_workers=max_workers
+    )
+    stats = result['stats']
+
     # Final summary
     total_elapsed = time.time() - start_time
-    
+    total_success = stats['successful']
+    total_failed = stats['failed']
+    attempted = total_success + total_failed
+
     log(f"\n{'='*70}")
     log(f"INGESTION COMPLETE")
     log(f"{'='*70}")
-    log(f"Total sessions: {total_sessions}")
+    log(f"Total sessions: {stats['items_done']}")
     log(f"Successful: {total_success}")
     log(f"Failed: {total_failed}")
-    log(f"Success rate: {total_success/(total_success+total_failed)*100:.1f}%")
-    log(f"Total time: {total_elapsed/60:.1f} minutes")
+    log(f"Success rate: {total_success/attempted*100 if attempted else 0:.1f}%")
+    log(f"Pending retries: {len(stats['retry_offsets'])}")
+    log(f"Run time: {total_elapsed/60:.1f} minutes")
     log(f"{'='*70}\n")
-    
+
     # Save results
     results = {
-        'total_questions': total_questions,
-        'total_sessions': total_sessions,
+        'total_sessions': stats['items_done'],
         'successful': total_success,
         'failed': total_failed,
-        'success_rate': total_success/(total_success+total_failed)*100 if (total_success+total_failed) > 0 else 0,
+        'pending_retries': len(stats['retry_offsets']),
+        'success_rate': total_success/attempted*100 if attempted else 0,
         'elapsed_minutes': total_elapsed/60
     }
-    
+
     with open('longmemeval_test/ingestion_results.json', 'w') as f:
         json.dump(results, f, indent=2)
-    
+
     log(f"📊 Results saved to longmemeval_test/ingestion_results.json\n")
 
 if __name__ == "__main__":
     import argparse
-    
+
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file')
-    parser.add_argument('--chunk-size', type=int, default=10)
+    parser.add_argument('--vault', required=True, help='Vault directory to ingest into')
+    parser.add_argument('--chunk-items', type=int, default=200)
     parser.add_argument('--batch-size', type=int, default=10)
-    
+    parser.add_argument('--max-workers', type=int, default=4)
+
     args = parser.parse_args()
-    
-    ingest_with_progress(args.data_file, args.chunk_size, args.batch_size)
+
+    ingest_with_progress(args.data_file, args.vault, args.chunk_items, args.batch_size, args.max_workers)